@@ -1,37 +1,408 @@
-from http.server import HTTPServer, BaseHTTPRequestHandler
-import subprocess
+from http.server import HTTPServer, BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import signal
+import socket
+import threading
+import time
+import urllib.request
+
+from common import gateway
+from common.server_metrics import ServerMetrics
 
 username = "User"
 port = 8080
 
+# 요청 수, 지연 시간, 처리 중인 요청 수 등을 모아 /metrics 로 제공
+metrics = ServerMetrics(routes=["/", "/healthz", "/readyz", "/metrics"])
+
 
 class Handler(BaseHTTPRequestHandler):
+    # keep-alive 연결이 놀고 있으면 이 시간(초) 뒤에 닫아서 작업 스레드를 돌려받음
+    timeout = 5
+    # 헤더와 본문이 따로 전송될 때 Nagle 알고리즘 때문에 keep-alive 응답이 약 40ms 지연되는 것을 방지
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.measure(self.route)
+
+    def measure(self, handler):
+        # 모든 요청의 처리 시간과 응답 코드를 지표로 기록
+        started = time.perf_counter()
+        self.status = 500  # 응답 전에 예외가 나면 500 으로 기록
+        metrics.request_started()
+        try:
+            handler()
+        finally:
+            metrics.request_finished(
+                self.command,
+                self.metric_label(),
+                self.status,
+                time.perf_counter() - started,
+            )
+
+    def metric_label(self):
+        return metrics.route_label(self.path)
+
+    def is_ready(self):
+        return self.server.ready.is_set()
+
+    def route(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/":
+            self.send_text(200, f"{username}의 서버 {port} 포트에서 실행중 !!")
+        elif path == "/healthz":
+            # 프로세스가 살아서 요청에 응답할 수 있는지 (liveness)
+            self.send_text(200, "ok")
+        elif path == "/readyz":
+            # 새 요청을 받아도 되는지 (readiness) - 종료 중에는 503 으로 로드밸런서에서 빠지게 함
+            if self.is_ready():
+                self.send_text(200, "ready")
+            else:
+                self.send_text(503, "not ready")
+        elif path == "/metrics":
+            self.send_text(
+                200,
+                metrics.render_prometheus(),
+                content_type="text/plain; version=0.0.4; charset=utf-8",
+            )
+        else:
+            self.send_text(404, "Not Found")
+
+    def send_text(self, status, text, content_type="text/plain; charset=utf-8"):
+        # keep-alive(HTTP/1.1)에서는 Content-Length 가 있어야 같은 연결로 다음 요청을 받을 수 있음
+        body = text.encode()
+        self.status = status
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 부하 테스트 시 요청마다 콘솔에 출력하면 그 자체가 병목이 되므로 --verbose 일 때만 출력
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class GatewayHandler(Handler):
+    """
+    /healthz, /readyz, /metrics 는 직접 응답하고 나머지 요청은 Streamlit 작업 프로세스로 전달하는 핸들러
+    HTTP 요청은 업스트림 커넥션 풀로, WebSocket 은 소켓을 직접 이어서 전달합니다.
+    """
+
+    protocol_version = "HTTP/1.1"
+    local_paths = {"/healthz", "/readyz", "/metrics"}
+
     def do_GET(self):
-        if self.path == "/":
-            self.send_response(200)
-            self.send_header("Content-Type", "text/plain; charset=utf-8")
-            self.end_headers()
-            self.wfile.write(f"{username}의 서버 {port} 포트에서 실행중 !!".encode())
+        self.server.set_busy(self.connection, True)
+        try:
+            self.measure(self.dispatch)
+        finally:
+            if self.server.draining:
+                self.close_connection = True  # 종료 중에는 keep-alive 로 다음 요청을 받지 않음
+            self.server.set_busy(self.connection, False)
+
+    do_POST = do_PUT = do_PATCH = do_DELETE = do_OPTIONS = do_HEAD = do_GET
+
+    def dispatch(self):
+        if self.path.split("?", 1)[0] in self.local_paths:
+            self.route()
+        elif self.headers.get("Upgrade", "").lower() == "websocket":
+            self.proxy_websocket()
         else:
-            self.send_response(404)
-            self.end_headers()
-            self.wfile.write("Not Found".encode())
+            self.proxy_http()
+
+    def metric_label(self):
+        if self.path.split("?", 1)[0] in self.local_paths:
+            return metrics.route_label(self.path)
+        if self.headers.get("Upgrade", "").lower() == "websocket":
+            return "websocket"
+        return "upstream"
+
+    def is_ready(self):
+        # 정상 작업 프로세스가 하나도 없으면 트래픽을 받지 않음
+        return super().is_ready() and bool(self.server.pool.healthy_backends())
+
+    def choose_backend(self, exclude):
+        try:
+            return self.server.pool.choose(self.headers.get("Cookie"), exclude)
+        except gateway.UpstreamUnavailable as error:
+            self.send_text(503, str(error))
+            return None, False
+
+    def proxy_http(self):
+        pool = self.server.pool
+        try:
+            body = gateway.read_request_body(self.headers, self.rfile)
+        except gateway.LengthRequired as error:
+            self.close_connection = True  # 본문을 읽지 못했으므로 이 연결로 다음 요청을 받지 않음
+            self.send_text(411, str(error))
+            return
+        except ValueError as error:
+            self.close_connection = True
+            self.send_text(400, str(error))
+            return
+        headers = gateway.forward_headers(self.headers, self.client_address)
+
+        # 연결이 거부되면 그 작업 프로세스를 제외하고 다른 프로세스로 다시 시도
+        failed = []
+        while True:
+            backend, assigned = self.choose_backend(failed)
+            if backend is None:
+                return
+            pool.begin(backend)
+            try:
+                connection, response = gateway.proxy_request(
+                    backend, self.command, self.path, headers, body
+                )
+                break
+            except OSError:
+                pool.end(backend)
+                pool.mark_down(backend)
+                failed.append(backend)
+
+        try:
+            self.relay_response(response, backend if assigned else None)
+            backend.release(connection, reusable=not response.will_close)
+        except Exception:
+            connection.close()  # 본문을 다 읽지 못한 연결은 재사용하지 않음
+            raise
+        finally:
+            pool.end(backend)
+
+    def relay_response(self, response, assigned_backend):
+        self.status = response.status
+        self.send_response_only(response.status)  # Date/Server 헤더는 업스트림 것을 그대로 사용
+        for name, value in response.getheaders():
+            if name.lower() not in gateway.HOP_BY_HOP_HEADERS:
+                self.send_header(name, value)
+        if assigned_backend is not None:
+            # 이후 요청(특히 WebSocket)이 같은 작업 프로세스로 가도록 쿠키에 기록
+            self.send_header(
+                "Set-Cookie",
+                f"{gateway.STICKY_COOKIE}={assigned_backend.name}; Path=/; HttpOnly; SameSite=Lax",
+            )
+
+        has_body = self.command != "HEAD" and response.status not in (204, 304)
+        chunked = has_body and response.getheader("Content-Length") is None
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        # 응답을 통째로 모으지 않고 받는 대로 전달
+        while has_body:
+            data = response.read1(gateway.CHUNK_SIZE)
+            if not data:
+                break
+            if chunked:
+                self.wfile.write(b"%X\r\n%s\r\n" % (len(data), data))
+            else:
+                self.wfile.write(data)
+        if chunked:
+            self.wfile.write(b"0\r\n\r\n")
+        # read1() 는 본문 끝에서 응답을 닫지 않으므로 한 번 더 읽어 닫아야 연결을 풀에 돌려놓을 수 있음
+        response.read()
+
+    def proxy_websocket(self):
+        pool = self.server.pool
+        failed = []
+        while True:
+            backend, _ = self.choose_backend(failed)
+            if backend is None:
+                return
+            try:
+                upstream = gateway.open_websocket(
+                    backend, self.requestline, self.headers, self.client_address
+                )
+                break
+            except OSError:
+                pool.mark_down(backend)
+                failed.append(backend)
+
+        self.status = 101
+        self.close_connection = True  # 터널이 끝나면 클라이언트 연결도 닫음
+        pool.begin(backend)
+        try:
+            gateway.tunnel(self.connection, upstream)
+        finally:
+            pool.end(backend)
+            upstream.close()
 
-def get_public_ip():
+
+class PooledHTTPServer(HTTPServer):
+    """
+    정해진 수의 작업 스레드(스레드 풀)로 여러 요청을 동시에 처리하는 서버
+    ThreadingHTTPServer 와 달리 연결마다 스레드를 새로 만들지 않아 스레드 수가 제한됩니다.
+    """
+
+    def __init__(self, server_address, handler_class, workers):
+        super().__init__(server_address, handler_class)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http")
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)  # 처리 중인 요청은 끝까지 마무리
+
+
+class GatewayHTTPServer(ThreadingHTTPServer):
+    """
+    연결마다 스레드로 처리하는 게이트웨이 서버 (WebSocket 연결이 세션 내내 유지되므로 고정 크기 풀 대신 사용)
+    종료할 때는 요청 사이에 쉬고 있는 keep-alive 연결은 바로 닫고, 처리 중인 요청과 WebSocket 터널은
+    drain_timeout 초까지 끝나기를 기다린 뒤 남은 연결을 끊고 모든 처리 스레드를 기다립니다.
+    """
+
+    # 기본 대기열(5)로는 브라우저 여러 개가 동시에 연결할 때 SYN 재전송으로 1초씩 지연됨
+    request_queue_size = 128
+    # 처리 스레드를 daemon 으로 두면 server_close() 가 기다리지 않고 종료되어 처리 중인 요청이 끊김
+    daemon_threads = False
+    # 런처(common.launcher)는 SIGTERM 뒤 10초가 지나면 강제 종료하므로 그보다 짧게
+    drain_timeout = 8.0
+
+    def __init__(self, server_address, handler_class):
+        super().__init__(server_address, handler_class)
+        self.draining = False
+        self._connections = {}  # 클라이언트 소켓 -> 요청 처리 중 여부
+        self._changed = threading.Condition()
+
+    def process_request_thread(self, request, client_address):
+        with self._changed:
+            self._connections[request] = False
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            with self._changed:
+                self._connections.pop(request, None)
+                self._changed.notify_all()
+
+    def set_busy(self, request, busy):
+        with self._changed:
+            if request in self._connections:
+                self._connections[request] = busy
+            self._changed.notify_all()
+
+    def _disconnect(self, sockets):
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)  # 기다리던 읽기·터널이 바로 끝나도록
+            except OSError:
+                pass
+
+    def server_close(self):
+        self.draining = True
+        deadline = time.monotonic() + self.drain_timeout
+        closed = set()
+        with self._changed:
+            while True:
+                idle = [sock for sock, busy in self._connections.items() if not busy and sock not in closed]
+                self._disconnect(idle)
+                closed.update(idle)
+                remaining = deadline - time.monotonic()
+                if not any(self._connections.values()) or remaining <= 0:
+                    break
+                self._changed.wait(min(remaining, 0.5))
+            self._disconnect(list(self._connections))
+        super().server_close()  # 대기 소켓을 닫고 모든 처리 스레드가 끝나기를 기다림
+
+
+def get_public_ip(timeout=3):
     try:
-        result = subprocess.run(
-            ['curl', '-s', 'ifconfig.me'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        return result.stdout.strip()
-    except:
+        with urllib.request.urlopen("https://ifconfig.me/ip", timeout=timeout) as response:
+            return response.read().decode().strip()
+    except Exception:
         return "Public IP를 가져올 수 없음"
 
-public_ip = get_public_ip()
 
-print(f"서버가 시작되었습니다! 아래 링크를 클릭해주세요.")
-print(f"접속 URL: http://{public_ip}:{port}")
+def announce_public_ip():
+    # 외부 조회가 느리거나 실패해도 서버 시작을 막지 않도록 백그라운드에서 실행
+    public_ip = get_public_ip()
+    print(f"접속 URL: http://{public_ip}:{port}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="간단한 HTTP 서버")
+    parser.add_argument("--port", type=int, default=port)
+    parser.add_argument(
+        "--mode",
+        choices=["threaded", "single", "gateway"],
+        default="threaded",
+        help="threaded: 스레드 풀로 동시 처리 (기본값), single: 한 번에 한 요청씩 처리 (기존 방식), "
+        "gateway: --upstream 의 Streamlit 작업 프로세스들로 요청을 분산",
+    )
+    parser.add_argument("--workers", type=int, default=32, help="동시 처리 작업 스레드 수")
+    parser.add_argument(
+        "--upstream",
+        action="append",
+        default=[],
+        help="gateway 모드에서 요청을 보낼 Streamlit 주소 (host:port, 여러 번 지정 가능)",
+    )
+    parser.add_argument("--health-interval", type=float, default=5.0, help="헬스 체크 주기 (초)")
+    parser.add_argument("--no-public-ip", action="store_true", help="Public IP 조회 생략")
+    parser.add_argument("--verbose", action="store_true", help="요청 로그 출력")
+    return parser.parse_args()
+
+
+def main():
+    global port
+
+    args = parse_args()
+    port = args.port
+
+    if args.mode == "single":
+        server = HTTPServer(("", port), Handler)
+    elif args.mode == "gateway":
+        if not args.upstream:
+            raise SystemExit("gateway 모드에는 --upstream 을 하나 이상 지정해야 합니다.")
+        server = GatewayHTTPServer(("", port), GatewayHandler)
+        server.pool = gateway.BackendPool(args.upstream, health_interval=args.health_interval)
+        server.pool.check_all()
+        server.pool.start_health_checks()
+        metrics.add_collector(server.pool.metric_lines)
+    else:
+        Handler.protocol_version = "HTTP/1.1"  # keep-alive 사용
+        server = PooledHTTPServer(("", port), Handler, workers=args.workers)
+    server.verbose = args.verbose
+    server.ready = threading.Event()  # /readyz 응답에 사용
+
+    # SIGTERM/SIGINT 를 받으면 새 요청 수신을 멈추고 처리 중인 요청을 마친 뒤 종료
+    def stop(signum, frame):
+        server.ready.clear()
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    if args.mode == "gateway":
+        upstreams = ", ".join(f"{b.name}={b.host}:{b.port}" for b in server.pool.backends)
+        print(f"서버가 시작되었습니다! (gateway 모드, 작업 프로세스 {upstreams})")
+    else:
+        workers = args.workers if args.mode == "threaded" else 1
+        print(f"서버가 시작되었습니다! ({args.mode} 모드, 작업 스레드 {workers}개)")
+    print(f"로컬 URL: http://localhost:{port}")
+    print("상태 확인: /healthz, /readyz · 지표: /metrics")
+    if not args.no_public_ip:
+        threading.Thread(target=announce_public_ip, daemon=True).start()
+
+    server.ready.set()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if args.mode == "gateway":
+            server.pool.stop()
+        print("서버가 종료되었습니다.")
+
 
-HTTPServer(("", port), Handler).serve_forever()
+if __name__ == "__main__":
+    main()
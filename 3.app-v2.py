@@ -1,9 +1,17 @@
 import streamlit as st
-import json
-import boto3
 
-# AWS Bedrock 클라이언트 초기화
-bedrock_runtime = boto3.client(service_name="bedrock-runtime", region_name="us-east-1")
+from common.accounting import render_usage_panel
+from common.async_bedrock import get_async_bedrock_client, render_async_stats
+from common.bedrock import render_client_stats
+from common.guidance import format_usage, generate_guidance, render_usage_stats
+from common.guidance_cache import get_guidance_cache, render_cache_stats
+
+# AWS Bedrock 클라이언트 (프로세스 전체에서 공유, 재실행 시 재사용)
+# 여러 세션이 같은 안내 메시지를 동시에 요청하면 한 번만 호출하고 결과를 함께 받음
+bedrock_runtime = get_async_bedrock_client()
+
+# 환자 안내 메시지 캐시 (프로세스 전체에서 공유)
+guidance_cache = get_guidance_cache()
 
 # 앱 제목
 st.title("🏥 환자 안내 메시지 생성 앱 👨‍⚕️")
@@ -11,57 +19,36 @@ st.title("🏥 환자 안내 메시지 생성 앱 👨‍⚕️")
 # 부제목
 st.subheader("환자 정보를 입력하면 맞춤형 안내 메시지를 자동으로 생성합니다 🚀")
 
+# 사이드바에 Bedrock 클라이언트 재사용 현황, 캐시 적중 현황, 토큰 사용량 표시
+render_client_stats()
+render_async_stats(bedrock_runtime)
+render_cache_stats(guidance_cache)
+render_usage_stats()
+render_usage_panel()
+
 
 def generate_patient_guidance(patient_name, age, diagnosis, symptoms, treatment_plan):
     """
     Bedrock을 사용하여 환자에게 필요한 안내 메시지를 자동으로 생성하는 함수
+    같은 진단/증상/치료 계획/연령대의 안내문은 캐시에서 재사용합니다.
     """
     try:
-        prompt = f"""다음 환자 정보를 바탕으로 환자에게 필요한 안내 메시지를 작성해주세요.
-
-환자 정보:
-- 이름: {patient_name}
-- 나이: {age}세
-- 진단명: {diagnosis}
-- 증상: {symptoms}
-- 치료 계획: {treatment_plan}
-
-요구사항:
-1. 환자가 이해하기 쉬운 문체로 작성
-2. 다음 항목을 포함하여 작성:
-   - 진료 후 주의사항
-   - 투약 안내 (필요시)
-   - 생활 관리 방법
-   - 증상이 악화될 경우 대응 방법
-   - 추후 방문 안내
-3. 친절하고 명확한 안내 문구로 작성
-4. 항목별로 구분하여 작성
-
-환자 안내 메시지만 작성해주세요:"""
-
-        body = json.dumps(
-            {
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 1000,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [{"type": "text", "text": prompt}],
-                    }
-                ],
-            }
-        )
-
-        response = bedrock_runtime.invoke_model(
-            modelId="anthropic.claude-3-haiku-20240307-v1:0",  # Claude 모델 ID
-            body=body,
+        guidance, info = generate_guidance(
+            bedrock_runtime,
+            patient_name,
+            age,
+            diagnosis,
+            symptoms,
+            treatment_plan,
+            cache=guidance_cache,
         )
-        response_body = json.loads(response.get("body").read())
-
-        # Claude 응답에서 텍스트 추출
-        output_text = response_body["content"][0]["text"]
-
-        return output_text.strip()
+        if info["degraded"]:
+            st.warning("⚠️ AI 서비스가 일시적으로 불안정하여 기본 안내문을 보여드립니다. 잠시 후 다시 생성해주세요.")
+        elif info["cached"]:
+            st.toast("🗂️ 캐시된 안내 메시지를 재사용했습니다.")
+        else:
+            st.caption(f"🧮 {format_usage(info['usage'])} · 🧭 {info['model_id']}")
+        return guidance
     except Exception as e:
         st.error(f"AI 안내 메시지 생성 중 오류가 발생했습니다: {str(e)}")
         return None
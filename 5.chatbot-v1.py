@@ -1,21 +1,42 @@
 import json  # JSON 데이터 처리를 위한 라이브러리
-import boto3  # AWS SDK for Python
 import streamlit as st  # 웹 애플리케이션 구축을 위한 Streamlit 라이브러리
 
-# AWS Bedrock 클라이언트 초기화
-bedrock_runtime = boto3.client(service_name="bedrock-runtime", region_name="us-east-1")
+from common.accounting import (  # 토큰 사용량 장부와 예산 확인
+    check_budget,
+    estimate_request_tokens,
+    record_usage,
+    render_usage_panel,
+)
+from common.async_bedrock import get_async_bedrock_client, render_async_stats  # 요청 합류·동시 호출 제한
+from common.bedrock import render_client_stats  # 공유 Bedrock 클라이언트
+from common.chat_store import (  # 대화 기록 저장소
+    current_owner,
+    get_chat_store,
+    leave_foreign_conversation,
+    render_conversation_controls,
+    render_history,
+)
+from common.streaming import iter_stream_text, new_usage  # 스트리밍 응답 처리
+
+# AWS Bedrock 클라이언트 (프로세스 전체에서 공유, 재실행 시 재사용)
+bedrock_runtime = get_async_bedrock_client()  # 같은 요청이 동시에 오면 한 번만 호출
 
 # 스트림릿 앱 제목 설정
 st.title("Chatbot Ver.1 : 단순 챗봇")
 
-# 세션 상태 관리 - 대화 히스토리 초기화
-if "messages" not in st.session_state:
-    st.session_state.messages = []  # 사용자와 어시스턴트 간 대화 기록을 저장
+# 대화 기록 저장소 (SQLite) - 새로고침하거나 서버를 다시 시작해도 대화 ID 로 이어서 대화
+chat_store = get_chat_store()
 
-# 대화 히스토리 표시
-for message in st.session_state.messages:
-    with st.chat_message(message["role"]):  # 메시지 역할에 따라 채팅 버블 생성
-        st.markdown(message["content"])  # 메시지 내용을 화면에 렌더링
+# 스트리밍 모드: 응답을 받는 즉시 조금씩 화면에 표시
+use_streaming = st.sidebar.toggle("스트리밍 응답", value=True)
+render_client_stats()  # Bedrock 클라이언트 재사용 현황 표시
+render_async_stats(bedrock_runtime)  # 요청 합류와 동시 호출 현황 표시
+render_usage_panel()  # 최근 24시간 토큰 사용량과 예상 비용
+conversation_id = render_conversation_controls(chat_store, "5.chatbot-v1")  # 새 대화 / 이어하기
+chat_owner = current_owner()  # 대화 소유자 (자기 대화만 목록에 보이고 이어할 수 있음)
+
+# 대화 히스토리 표시 (최근 메시지만, 이전 메시지는 버튼을 눌러 더 불러옴)
+render_history(chat_store, conversation_id)
 
 
 def get_response_from_bedrock(prompt):
@@ -25,6 +46,9 @@ def get_response_from_bedrock(prompt):
     :return: 모델의 응답 텍스트
     """
     try:
+        # 최근 24시간 토큰 예산이 남았는지 확인 (입력 추정치 + 최대 출력)
+        check_budget(estimate_request_tokens([{"role": "user", "content": prompt}]) + 1000)
+
         # Bedrock에 전달할 요청 본문 생성
         body = json.dumps(
             {
@@ -61,6 +85,7 @@ def get_response_from_bedrock(prompt):
             body=body,  # 요청 본문 전달
         )
         response_body = json.loads(response.get("body").read())  # 응답 본문 JSON 파싱
+        record_usage(None, response_body["usage"])  # 토큰 사용량 기록 (모델 ID 는 실습에서 입력)
 
         ### AI 응답 데이터의 형식과 내용을 확인하세요. ###
         ### 응답 데이터를 참고하여 아래 추출 데이터를 적절하게 변수에 할당하세요.
@@ -75,10 +100,52 @@ def get_response_from_bedrock(prompt):
         return "응답 생성 중 오류가 발생했습니다."
 
 
+def stream_response_from_bedrock(prompt):
+    """
+    Bedrock 스트리밍 API로 응답을 받아 텍스트 조각을 차례로 돌려주는 제너레이터
+    :param prompt: 사용자 입력 메시지
+    :return: 모델 응답 텍스트 조각 (st.write_stream 으로 표시)
+    """
+    try:
+        # 최근 24시간 토큰 예산이 남았는지 확인 (입력 추정치 + 최대 출력)
+        check_budget(estimate_request_tokens([{"role": "user", "content": prompt}]) + 1000)
+
+        body = json.dumps(
+            {
+                "anthropic_version": "bedrock-2023-05-31",  # 모델 버전
+                "max_tokens": 1000,  # 최대 토큰 수
+                "messages": [
+                    {
+                        "role": "user",  # 사용자 역할로 설정
+                        "content": [{"type": "text", "text": prompt}],  # 입력 텍스트
+                    }
+                ],
+            }
+        )
+
+        # Bedrock 스트리밍 호출 - 응답을 이벤트 단위로 나누어 받음
+        response = bedrock_runtime.invoke_model_with_response_stream(
+            modelId="FILL_ME_IN",  # 위에서 입력한 모델 ID를 동일하게 입력하세요.
+            body=body,  # 요청 본문 전달
+        )
+
+        usage = new_usage()  # 스트림이 끝나면 토큰 수가 채워짐
+        yield from iter_stream_text(response, usage)
+        record_usage(None, usage)  # 토큰 사용량 기록 (모델 ID 는 실습에서 입력)
+    except Exception as e:
+        # 에러 발생 시 사용자에게 메시지 표시
+        st.error(f"Bedrock과 통신 중 오류가 발생했습니다: {str(e)}")
+        yield "응답 생성 중 오류가 발생했습니다."
+
+
 # 사용자 입력 처리
 if prompt := st.chat_input("Bedrock에 메시지 입력..."):  # 입력 창에 메시지 입력
-    # 사용자 메시지를 세션 상태에 추가
-    st.session_state.messages.append({"role": "user", "content": prompt})
+    # 사용자 메시지를 대화 기록에 추가
+    try:
+        chat_store.append(conversation_id, "5.chatbot-v1", "user", prompt, chat_owner)
+    except PermissionError:
+        leave_foreign_conversation()  # 다른 사용자의 대화면 오류를 표시하고 새 대화로 바꿈
+        st.stop()
 
     # 사용자 메시지를 화면에 표시
     with st.chat_message("user"):
@@ -87,12 +154,20 @@ if prompt := st.chat_input("Bedrock에 메시지 입력..."):  # 입력 창에 
     # Bedrock 모델에 요청하여 응답 생성
     with st.chat_message("assistant"):
 
-        ### 대기 스피너를 추가해보세요. ###
+        if use_streaming:
+            # 응답이 도착하는 대로 표시하고, 완성된 전체 텍스트를 돌려받음
+            response = st.write_stream(stream_response_from_bedrock(prompt))
+        else:
+
+            ### 대기 스피너를 추가해보세요. ###
 
-        response = get_response_from_bedrock(
-            prompt
-        )  # 사용자 메시지를 전달하여 응답 생성
-        st.markdown(response)  # 모델 응답을 화면에 표시
+            response = get_response_from_bedrock(
+                prompt
+            )  # 사용자 메시지를 전달하여 응답 생성
+            st.markdown(response)  # 모델 응답을 화면에 표시
 
-    # 어시스턴트의 응답을 세션 상태에 추가
-    st.session_state.messages.append({"role": "assistant", "content": response})
+    # 어시스턴트의 응답을 대화 기록에 추가
+    try:
+        chat_store.append(conversation_id, "5.chatbot-v1", "assistant", response, chat_owner)
+    except PermissionError:
+        leave_foreign_conversation()
@@ -1,32 +1,114 @@
 import json  # JSON 데이터 처리를 위한 라이브러리
-import boto3  # AWS SDK for Python
 import streamlit as st  # 웹 애플리케이션 구축을 위한 Streamlit 라이브러리
 
-# AWS Bedrock 클라이언트 초기화
-bedrock_runtime = boto3.client(service_name="bedrock-runtime", region_name="us-east-1")
+from common import profiler  # 재실행 비용 측정 (PROFILE_RERUNS=1 일 때만 동작)
+from common.accounting import (  # 토큰 사용량 장부와 요청 전 토큰 추정
+    TokenBudgetExceeded,
+    current_caller,
+    estimate_request_tokens,
+    format_cost,
+    get_usage_ledger,
+    preflight,
+    record_usage,
+    render_usage_panel,
+)
+from common.async_bedrock import get_async_bedrock_client, render_async_stats  # 요청 합류·동시 호출 제한
+from common.bedrock import render_client_stats  # 공유 Bedrock 클라이언트
+from common.chat_store import (  # 대화 기록 저장소
+    current_owner,
+    get_chat_store,
+    leave_foreign_conversation,
+    render_conversation_controls,
+    render_history,
+)
+from common.history import POLICIES, compact_history, new_summary_state  # 히스토리 압축
+from common.model_router import get_model_router  # 요청마다 모델 선택
+from common.resilience import CircuitOpenError  # Bedrock 호출 차단기
+from common.streaming import iter_stream_text, new_usage  # 스트리밍 응답 처리
+
+profiler.begin_rerun("6.chatbot-v2")
+
+# 응답의 최대 토큰 수 (모델은 요청마다 라우팅 표에서 입력 크기와 최근 지연 시간으로 고름)
+MAX_TOKENS = 1000
+# Bedrock 호출이 차단된 동안(오류가 잇따를 때) 모델 대신 보여 줄 응답
+BUSY_RESPONSE = "지금은 AI 서비스 요청이 많아 답변을 드리지 못했습니다. 잠시 후 다시 질문해주세요."
+
+# AWS Bedrock 클라이언트 (프로세스 전체에서 공유, 재실행 시 재사용)
+with profiler.section("Bedrock 클라이언트"):
+    bedrock_runtime = get_async_bedrock_client()  # 같은 요청이 동시에 오면 한 번만 호출
+model_router = get_model_router()  # 모델 선택과 실패 시 대체 모델 호출
 
 # Streamlit 웹 애플리케이션의 제목 설정
 st.title("Chatbot Ver.2 : 대화 맥락 이해 챗봇")
 
-# 세션 상태 관리
-if "messages" not in st.session_state:
-    st.session_state.messages = []  # 대화 히스토리를 저장할 리스트 초기화
+# 대화 기록 저장소 (SQLite) - 새로고침하거나 서버를 다시 시작해도 대화 ID 로 이어서 대화
+chat_store = get_chat_store()
 
+# 세션 상태 관리
+# 누적 사용량은 공용 장부(common.accounting)에 기록되어 새로고침해도 유지됨
 if "token_usage" not in st.session_state:
     st.session_state.token_usage = {
-        "input_tokens": 0,  # 누적 입력 토큰 수
-        "output_tokens": 0,  # 누적 출력 토큰 수
-        "total_tokens": 0,  # 누적 통합 토큰 수
         "last_input_tokens": 0,  # 최근 입력 토큰 수
         "last_output_tokens": 0,  # 최근 출력 토큰 수
         "last_total_tokens": 0,  # 최근 통합 토큰 수
+        "last_model_id": "-",  # 최근 응답한 모델
+        "saved_tokens": 0,  # 히스토리 압축으로 절약한 누적 입력 토큰 수 (추정)
+        "last_saved_tokens": 0,  # 최근 요청에서 절약한 입력 토큰 수 (추정)
     }
 
+# 스트리밍 모드: 응답을 받는 즉시 조금씩 화면에 표시
+use_streaming = st.sidebar.toggle("스트리밍 응답", value=True)
+render_client_stats()  # Bedrock 클라이언트 재사용 현황 표시
+render_async_stats(bedrock_runtime)  # 요청 합류와 동시 호출 현황 표시
+render_usage_panel()  # 최근 24시간 토큰 사용량과 예상 비용
+conversation_id = render_conversation_controls(chat_store, "6.chatbot-v2")  # 새 대화 / 이어하기
+chat_owner = current_owner()  # 대화 소유자 (자기 대화만 목록에 보이고 이어할 수 있음)
 
-def get_response_from_bedrock(messages):
+# 오래된 대화의 누적 요약 - 대화별로 저장해 두고 대화를 바꾸거나 이어할 때 불러옴
+if st.session_state.get("history_conversation") != conversation_id:
+    st.session_state.history_summary = (
+        chat_store.load_state(conversation_id).get("history_summary") or new_summary_state()
+    )
+    st.session_state.history_conversation = conversation_id
+
+# 히스토리 압축 설정: 대화가 길어져도 입력 토큰이 예산을 넘지 않도록 함
+st.sidebar.subheader("대화 히스토리 관리")
+history_policy = st.sidebar.selectbox(
+    "압축 방식",
+    list(POLICIES),
+    index=1,
+    format_func=lambda key: POLICIES[key],
+)
+history_budget = st.sidebar.number_input(
+    "히스토리 토큰 예산", min_value=200, max_value=100000, value=2000, step=100
+)
+pin_first_message = st.sidebar.checkbox("첫 질문 항상 포함", value=True)
+
+
+def update_token_usage(input_tokens, output_tokens, model_id):
+    """
+    토큰 사용량을 갱신하는 함수 (최신 값은 세션 상태, 누적 값은 공용 장부에 기록)
+    :param input_tokens: 이번 요청의 입력 토큰 수
+    :param output_tokens: 이번 요청의 출력 토큰 수
+    :param model_id: 이번 요청에 응답한 모델 ID
+    """
+    total_tokens = input_tokens + output_tokens  # 입출력 토큰 수 계산
+
+    ## 최신 토큰 기록
+    st.session_state.token_usage["last_input_tokens"] = input_tokens
+    st.session_state.token_usage["last_output_tokens"] = output_tokens
+    st.session_state.token_usage["last_total_tokens"] = total_tokens
+    st.session_state.token_usage["last_model_id"] = model_id
+
+    ## 누적 토큰 기록 (사용자·앱별, 새로고침이나 서버 재시작 후에도 유지)
+    record_usage(model_id, {"input_tokens": input_tokens, "output_tokens": output_tokens})
+
+
+def get_response_from_bedrock(messages, max_tokens=MAX_TOKENS):
     """
     Bedrock 모델에 대화 히스토리를 기반으로 요청을 보내고 응답을 받는 함수
     :param messages: 대화 히스토리 (role, content 형태의 리스트)
+    :param max_tokens: 응답의 최대 토큰 수 (남은 예산에 맞춰 줄어들 수 있음)
     :return: 모델의 응답 텍스트
     """
     try:
@@ -34,15 +116,17 @@ def get_response_from_bedrock(messages):
         body = json.dumps(
             {
                 "anthropic_version": "bedrock-2023-05-31",  # 모델 버전
-                "max_tokens": 1000,  # 응답의 최대 토큰 수
+                "max_tokens": max_tokens,  # 응답의 최대 토큰 수
                 "messages": messages,  # 대화 히스토리 전달
             }
         )
 
-        # Bedrock 모델 호출
-        response = bedrock_runtime.invoke_model(
-            modelId="anthropic.claude-3-haiku-20240307-v1:0",
-            body=body,  # 요청 본문
+        # Bedrock 모델 호출 (라우터가 고른 모델, 실패하면 다음 모델로 다시 호출)
+        response, model_id = model_router.invoke_model(
+            bedrock_runtime,
+            body,  # 요청 본문
+            estimate_request_tokens(messages),  # 입력 추정 토큰 수 (모델 선택에 사용)
+            max_tokens,
         )
         response_body = json.loads(response.get("body").read())  # 응답 본문 파싱
 
@@ -58,94 +142,251 @@ def get_response_from_bedrock(messages):
 
         input_tokens = FILL_ME_IN  # 입력 토큰 수 추출
         output_tokens = FILL_ME_IN  # 출력 토큰 수 추출
-        total_tokens = input_tokens + output_tokens  # 입출력 토큰 수 계산
 
         # 세션 상태에 토큰 사용량 업데이트
-
-        ## 최신 토큰 기록
-        st.session_state.token_usage["last_input_tokens"] = input_tokens
-        st.session_state.token_usage["last_output_tokens"] = output_tokens
-        st.session_state.token_usage["last_total_tokens"] = total_tokens
-
-        ## 누적 토큰 기록
-        st.session_state.token_usage["input_tokens"] += input_tokens
-        st.session_state.token_usage["output_tokens"] += output_tokens
-        st.session_state.token_usage["total_tokens"] += total_tokens
+        update_token_usage(input_tokens, output_tokens, model_id)
 
         return output_text
+    except CircuitOpenError as e:
+        # 오류가 잇따라 호출을 잠시 멈춘 경우: 엔드포인트가 회복될 때까지 안내 문구로 대신 응답
+        st.warning(str(e))
+        return BUSY_RESPONSE
     except Exception as e:
         # 오류 발생 시 사용자에게 알림
         st.error(f"Bedrock과 통신 중 에러 발생: {str(e)}")
         return "응답 생성 중 에러 발생"
 
 
-# 화면 상단에 st.metric으로 토큰 사용량 표시
-header, button = st.columns(2)
-with header:
-    st.subheader("토큰 사용량 확인", divider="rainbow")
-with button:
-    if st.button("토큰 사용량 새로고침"):
-        st.rerun()
-
-current, total = st.tabs(["최신", "누적"])
-with current:
-    input_token, output_token, all_token = st.columns(3)
-    with input_token:
-        st.metric(
-            label="최근 입력 토큰 수",
-            value=st.session_state.token_usage["last_input_tokens"],
-        )
-    with output_token:
-        st.metric(
-            label="최근 출력 토큰 수",
-            value=st.session_state.token_usage["last_output_tokens"],
-        )
-    with all_token:
-        st.metric(
-            label="최근 입출력 토큰 수",
-            value=st.session_state.token_usage["last_total_tokens"],
+def stream_response_from_bedrock(messages, max_tokens=MAX_TOKENS):
+    """
+    Bedrock 스트리밍 API로 응답을 받아 텍스트 조각을 차례로 돌려주는 제너레이터
+    st.write_stream 에 전달하면 응답이 도착하는 대로 화면에 표시됩니다.
+    :param messages: 대화 히스토리 (role, content 형태의 리스트)
+    :param max_tokens: 응답의 최대 토큰 수 (남은 예산에 맞춰 줄어들 수 있음)
+    :return: 모델 응답 텍스트 조각
+    """
+    try:
+        body = json.dumps(
+            {
+                "anthropic_version": "bedrock-2023-05-31",  # 모델 버전
+                "max_tokens": max_tokens,  # 응답의 최대 토큰 수
+                "messages": messages,  # 대화 히스토리 전달
+            }
         )
-with total:
-    total_input_token, total_output_token, total_all_token = st.columns(3)
-    with total_input_token:
-        st.metric(
-            label="누적 입력 토큰 수",
-            value=st.session_state.token_usage["input_tokens"],
+
+        # Bedrock 스트리밍 호출 - 응답 전체를 기다리지 않고 이벤트를 순서대로 받음
+        response, model_id = model_router.invoke_model_with_response_stream(
+            bedrock_runtime,
+            body,  # 요청 본문
+            estimate_request_tokens(messages),  # 입력 추정 토큰 수 (모델 선택에 사용)
+            max_tokens,
         )
-    with total_output_token:
-        st.metric(
-            label="누적 출력 토큰 수",
-            value=st.session_state.token_usage["output_tokens"],
+
+        usage = new_usage()  # 스트림이 끝나면 토큰 수가 채워짐
+        yield from iter_stream_text(response, usage)
+
+        # 스트림 마지막 이벤트의 usage 로 토큰 사용량 업데이트
+        update_token_usage(usage["input_tokens"], usage["output_tokens"], model_id)
+    except CircuitOpenError as e:
+        st.warning(str(e))
+        yield BUSY_RESPONSE
+    except Exception as e:
+        # 오류 발생 시 사용자에게 알림
+        st.error(f"Bedrock과 통신 중 에러 발생: {str(e)}")
+        yield "응답 생성 중 에러 발생"
+
+
+def summarize_history(previous_summary, messages):
+    """
+    윈도우 밖으로 밀려난 대화를 기존 요약과 합쳐 새 요약으로 만드는 함수
+    :param previous_summary: 지금까지의 요약 (없으면 빈 문자열)
+    :param messages: 새로 요약에 반영할 메시지 리스트
+    :return: 새 요약 텍스트, 실패하면 None (요약하지 못한 메시지는 다음 질문 때 다시 요약)
+    """
+    conversation = "\n".join(
+        f"{message['role']}: {message['content']}" for message in messages
+    )
+    prompt = f"""다음은 의료 상담 챗봇의 이전 대화 요약과 이어지는 대화입니다.
+이후 대화에 필요한 사실, 환자 정보, 결정 사항을 빠짐없이 담아 5문장 이내로 요약해주세요.
+
+[기존 요약]
+{previous_summary or "(없음)"}
+
+[이어지는 대화]
+{conversation}
+
+요약만 작성해주세요:"""
+
+    try:
+        body = json.dumps(
+            {
+                "anthropic_version": "bedrock-2023-05-31",
+                "max_tokens": 300,  # 요약은 짧게
+                "messages": [
+                    {"role": "user", "content": [{"type": "text", "text": prompt}]}
+                ],
+            }
         )
-    with total_all_token:
-        st.metric(
-            label="누적 입출력 토큰 수",
-            value=st.session_state.token_usage["total_tokens"],
+        response, model_id = model_router.invoke_model(
+            bedrock_runtime,
+            body,
+            estimate_request_tokens([{"role": "user", "content": prompt}]),
+            300,
         )
+        response_body = json.loads(response.get("body").read())
+        record_usage(model_id, response_body["usage"])  # 요약 호출도 누적 사용량에 포함
+        return response_body["content"][0]["text"].strip()
+    except Exception as e:
+        st.warning(f"이전 대화 요약에 실패하여 기존 요약을 사용하고 다음 질문 때 다시 요약합니다: {str(e)}")
+        return None
+
+
+# 화면 상단에 st.metric으로 토큰 사용량 표시
+# 자리만 먼저 잡아 두고, 응답 처리가 끝난 뒤 (스크립트 맨 아래에서) 최신 값으로 채움
+token_panel_area = st.container()
+
+
+@st.fragment
+def token_panel():
+    """
+    토큰 사용량 패널 조각 - 새로고침하면 이 패널만 다시 실행됨
+    """
+    with profiler.fragment("6.chatbot-v2", "-", "토큰 사용량"):
+        header, button = st.columns(2)
+        with header:
+            st.subheader("토큰 사용량 확인", divider="rainbow")
+        with button:
+            # 조각 안의 버튼이므로 누르면 이 패널만 다시 실행됨 (대화 기록은 다시 그리지 않음)
+            st.button("토큰 사용량 새로고침")
+
+        current, total = st.tabs(["최신", "누적 (최근 24시간)"])
+        with current:
+            input_token, output_token, all_token, saved_token = st.columns(4)
+            with input_token:
+                st.metric(
+                    label="최근 입력 토큰 수",
+                    value=st.session_state.token_usage["last_input_tokens"],
+                )
+            with output_token:
+                st.metric(
+                    label="최근 출력 토큰 수",
+                    value=st.session_state.token_usage["last_output_tokens"],
+                )
+            with all_token:
+                st.metric(
+                    label="최근 입출력 토큰 수",
+                    value=st.session_state.token_usage["last_total_tokens"],
+                )
+            with saved_token:
+                st.metric(
+                    label="최근 절약 토큰 수 (추정)",
+                    value=st.session_state.token_usage["last_saved_tokens"],
+                )
+            st.caption(
+                f"🧭 최근 응답 모델: {st.session_state.token_usage.get('last_model_id', '-')}"
+            )
+        with total:
+            # 이 사용자가 이 앱에서 최근 24시간 동안 사용한 양 (공용 장부에서 조회)
+            app, user = current_caller()
+            usage = get_usage_ledger().totals(app=app, user=user)[0]
+            (
+                total_input_token,
+                total_output_token,
+                total_all_token,
+                total_cost,
+                total_saved_token,
+            ) = st.columns(5)
+            with total_input_token:
+                st.metric(label="누적 입력 토큰 수", value=usage["input_tokens"])
+            with total_output_token:
+                st.metric(label="누적 출력 토큰 수", value=usage["output_tokens"])
+            with total_all_token:
+                st.metric(label="누적 입출력 토큰 수", value=usage["total_tokens"])
+            with total_cost:
+                st.metric(label="예상 비용 (USD)", value=format_cost(usage))
+            with total_saved_token:
+                st.metric(
+                    label="누적 절약 토큰 수 (추정)",
+                    value=st.session_state.token_usage["saved_tokens"],
+                )
+
 
 st.divider()
 st.subheader("챗봇 🤖 💬", divider="rainbow")
 
-# 저장된 대화 히스토리 표시
-for message in st.session_state.messages:
-    with st.chat_message(message["role"]):  # 메시지 역할에 따른 채팅 버블 생성
-        st.markdown(message["content"])  # 메시지 내용을 마크다운으로 렌더링
+# 저장된 대화 히스토리 표시 (최근 메시지만, 이전 메시지는 버튼을 눌러 더 불러옴)
+with profiler.section("대화 기록 표시"):
+    render_history(chat_store, conversation_id)
 
 # 사용자 입력 처리
 if prompt := st.chat_input("Message Bedrock..."):  # 사용자 입력을 받음
-    # 사용자 메시지를 세션 상태에 추가
-    st.session_state.messages.append({"role": "user", "content": prompt})
+    # 사용자 메시지를 대화 기록에 추가
+    try:
+        chat_store.append(conversation_id, "6.chatbot-v2", "user", prompt, chat_owner)
+    except PermissionError:
+        leave_foreign_conversation()  # 다른 사용자의 대화면 오류를 표시하고 새 대화로 바꿈
+        st.stop()
 
     # 사용자 메시지를 화면에 표시
     with st.chat_message("user"):
         st.markdown(prompt)  # 입력 메시지를 마크다운 형식으로 렌더링
 
+    # 토큰 예산에 맞게 히스토리를 압축하고 절약한 토큰 수를 기록
+    # (전체 대화는 메시지를 보낼 때만 저장소에서 읽음, 요약은 대화별로 저장)
+    with profiler.section("히스토리 압축"):
+        history, report = compact_history(
+            chat_store.messages(conversation_id),
+            budget=history_budget,
+            policy=history_policy,
+            pin_first=pin_first_message,
+            summary_state=st.session_state.history_summary,
+            summarize=summarize_history,
+        )
+        chat_store.save_state(
+            conversation_id, {"history_summary": st.session_state.history_summary}
+        )
+    st.session_state.token_usage["last_saved_tokens"] = report["saved_tokens"]
+    st.session_state.token_usage["saved_tokens"] += report["saved_tokens"]
+
+    # 보내기 전에 입력 토큰을 추정하여 모델 컨텍스트를 넘지 않도록 자르고,
+    # 최근 24시간 예산이 설정되어 있으면 남은 예산에 맞춰 max_tokens 를 줄임
+    try:
+        history, preflight_report = preflight(history, MAX_TOKENS, model_router.widest_model_id())
+        if preflight_report["trimmed_messages"]:
+            st.caption(
+                f"✂️ 모델 입력 한도를 넘지 않도록 오래된 메시지 "
+                f"{preflight_report['trimmed_messages']}개를 빼고 보냅니다."
+            )
+    except TokenBudgetExceeded as e:
+        st.error(str(e))
+        history, preflight_report = None, None
+
     # Bedrock에 대화 히스토리를 전달하여 응답 생성
-    with st.chat_message("assistant"):
-        response = get_response_from_bedrock(
-            st.session_state.messages
-        )  # 전체 히스토리 전달
-        st.markdown(response)  # 모델 응답을 화면에 표시
-
-    # 모델의 응답을 대화 히스토리에 추가
-    st.session_state.messages.append({"role": "assistant", "content": response})
+    with st.chat_message("assistant"), profiler.section("모델 응답"):
+        if history is None:
+            response = "토큰 예산을 초과하여 응답을 생성하지 않았습니다."
+            st.markdown(response)
+        elif use_streaming:
+            # 응답이 도착하는 대로 표시하고, 완성된 전체 텍스트를 돌려받음
+            response = st.write_stream(
+                stream_response_from_bedrock(history, preflight_report["max_tokens"])
+            )
+        else:
+            response = get_response_from_bedrock(
+                history, preflight_report["max_tokens"]
+            )  # 압축된 히스토리 전달
+            st.markdown(response)  # 모델 응답을 화면에 표시
+
+    # 모델의 응답을 대화 기록에 추가
+    try:
+        chat_store.append(conversation_id, "6.chatbot-v2", "assistant", response, chat_owner)
+    except PermissionError:
+        leave_foreign_conversation()
+
+# 이번 응답까지 반영된 토큰 사용량을 상단 자리에 표시
+with token_panel_area:
+    token_panel()
+
+# 재실행 비용 측정 종료 및 사이드바 패널 표시
+profiler.end_rerun()
+profiler.render_panel("6.chatbot-v2")
@@ -0,0 +1,313 @@
+"""
+로컬 bedrock-runtime mock 서버(common.mock_bedrock)를 대상으로 한 Bedrock 호출 부하 테스트
+공유 클라이언트(common.bedrock.get_bedrock_client)를 BEDROCK_ENDPOINT_URL 로 mock 서버에 연결하여
+실제와 같은 boto3 경로(커넥션 풀, adaptive 재시도, 이벤트 스트림 파싱)로 요청을 보냅니다.
+
+시나리오
+- chat: 6.chatbot-v2.py 의 get_response_from_bedrock 과 같은 요청 (invoke_model, 대화 히스토리 전달)
+- chat-stream: 6.chatbot-v2.py 의 스트리밍 응답 경로 (invoke_model_with_response_stream + common.streaming)
+- guidance: 환자 안내 메시지 생성 (common.guidance.generate_guidance, 응답 캐시 없이)
+
+동시 요청 수별로 처리량, 지연 시간 백분위, 첫 토큰 시간(스트리밍), 오류, 스로틀링 횟수,
+mock 서버가 실제로 받은 요청 수, 토큰 수와 예상 비용을 출력합니다.
+
+--clients 로 호출 경로를 고릅니다.
+- direct: 공유 boto3 클라이언트를 직접 호출
+- async: 비동기 클라이언트 계층(common.async_bedrock)을 거쳐 호출 (같은 요청 합류, 동시 호출 수 제한,
+  스로틀링에 맞춘 속도 조절·재시도·차단기), 줄마다 보호 장치 현황(누적)을 함께 출력
+  guidance 시나리오는 연령대가 같은 요청의 본문이 같으므로 동시에 들어오면 하나로 합쳐짐
+(get_response_from_bedrock 은 실습용 빈칸이 있는 앱 스크립트 안의 함수라 요청 형식을 그대로 옮겨 사용)
+
+실행 예)
+    python benchmarks/bedrock_load.py --concurrency 8 32 128 --requests 128
+    python benchmarks/bedrock_load.py --scenarios chat-stream --max-concurrency 16 --throttle-rate 0.05
+    python benchmarks/bedrock_load.py --scenarios guidance --clients direct async
+    python benchmarks/bedrock_load.py --scenarios chat-stream --clients direct async --throttle-rate 0.9
+"""
+
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.server_loadtest import free_port, percentile  # noqa: E402
+from common.accounting import estimate_cost  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHAT_MODEL_ID = "anthropic.claude-3-haiku-20240307-v1:0"
+
+SCENARIOS = ("chat", "chat-stream", "guidance")
+
+
+def chat_messages(turns):
+    """
+    turns 번 주고받은 뒤 새 질문을 하는 대화 히스토리를 만드는 함수
+    """
+    messages = []
+    for turn in range(turns):
+        messages.append({"role": "user", "content": f"{turn + 1}번째 질문입니다. 혈압약은 언제 먹나요?"})
+        messages.append(
+            {"role": "assistant", "content": "아침 식사 후 같은 시간에 복용하시는 것이 좋습니다. " * 3}
+        )
+    messages.append({"role": "user", "content": "운동은 어느 정도 해도 되나요?"})
+    return messages
+
+
+def chat_body(messages):
+    # 6.chatbot-v2.py 의 get_response_from_bedrock / stream_response_from_bedrock 과 같은 요청 본문
+    return json.dumps(
+        {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": 1000,
+            "messages": messages,
+        }
+    )
+
+
+def run_chat(client, index, messages):
+    started = time.perf_counter()
+    response = client.invoke_model(modelId=CHAT_MODEL_ID, body=chat_body(messages))
+    response_body = json.loads(response.get("body").read())
+    usage = response_body["usage"]
+    return {
+        "latency": time.perf_counter() - started,
+        "ttft": None,
+        "input_tokens": usage["input_tokens"],
+        "output_tokens": usage["output_tokens"],
+    }
+
+
+def run_chat_stream(client, index, messages):
+    from common.streaming import iter_stream_text, new_usage
+
+    started = time.perf_counter()
+    response = client.invoke_model_with_response_stream(
+        modelId=CHAT_MODEL_ID, body=chat_body(messages)
+    )
+    usage = new_usage()
+    ttft = None
+    for _ in iter_stream_text(response, usage):
+        if ttft is None:
+            ttft = time.perf_counter() - started
+    return {
+        "latency": time.perf_counter() - started,
+        "ttft": ttft,
+        "input_tokens": usage["input_tokens"],
+        "output_tokens": usage["output_tokens"],
+    }
+
+
+def run_guidance(client, index, messages):
+    from common.guidance import generate_guidance
+
+    started = time.perf_counter()
+    _, info = generate_guidance(
+        client,
+        f"환자{index}",
+        30 + index % 50,
+        "고혈압",
+        "두통, 어지러움",
+        "혈압약 복용, 저염식",
+        cache=None,  # 응답 캐시 없이 매번 모델 호출
+    )
+    usage = info["usage"]
+    return {
+        "latency": time.perf_counter() - started,
+        "ttft": None,
+        "input_tokens": usage["input_tokens"] + usage["cache_read_input_tokens"],
+        "output_tokens": usage["output_tokens"],
+    }
+
+
+RUNNERS = {"chat": run_chat, "chat-stream": run_chat_stream, "guidance": run_guidance}
+
+
+def run_load(client, scenario, concurrency, requests, messages):
+    """
+    concurrency 개 스레드가 모두 합쳐 requests 번 호출하는 함수
+    :return: (걸린 시간(초), 성공 결과 리스트, 오류 코드 Counter)
+    """
+    runner = RUNNERS[scenario]
+    results = []
+    errors = Counter()
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def worker():
+        while True:
+            with lock:
+                index = next(counter, None)
+            if index is None:
+                return
+            try:
+                result = runner(client, index, messages)
+            except Exception as e:
+                code = getattr(e, "response", {}).get("Error", {}).get("Code") or type(e).__name__
+                with lock:
+                    errors[code] += 1
+                continue
+            with lock:
+                results.append(result)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, results, errors
+
+
+def server_stats(port):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    connection.request("GET", "/stats")
+    return json.loads(connection.getresponse().read())
+
+
+def start_mock_server(port, args):
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "common.mock_bedrock",
+            "--port", str(port),
+            "--first-token-latency", str(args.first_token_latency),
+            "--tokens-per-second", str(args.tokens_per_second),
+            "--reply-tokens", str(args.reply_tokens),
+            "--throttle-rate", str(args.throttle_rate),
+            "--max-concurrency", str(args.max_concurrency),
+        ],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            server_stats(port)
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("mock 서버가 시작되지 않았습니다.")
+
+
+def run_row(port, client, label, scenario, concurrency, requests, messages):
+    """
+    시나리오 하나를 concurrency 개 동시 요청으로 실행하고 결과 한 줄을 출력하는 함수
+    :param label: 줄 앞에 붙일 시나리오·경로 이름
+    """
+    before = server_stats(port)
+    elapsed, results, errors = run_load(client, scenario, concurrency, requests, messages)
+    after = server_stats(port)
+    throttled = after["throttled"] - before["throttled"]
+    upstream = after["requests"] - before["requests"]  # mock 서버가 실제로 받은 요청 수 (재시도 포함)
+
+    latencies = [result["latency"] for result in results]
+    ttfts = [result["ttft"] for result in results if result["ttft"] is not None]
+    input_tokens = sum(result["input_tokens"] for result in results)
+    output_tokens = sum(result["output_tokens"] for result in results)
+    cost_per_1k = (
+        estimate_cost(
+            {"input_tokens": input_tokens, "output_tokens": output_tokens}, CHAT_MODEL_ID
+        )
+        / len(results)
+        * 1000
+        if results
+        else 0.0
+    )
+    ttft = f"{percentile(ttfts, 0.5) * 1000:.0f}" if ttfts else "-"
+    print(
+        f"{label}{concurrency:>5}{len(results):>6}{sum(errors.values()):>6}"
+        f"{len(results) / elapsed:>9.1f}"
+        f"{percentile(latencies, 0.5) * 1000:>9.0f}"
+        f"{percentile(latencies, 0.95) * 1000:>9.0f}"
+        f"{percentile(latencies, 0.99) * 1000:>9.0f}"
+        f"{ttft:>10}{throttled:>9}{upstream:>9}{input_tokens:>10,}{output_tokens:>10,}"
+        f"{cost_per_1k:>13.4f}"
+    )
+    if errors:
+        print(f"{'':<19}오류: {dict(errors)}")
+    if hasattr(client, "limiter"):
+        stats = client.stats()
+        print(
+            f"{'':<19}보호 장치: 허용 속도 {stats['limiter']['rate']:.1f}/초 · 재시도 {stats['retries']}회 · "
+            f"차단 {stats['breaker']['opened']}회 · 차단으로 거절 {stats['breaker']['rejected']}건 · "
+            f"대체 응답 {stats['fallback']}건 · 차단기 {stats['breaker']['state']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="mock bedrock-runtime 서버 대상 부하 테스트")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--requests", type=int, default=128, help="시나리오·동시 요청 수마다 보낼 요청 수")
+    parser.add_argument("--history-turns", type=int, default=6, help="chat 시나리오의 이전 대화 수")
+    parser.add_argument(
+        "--clients", nargs="+", choices=("direct", "async"), default=["direct"], help="호출 경로"
+    )
+    mock = parser.add_argument_group("mock 서버 설정")
+    mock.add_argument("--first-token-latency", type=float, default=0.3)
+    mock.add_argument("--tokens-per-second", type=float, default=80.0)
+    mock.add_argument("--reply-tokens", type=int, default=120)
+    mock.add_argument("--throttle-rate", type=float, default=0.0)
+    mock.add_argument("--max-concurrency", type=int, default=0)
+    args = parser.parse_args()
+
+    port = free_port()
+    server = start_mock_server(port, args)
+
+    # 공유 클라이언트가 mock 서버에 연결하도록 설정 (서명용 자격 증명은 아무 값이나 사용)
+    os.environ.pop("BEDROCK_FAKE", None)
+    os.environ["BEDROCK_ENDPOINT_URL"] = f"http://127.0.0.1:{port}"
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "mock")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "mock")
+    os.environ.setdefault("BEDROCK_MAX_POOL_CONNECTIONS", str(max(20, max(args.concurrency))))
+    # guidance 시나리오의 사용량과 라우팅 기록이 앱의 기록에 섞이지 않도록 임시 파일에 기록
+    data_dir = tempfile.mkdtemp()
+    os.environ["TOKEN_USAGE_DB"] = os.path.join(data_dir, "token_usage.sqlite")
+    os.environ["MODEL_ROUTING_DB"] = os.path.join(data_dir, "model_routing.sqlite")
+
+    from common.async_bedrock import get_async_bedrock_client
+    from common.bedrock import get_bedrock_client
+
+    clients = {"direct": get_bedrock_client, "async": get_async_bedrock_client}
+    messages = chat_messages(args.history_turns)
+
+    print(
+        f"mock: 첫 토큰 {args.first_token_latency}s · {args.tokens_per_second:g} 토큰/초 · "
+        f"응답 {args.reply_tokens} 토큰 · 스로틀링 확률 {args.throttle_rate:g} · "
+        f"최대 동시 {args.max_concurrency or '제한 없음'}"
+    )
+    print(
+        f"{'시나리오':<12}{'경로':<7}{'동시':>5}{'성공':>6}{'오류':>6}{'요청/초':>9}{'p50(ms)':>9}{'p95(ms)':>9}"
+        f"{'p99(ms)':>9}{'TTFT p50':>10}{'스로틀링':>9}{'실제 호출':>9}{'입력 토큰':>10}{'출력 토큰':>10}{'비용($/1k건)':>13}"
+    )
+    try:
+        run_load(get_bedrock_client(), "chat", 4, 8, messages)  # 워밍업 (커넥션 생성)
+        for scenario in args.scenarios:
+            for client_name in args.clients:
+                for concurrency in args.concurrency:
+                    run_row(
+                        port,
+                        clients[client_name](),
+                        f"{scenario:<12}{client_name:<7}",
+                        scenario,
+                        concurrency,
+                        args.requests,
+                        messages,
+                    )
+
+    finally:
+        server.terminate()
+        server.wait(30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+대화 기록 저장소(common.chat_store)의 대화 길이별 비용을 측정합니다.
+1) 저장소 작업: 메시지 추가, 최근 한 페이지 읽기, 전체 대화 읽기(메시지를 보낼 때만 사용)
+2) 6.chatbot-v2.py 재실행 시간: 대화 N개가 쌓인 세션에서 스크립트 전체 재실행 (AppTest)
+
+세션 상태 리스트에 대화를 두던 이전 버전과 비교하려면 --before 로 이전 앱 파일을 지정합니다.
+    git show <이전 커밋>:6.chatbot-v2.py > /tmp/chatbot_before.py
+    python benchmarks/chat_store_bench.py --before /tmp/chatbot_before.py
+
+실행: python benchmarks/chat_store_bench.py --lengths 100 1000 10000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.chat_store import OWNER_PARAM, QUERY_PARAM, ChatStore, guest_owner  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APP = "6.chatbot-v2"
+
+# 재실행 측정 세션이 사용하는 소유자 토큰 (로그인하지 않은 사용자)
+OWNER_TOKEN = "0" * 32
+
+
+def sample_messages(count):
+    """
+    질문과 답변이 번갈아 나오는 대화 count 개를 만드는 함수
+    """
+    return [
+        {"role": "user", "content": f"{turn // 2 + 1}번째 질문입니다. 혈압약은 언제 먹나요?"}
+        if turn % 2 == 0
+        else {"role": "assistant", "content": "아침 식사 후 같은 시간에 복용하시는 것이 좋습니다. " * 3}
+        for turn in range(count)
+    ]
+
+
+def seed(store, conversation_id, messages):
+    # 측정 준비용으로 한 트랜잭션에 몰아서 넣음 (추가 비용은 append 로 따로 측정)
+    now = time.time()
+    with store._connect() as conn:
+        conn.execute(
+            "INSERT INTO chat_conversations (id, app, owner, title, turns, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (conversation_id, APP, guest_owner(OWNER_TOKEN), messages[0]["content"], len(messages), now, now),
+        )
+        conn.executemany(
+            "INSERT INTO chat_messages VALUES (?, ?, ?, ?, ?)",
+            [
+                (conversation_id, turn, message["role"], message["content"], now)
+                for turn, message in enumerate(messages, start=1)
+            ],
+        )
+
+
+def per_call_ms(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def print_store_costs(store, lengths, repeat):
+    print("[저장소 작업] 호출당 시간 (ms)")
+    print(f"  {'대화 길이':>10}{'추가':>10}{'최근 페이지':>12}{'메시지 수':>10}{'전체 읽기':>12}")
+    for length in lengths:
+        conversation_id = f"bench-{length}"
+        seed(store, conversation_id, sample_messages(length))
+        append_ms = per_call_ms(
+            lambda: store.append(
+                conversation_id, APP, "user", "추가 질문입니다.", guest_owner(OWNER_TOKEN)
+            ),
+            repeat,
+        )
+        page_ms = per_call_ms(lambda: store.page(conversation_id), repeat)
+        count_ms = per_call_ms(lambda: store.count(conversation_id), repeat)
+        all_ms = per_call_ms(lambda: store.messages(conversation_id), max(1, repeat // 10))
+        print(f"  {length:>10,}{append_ms:>10.3f}{page_ms:>12.3f}{count_ms:>10.3f}{all_ms:>12.3f}")
+
+
+def rerun_ms(app, length, store=None, repeat=3):
+    """
+    대화 length 개가 쌓인 세션에서 앱 스크립트 전체 재실행 시간을 재는 함수
+    :param store: 저장소를 쓰는 앱이면 ChatStore (없으면 세션 상태 리스트에 대화를 넣음)
+    :return: 가장 빠른 재실행 시간 (ms)
+    """
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(app, default_timeout=120)
+    messages = sample_messages(length)
+    if store is None:
+        at.session_state["messages"] = messages
+    else:
+        conversation_id = f"rerun-{length}"
+        seed(store, conversation_id, messages)
+        at.query_params[QUERY_PARAM] = conversation_id
+        at.query_params[OWNER_PARAM] = OWNER_TOKEN
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        at.run()
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best
+
+
+def print_rerun_costs(store, lengths, before):
+    print(f"\n[{APP} 재실행] 스크립트 전체 재실행 시간 (ms)")
+    header = f"  {'대화 길이':>10}{'저장소':>10}"
+    if before:
+        header += f"{'세션 리스트(이전)':>18}"
+    print(header)
+    for length in lengths:
+        row = f"  {length:>10,}{rerun_ms(os.path.join(ROOT, f'{APP}.py'), length, store):>10.0f}"
+        if before:
+            row += f"{rerun_ms(before, length):>18.0f}"
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=200, help="저장소 작업 반복 횟수")
+    parser.add_argument("--before", help="비교할 이전 버전 앱 파일 (세션 상태 리스트 사용)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # 앱(AppTest)과 측정 코드가 같은 임시 저장소를 사용
+        os.environ["CHAT_STORE_DB"] = os.path.join(directory, "chat_history.sqlite")
+        os.environ["BEDROCK_FAKE"] = "1"
+        os.chdir(ROOT)
+        store = ChatStore(os.environ["CHAT_STORE_DB"])
+        print_store_costs(store, args.lengths, args.repeat)
+        print_rerun_costs(store, args.lengths, args.before and os.path.abspath(args.before))
+
+
+if __name__ == "__main__":
+    main()
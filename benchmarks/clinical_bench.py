@@ -0,0 +1,105 @@
+"""
+병동 일괄 계산의 기존 방식(환자 한 명씩 if/elif 로 계산)과 common.clinical 벡터화 방식을 비교합니다.
+두 방식의 결과가 같은지도 함께 확인합니다.
+
+실행: python benchmarks/clinical_bench.py --rows 1000 10000 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import clinical  # noqa: E402
+
+
+def generate_census(rows, seed=42):
+    """
+    가상의 병동 환자 명단을 만드는 함수
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "환자명": [f"환자{i:06d}" for i in range(rows)],
+            clinical.HEIGHT_COLUMN: rng.normal(165, 10, rows).round(1),
+            clinical.WEIGHT_COLUMN: rng.normal(65, 15, rows).clip(30, 200).round(1),
+            clinical.DOSE_PER_KG_COLUMN: rng.choice([5.0, 10.0, 15.0, 20.0], rows),
+            clinical.TIMES_PER_DAY_COLUMN: rng.integers(1, 5, rows),
+        }
+    )
+
+
+def scalar_census(census, threshold=clinical.DAILY_DOSE_THRESHOLD):
+    # 4.medical_demo.py 의 기존 계산기 코드를 환자마다 반복 실행하는 방식
+    rows = []
+    for row in census.to_dict("records"):
+        height_m = row[clinical.HEIGHT_COLUMN] / 100
+        weight = row[clinical.WEIGHT_COLUMN]
+        bmi = weight / (height_m**2)
+        if bmi < 18.5:
+            category = "저체중"
+        elif 18.5 <= bmi < 23:
+            category = "정상"
+        elif 23 <= bmi < 25:
+            category = "과체중"
+        elif 25 <= bmi < 30:
+            category = "비만 1단계"
+        else:
+            category = "비만 2단계 이상"
+        목표_체중 = 22 * (height_m**2)
+        total_dose = weight * row[clinical.DOSE_PER_KG_COLUMN]
+        daily_dose = total_dose * row[clinical.TIMES_PER_DAY_COLUMN]
+        rows.append(
+            {
+                **row,
+                "BMI": round(bmi, 1),
+                "분류": category,
+                "목표 체중(kg)": round(목표_체중, 1),
+                "체중 차이(kg)": round(weight - 목표_체중, 1),
+                "1회 투여량(mg)": round(total_dose, 1),
+                "1일 총 투여량(mg)": round(daily_dose, 1),
+                "용량 경고": daily_dose > threshold,
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def timed(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'환자 수':>10}{'기존(ms)':>12}{'벡터화(ms)':>14}{'배속':>8}  결과 일치")
+    for rows in args.rows:
+        census = generate_census(rows)
+        scalar_time, expected = timed(lambda: scalar_census(census))
+        vector_time, actual = timed(lambda: clinical.calculate_census(census))
+
+        same = (
+            (expected["분류"] == actual["분류"].astype(str)).all()
+            and (expected["용량 경고"] == actual["용량 경고"]).all()
+            and np.allclose(expected["1일 총 투여량(mg)"], actual["1일 총 투여량(mg)"])
+            and np.allclose(expected["목표 체중(kg)"], actual["목표 체중(kg)"])
+        )
+        print(
+            f"{rows:>10,}{scalar_time * 1000:>12.1f}{vector_time * 1000:>14.1f}"
+            f"{scalar_time / vector_time:>8.1f}  {'예' if same else '아니오'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+4.medical_demo.py 의 콜드 스타트 측정
+1) import 비용: 새 파이썬 프로세스에서 앱 파일의 import 문과 각 페이지 모듈을 불러오는 시간 (-X importtime 집계)
+2) 첫 화면: 새 Streamlit 서버를 띄워 서버 준비 시간, 첫 세션의 첫 화면(첫 요소 도착)과 완료 시간,
+   메뉴별 첫 방문 / 다시 방문 재실행 시간을 측정
+
+페이지를 나누기 전 버전과 비교하려면 --app 으로 다른 파일을 지정합니다.
+    git show <이전 커밋>:4.medical_demo.py > /tmp/medical_demo_before.py
+    python benchmarks/cold_start.py --app /tmp/medical_demo_before.py
+
+실행 예)
+    python benchmarks/cold_start.py
+"""
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import time
+
+from websockets.sync.client import connect
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fragment_rerun import Session, start_server  # noqa: E402
+from benchmarks.server_loadtest import free_port  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MENU_LABEL = "메뉴를 선택하세요"
+
+# -X importtime 출력에서 측정 구간 시작을 표시하는 줄
+MARKER = "--- cold start marker ---"
+
+
+def app_imports(app):
+    """
+    앱 파일의 최상위 import 문과 페이지 모듈 목록(PAGES)을 읽는 함수
+    :return: (import 문 소스, {메뉴: 모듈 이름})
+    """
+    with open(app, encoding="utf-8") as app_file:
+        tree = ast.parse(app_file.read())
+    statements = [
+        ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))
+    ]
+    pages = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id == "PAGES" for target in node.targets
+        ):
+            pages = ast.literal_eval(node.value)
+    return "\n".join(statements), pages
+
+
+def import_cost(code, top=3):
+    """
+    새 프로세스에서 streamlit 을 먼저 불러온 뒤 code 를 실행하는 데 걸린 import 시간을 재는 함수
+    (Streamlit 서버 프로세스에는 streamlit 이 이미 올라와 있으므로 그 이후의 비용만 집계)
+    :return: (전체 ms, [(모듈, 누적 ms)] 가장 무거운 최상위 import top 개)
+    """
+    script = f"import sys, streamlit\nsys.stderr.write({MARKER!r} + '\\n')\n{code}\n"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=ROOT,
+        env=dict(os.environ, PYTHONPATH=ROOT),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    lines = result.stderr.split(MARKER, 1)[1].splitlines()
+    total_us = 0
+    top_level = []
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        total_us += int(self_us)
+        # 들여쓰기가 없는 줄이 이번에 직접 불러온 최상위 모듈
+        if name.startswith(" ") and not name.startswith("  "):
+            top_level.append((name.strip(), int(cumulative_us) / 1000))
+    top_level.sort(key=lambda item: -item[1])
+    return total_us / 1000, top_level[:top]
+
+
+def print_import_costs(app):
+    statements, pages = app_imports(app)
+    print("[import 비용] streamlit 을 불러온 뒤 추가로 걸리는 시간")
+    rows = [("앱 파일 import 문", statements)]
+    rows += [(f"페이지: {menu}", f"import {module}") for menu, module in pages.items()]
+    for label, code in rows:
+        total_ms, heaviest = import_cost(code)
+        detail = ", ".join(f"{name} {ms:.0f}" for name, ms in heaviest)
+        print(f"  {label:<24}{total_ms:>8.0f} ms   ({detail})")
+
+
+def print_first_paint(app, menus, revisits):
+    env = dict(os.environ, BEDROCK_FAKE="1", PYTHONPATH=ROOT)
+    port = free_port()
+    started = time.perf_counter()
+    server = start_server(app, port, env)
+    boot_ms = (time.perf_counter() - started) * 1000
+    try:
+        with connect(
+            f"ws://127.0.0.1:{port}/_stcore/stream",
+            subprotocols=["streamlit"],
+            origin=f"http://127.0.0.1:{port}",
+            open_timeout=30,
+            max_size=None,
+        ) as ws:
+            session = Session(ws)
+            elapsed, _ = session.rerun()
+            print("\n[첫 화면] 새 서버 프로세스")
+            print(f"  서버 준비 (/_stcore/health)  {boot_ms:>8.0f} ms")
+            print(f"  첫 세션 첫 화면 (첫 요소)     {session.first_paint * 1000:>8.0f} ms")
+            print(f"  첫 세션 완료 (script_finished) {elapsed * 1000:>7.0f} ms")
+
+            menus = menus or list(session.widgets[MENU_LABEL][0].options)
+            print(f"\n  {'메뉴':<22}{'첫 방문(ms)':>12}{'다시 방문(ms)':>14}")
+            first_visit = {}
+            for menu in menus:
+                session.set(MENU_LABEL, "string_value", menu)
+                first_visit[menu] = session.rerun()[0]
+            for menu in menus:
+                session.set(MENU_LABEL, "string_value", menu)
+                again = min(session.rerun()[0] for _ in range(revisits))
+                print(f"  {menu:<22}{first_visit[menu] * 1000:>12.0f}{again * 1000:>14.0f}")
+    finally:
+        server.terminate()
+        server.wait(30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="4.medical_demo.py 콜드 스타트 측정")
+    parser.add_argument("--app", default=os.path.join(ROOT, "4.medical_demo.py"))
+    parser.add_argument("--menus", nargs="*", help="방문할 메뉴 (기본값: 전체 메뉴)")
+    parser.add_argument("--revisits", type=int, default=3, help="다시 방문 측정 횟수 (최솟값 사용)")
+    args = parser.parse_args()
+
+    app = os.path.abspath(args.app)
+    print(f"앱: {os.path.basename(app)}\n")
+    print_import_costs(app)
+    print_first_paint(app, args.menus, args.revisits)
+
+
+if __name__ == "__main__":
+    main()
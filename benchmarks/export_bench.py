@@ -0,0 +1,61 @@
+"""
+대시보드 데이터 내보내기 방식별 최대 메모리 사용량과 시간을 비교합니다.
+- 기존 방식: to_csv() 로 전체 문자열을 만든 뒤 encode() 로 바이트 사본을 한 번 더 만듦
+- 조각 방식: common.export 로 행을 나눠 임시 파일에 씀 (CSV / gzip CSV / Parquet)
+
+실행: python benchmarks/export_bench.py --rows 2000000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.export import EXPORT_FORMATS, export_file  # noqa: E402
+from common.vitals import generate_cohort  # noqa: E402
+
+
+def measure(func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def in_memory_csv(data):
+    return len(data.to_csv(index=False).encode("utf-8-sig"))
+
+
+def chunked(data, fmt):
+    with export_file(data, fmt) as exported:
+        exported.seek(0, os.SEEK_END)
+        return exported.tell()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    # 1분 간격 31일 = 환자당 44,640행
+    data = generate_cohort(max(1, args.rows // 44_640), freq="min").reset_index(drop=True)
+    print(f"내보낼 데이터: {len(data):,}행\n")
+
+    print(f"{'방식':<22}{'시간(초)':>10}{'최대 메모리(MB)':>18}{'파일 크기(MB)':>16}")
+    cases = [("기존 (to_csv+encode)", lambda: in_memory_csv(data))] + [
+        (f"조각 {EXPORT_FORMATS[fmt][0]}", lambda fmt=fmt: chunked(data, fmt))
+        for fmt in EXPORT_FORMATS
+    ]
+    for name, func in cases:
+        elapsed, peak, size = measure(func)
+        print(f"{name:<22}{elapsed:>10.2f}{peak / 1024**2:>18.1f}{size / 1024**2:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
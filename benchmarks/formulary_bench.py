@@ -0,0 +1,101 @@
+"""
+약물 목록 색인(common.formulary)의 생성 시간과 검색/조회 시간을 측정합니다.
+색인 없이 매번 전체 목록을 훑는 방식과 비교합니다.
+
+실행: python benchmarks/formulary_bench.py --entries 50000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.formulary import (  # noqa: E402
+    DAILY_MAX_COLUMN,
+    ENGLISH_NAME_COLUMN,
+    MAX_DOSE_COLUMN,
+    MIN_DOSE_COLUMN,
+    NAME_COLUMN,
+    Formulary,
+    normalize_name,
+)
+
+SYLLABLES = list("가나다라마바사아자차카타파하고노도로모보소오조초코토포호린신졸틴산민")
+
+
+def generate_table(entries, seed=0):
+    """
+    가상의 약물 목록을 만드는 함수 (이름은 무작위 음절 조합)
+    """
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(3, 8, entries)
+    names = [
+        "".join(rng.choice(SYLLABLES, length)) + f"{i}" for i, length in enumerate(lengths)
+    ]
+    min_dose = rng.uniform(1, 20, entries).round(1)
+    return pd.DataFrame(
+        {
+            NAME_COLUMN: names,
+            ENGLISH_NAME_COLUMN: [f"drug-{i:06d}" for i in range(entries)],
+            MIN_DOSE_COLUMN: min_dose,
+            MAX_DOSE_COLUMN: (min_dose * rng.uniform(1.5, 4, entries)).round(1),
+            DAILY_MAX_COLUMN: rng.choice([500, 1000, 2000, 4000, 6000], entries),
+        }
+    )
+
+
+def linear_search(table, query, limit=10):
+    # 색인 없이 전체 이름을 훑어서 부분 문자열을 찾는 방식
+    key = normalize_name(query)
+    return [name for name in table[NAME_COLUMN] if key in normalize_name(name)][:limit]
+
+
+def linear_lookup(table, name):
+    row = table[table[NAME_COLUMN] == name]
+    return None if row.empty else row.iloc[0][DAILY_MAX_COLUMN]
+
+
+def per_call_ms(func, queries):
+    started = time.perf_counter()
+    for query in queries:
+        func(query)
+    return (time.perf_counter() - started) * 1000 / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    table = generate_table(args.entries)
+    started = time.perf_counter()
+    formulary = Formulary(table)
+    build_ms = (time.perf_counter() - started) * 1000
+    print(f"약물 {args.entries:,}개 · 색인 생성 {build_ms:,.0f} ms (프로세스당 한 번)\n")
+
+    rng = np.random.default_rng(1)
+    names = table[NAME_COLUMN].to_numpy()[rng.integers(0, len(table), args.queries)]
+    prefixes = [name[:2] for name in names]
+    fragments = [name[1:4] for name in names]
+
+    print(f"{'작업':<22}{'색인(ms)':>10}{'전체 탐색(ms)':>16}")
+    cases = [
+        ("접두어 검색 (2글자)", formulary.search, lambda q: linear_search(table, q), prefixes),
+        ("부분 검색 (3글자)", formulary.search, lambda q: linear_search(table, q), fragments),
+        ("최대 투여량 조회", formulary.lookup, lambda q: linear_lookup(table, q), names),
+    ]
+    for label, indexed, linear, queries in cases:
+        print(
+            f"{label:<22}{per_call_ms(indexed, queries):>10.3f}"
+            f"{per_call_ms(linear, queries):>16.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+st.fragment 부분 재실행과 전체 재실행의 지연 시간 비교
+Streamlit 서버를 띄우고 브라우저 대신 WebSocket(/_stcore/stream)으로 위젯 값을 바꿔 재실행을 요청합니다.
+같은 위젯 변경을 전체 재실행(fragment_id 없음)과 조각 재실행(fragment_id 지정)으로 각각 보내
+script_finished 까지 걸린 시간과 받은 메시지 크기를 출력합니다.
+
+- dashboard: 4.medical_demo.py 환자 데이터 대시보드에서 종료일 변경
+- chatbot: 6.chatbot-v2.py 에서 대화를 채운 뒤 "토큰 사용량 새로고침" 클릭
+
+조각이 없는 이전 버전 앱과 비교하려면 --app 으로 다른 파일을 지정합니다. (조각 재실행은 건너뜀)
+    git show <이전 커밋>:4.medical_demo.py > /tmp/medical_demo_before.py
+    python benchmarks/fragment_rerun.py dashboard --app /tmp/medical_demo_before.py
+
+실행 예)
+    python benchmarks/fragment_rerun.py dashboard --patients 1000
+    python benchmarks/fragment_rerun.py chatbot --messages 40
+"""
+
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from websockets.sync.client import connect
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.server_loadtest import free_port, percentile  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "dashboard": "4.medical_demo.py",
+    "chatbot": "6.chatbot-v2.py",
+}
+
+
+class Session:
+    """
+    브라우저 한 탭처럼 위젯 값을 기억해 두고 재실행을 요청하는 가상 세션
+    """
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets = {}  # 라벨 -> (위젯 proto, 조각 id)
+        self.states = {}  # 위젯 id -> (값 종류, 값)
+        self.first_paint = None  # 마지막 재실행에서 첫 화면 요소를 받기까지 걸린 시간 (초)
+
+    def set(self, label, value_type, value):
+        self.states[self.widgets[label][0].id] = (value_type, value)
+
+    def rerun(self, fragment_id="", trigger=None):
+        """
+        재실행을 요청하고 끝날 때까지 기다리는 함수
+        :param fragment_id: 조각 id (비우면 전체 재실행)
+        :param trigger: 이번 재실행에만 보낼 (라벨, 값 종류, 값) - 버튼, 채팅 입력
+        :return: (걸린 시간(초), 받은 바이트 수)
+        """
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        message.rerun_script.page_script_hash = ""
+        message.rerun_script.fragment_id = fragment_id
+        states = dict(self.states)
+        if trigger is not None:
+            label, value_type, value = trigger
+            states[self.widgets[label][0].id] = (value_type, value)
+        for widget_id, (value_type, value) in states.items():
+            widget = message.rerun_script.widget_states.widgets.add()
+            widget.id = widget_id
+            if value_type == "string_array_value":
+                widget.string_array_value.data.extend(value)
+            elif value_type == "chat_input_value":
+                widget.chat_input_value.data = value
+            else:
+                setattr(widget, value_type, value)
+
+        started = time.perf_counter()
+        self.ws.send(message.SerializeToString())
+        received = 0
+        self.first_paint = None
+        while True:
+            data = self.ws.recv(timeout=120)
+            received += len(data)
+            forward = ForwardMsg()
+            forward.ParseFromString(data)
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and self.first_paint is None:
+                self.first_paint = time.perf_counter() - started
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                proto = getattr(element, element.WhichOneof("type"))
+                label = getattr(proto, "label", None) or getattr(proto, "placeholder", None)
+                if label and getattr(proto, "id", None):
+                    self.widgets[label] = (proto, forward.delta.fragment_id)
+            elif kind == "script_finished" and (
+                forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN
+            ):
+                return time.perf_counter() - started, received
+
+
+def start_server(app, port, env):
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", app,
+            "--server.port", str(port),
+            "--server.headless", "true",
+            "--browser.gatherUsageStats", "false",
+        ],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/_stcore/health")
+            if connection.getresponse().status == 200:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.3)
+    server.kill()
+    raise RuntimeError("Streamlit 서버가 시작되지 않았습니다.")
+
+
+def prepare_dashboard(session, args):
+    """
+    대시보드 페이지와 데이터를 선택하고, 매번 바꿀 종료일 위젯 정보를 돌려주는 함수
+    """
+    session.rerun()
+    session.set("메뉴를 선택하세요", "string_value", "환자 데이터 대시보드")
+    session.rerun()
+    if args.patients:
+        session.set("데이터 선택", "string_value", "코호트 (Parquet)")
+        session.rerun()
+
+    widget, fragment_id = session.widgets["종료일"]
+    last = date.fromisoformat(widget.default[0].replace("/", "-"))
+    values = [[str(last - timedelta(days=days % 7))] for days in range(args.repeat)]
+
+    def change(index):
+        session.set("종료일", "string_array_value", values[index])
+        return None
+
+    return change, fragment_id
+
+
+def prepare_chatbot(session, args):
+    """
+    대화를 채운 뒤 "토큰 사용량 새로고침" 버튼 정보를 돌려주는 함수
+    """
+    session.rerun()
+    for turn in range(args.messages):
+        session.rerun(trigger=("Message Bedrock...", "chat_input_value", f"질문 {turn + 1}"))
+
+    _, fragment_id = session.widgets["토큰 사용량 새로고침"]
+
+    def change(index):
+        return ("토큰 사용량 새로고침", "trigger_value", True)
+
+    return change, fragment_id
+
+
+def measure(session, change, fragment_id, repeat):
+    latencies, sizes = [], []
+    for index in range(repeat):
+        elapsed, received = session.rerun(fragment_id, trigger=change(index))
+        latencies.append(elapsed)
+        sizes.append(received)
+    return latencies, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="st.fragment 부분 재실행과 전체 재실행 비교")
+    parser.add_argument("scenario", choices=list(SCENARIOS))
+    parser.add_argument("--app", help="측정할 앱 파일 (기본값: 시나리오의 앱)")
+    parser.add_argument("--patients", type=int, default=1000, help="대시보드 코호트 환자 수 (0: 단일 환자 샘플)")
+    parser.add_argument("--messages", type=int, default=40, help="챗봇에 미리 채울 질문 수")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    app = os.path.abspath(args.app or os.path.join(ROOT, SCENARIOS[args.scenario]))
+    env = dict(os.environ, BEDROCK_FAKE="1", PYTHONPATH=ROOT)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.scenario == "dashboard" and args.patients:
+            from common import vitals
+
+            cohort_path = os.path.join(workdir, "cohort.parquet")
+            vitals.write_cohort_parquet(vitals.generate_cohort(args.patients), cohort_path)
+            env["VITALS_COHORT_PATH"] = cohort_path
+
+        port = free_port()
+        server = start_server(app, port, env)
+        try:
+            with connect(
+                f"ws://127.0.0.1:{port}/_stcore/stream",
+                subprotocols=["streamlit"],
+                origin=f"http://127.0.0.1:{port}",
+                open_timeout=30,
+                max_size=None,
+            ) as ws:
+                run_scenario(Session(ws), args, app)
+        finally:
+            server.terminate()
+            server.wait(30)
+
+
+def run_scenario(session, args, app):
+    prepare = prepare_dashboard if args.scenario == "dashboard" else prepare_chatbot
+    change, fragment_id = prepare(session, args)
+    measure(session, change, "", 3)  # 워밍업
+
+    print(f"앱: {os.path.basename(app)} · 시나리오 {args.scenario} · {args.repeat}회")
+    print(f"{'재실행 범위':<14}{'p50(ms)':>10}{'p95(ms)':>10}{'수신(KB)':>10}")
+    scopes = [("전체", "")]
+    if fragment_id:
+        scopes.append(("조각", fragment_id))
+    else:
+        print("(이 앱에는 해당 위젯을 감싼 조각이 없어 전체 재실행만 측정합니다)")
+    for name, scope in scopes:
+        latencies, sizes = measure(session, change, scope, args.repeat)
+        print(
+            f"{name:<14}{percentile(latencies, 0.5) * 1000:>10.1f}"
+            f"{percentile(latencies, 0.95) * 1000:>10.1f}"
+            f"{sum(sizes) / len(sizes) / 1024:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
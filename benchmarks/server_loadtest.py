@@ -0,0 +1,140 @@
+"""
+1.server.py 부하 테스트
+여러 클라이언트 스레드가 keep-alive 연결로 요청을 반복해서 보내고, 초당 처리량(RPS)과 지연 시간 백분위를 출력합니다.
+
+실행 예)
+    python benchmarks/server_loadtest.py --url http://localhost:8080/ --concurrency 32
+    python benchmarks/server_loadtest.py --compare   # single / threaded 모드를 직접 띄워서 비교
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def run_load(url, concurrency, duration, delay=0.0):
+    """
+    duration 초 동안 concurrency 개 클라이언트로 요청을 보내는 함수
+    :param delay: 각 요청을 보낸 뒤 응답을 읽기 전 대기 시간 (느린 클라이언트 흉내)
+    :return: (초당 요청 수, 지연 시간 리스트(초), 오류 수)
+    """
+    parsed = urllib.parse.urlsplit(url)
+    path = parsed.path or "/"
+    deadline = time.perf_counter() + duration
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def client():
+        connection = None
+        local = []
+        while time.perf_counter() < deadline:
+            try:
+                if connection is None:
+                    connection = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=10)
+                started = time.perf_counter()
+                connection.request("GET", path)
+                if delay:
+                    time.sleep(delay)
+                response = connection.getresponse()
+                response.read()
+                local.append(time.perf_counter() - started)
+                if response.getheader("Connection", "").lower() == "close" or response.version == 10:
+                    connection.close()
+                    connection = None
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                if connection is not None:
+                    connection.close()
+                connection = None
+        if connection is not None:
+            connection.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return len(latencies) / elapsed, latencies, errors[0]
+
+
+def report(name, rps, latencies, errors):
+    print(
+        f"{name:<12}{rps:>10,.0f}{percentile(latencies, 0.5) * 1000:>10.1f}"
+        f"{percentile(latencies, 0.99) * 1000:>10.1f}{errors:>8}"
+    )
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(port, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("서버가 시작되지 않았습니다")
+
+
+def compare(concurrency, duration, delay):
+    # 같은 조건으로 기존(single) 방식과 스레드 풀(threaded) 방식을 차례로 측정
+    print(f"{'모드':<12}{'RPS':>10}{'p50(ms)':>10}{'p99(ms)':>10}{'오류':>8}")
+    for mode in ["single", "threaded"]:
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "1.server.py"), "--port", str(port), "--mode", mode, "--no-public-ip"],
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            wait_until_ready(port)
+            rps, latencies, errors = run_load(f"http://127.0.0.1:{port}/", concurrency, duration, delay)
+            report(mode, rps, latencies, errors)
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8080/")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--delay", type=float, default=0.0, help="요청 후 응답을 읽기 전 대기 시간(초)")
+    parser.add_argument("--compare", action="store_true", help="single/threaded 모드를 띄워 비교")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.concurrency, args.duration, args.delay)
+    else:
+        print(f"{'대상':<12}{'RPS':>10}{'p50(ms)':>10}{'p99(ms)':>10}{'오류':>8}")
+        report("server", *run_load(args.url, args.concurrency, args.duration, args.delay))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+일반 호출(invoke_model)과 스트리밍 호출(invoke_model_with_response_stream)의
+첫 글자 표시 시간(TTFT)과 전체 완료 시간을 가짜 Bedrock 클라이언트로 비교합니다.
+
+실행: python benchmarks/ttft.py
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.fake_bedrock import FakeBedrockClient  # noqa: E402
+from common.streaming import iter_stream_text, new_usage  # noqa: E402
+
+MODEL_ID = "anthropic.claude-3-haiku-20240307-v1:0"
+
+
+def make_body(prompt):
+    return json.dumps(
+        {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": 1000,
+            "messages": [{"role": "user", "content": [{"type": "text", "text": prompt}]}],
+        }
+    )
+
+
+def measure_blocking(client, body):
+    start = time.perf_counter()
+    response = client.invoke_model(modelId=MODEL_ID, body=body)
+    text = json.loads(response["body"].read())["content"][0]["text"]
+    elapsed = time.perf_counter() - start
+    # 일반 호출은 전체 응답이 와야 화면에 처음 표시됨
+    return elapsed, elapsed, text
+
+
+def measure_streaming(client, body):
+    start = time.perf_counter()
+    usage = new_usage()
+    response = client.invoke_model_with_response_stream(modelId=MODEL_ID, body=body)
+
+    first = None
+    parts = []
+    for part in iter_stream_text(response, usage):
+        if first is None:
+            first = time.perf_counter() - start
+        parts.append(part)
+    total = time.perf_counter() - start
+    return first, total, "".join(parts), usage
+
+
+def main():
+    client = FakeBedrockClient(first_token_latency=0.4, token_interval=0.01)
+    body = make_body("고혈압 환자의 생활 관리 방법을 알려주세요.")
+
+    ttft_b, total_b, text_b = measure_blocking(client, body)
+    ttft_s, total_s, text_s, usage = measure_streaming(client, body)
+    assert text_b == text_s, "스트리밍 결과가 일반 호출 결과와 다릅니다"
+
+    print(f"{'방식':<10}{'첫 표시(초)':>14}{'완료(초)':>12}")
+    print(f"{'일반':<10}{ttft_b:>14.3f}{total_b:>12.3f}")
+    print(f"{'스트리밍':<10}{ttft_s:>14.3f}{total_s:>12.3f}")
+    print(f"스트리밍 usage: {usage}")
+
+
+if __name__ == "__main__":
+    main()
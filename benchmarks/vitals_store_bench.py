@@ -0,0 +1,79 @@
+"""
+CSV 로딩과 파티션 Parquet 저장소(common.vitals_store) 읽기 속도를 비교합니다.
+대시보드에서 자주 하는 세 가지 조회(체온 1주일, 환자 1명 혈압, 전체 기간 전체 컬럼)를 측정합니다.
+
+실행: python benchmarks/vitals_store_bench.py --patients 200 --freq min
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.vitals import PATIENT_COLUMN, TIME_COLUMN, generate_cohort  # noqa: E402
+from common.vitals_store import VitalsStore, ingest  # noqa: E402
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return time.perf_counter() - started, result
+
+
+def read_csv_query(path, columns, start_date=None, end_date=None, patients=None):
+    # CSV 는 전체를 읽은 뒤 메모리에서 걸러야 함
+    data = pd.read_csv(path, parse_dates=[TIME_COLUMN])
+    if start_date is not None:
+        dates = data[TIME_COLUMN].dt.date
+        data = data[
+            (dates >= pd.Timestamp(start_date).date())
+            & (dates <= pd.Timestamp(end_date).date())
+        ]
+    if patients:
+        data = data[data[PATIENT_COLUMN].isin(patients)]
+    return data[[TIME_COLUMN, PATIENT_COLUMN] + columns]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--patients", type=int, default=200)
+    parser.add_argument("--freq", default="min", help='측정 간격 (예: "h", "min")')
+    args = parser.parse_args()
+
+    data = generate_cohort(args.patients, freq=args.freq)
+    print(f"샘플 코호트: 환자 {args.patients:,}명, {len(data):,}행")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = os.path.join(workdir, "vitals.csv")
+        store_path = os.path.join(workdir, "store")
+
+        csv_write, _ = timed(lambda: data.to_csv(csv_path, index=False))
+        store_write, _ = timed(lambda: ingest(data, store_path))
+        print(f"저장 시간: CSV {csv_write:.1f}초, 저장소 {store_write:.1f}초")
+
+        store = VitalsStore(store_path)
+        first_patient = store.patients()[0]
+        queries = [
+            ("체온 1주일", dict(columns=["체온"], start_date="2024-10-08", end_date="2024-10-14")),
+            ("환자 1명 혈압", dict(columns=["혈압(수축기)", "혈압(이완기)"], patients=[first_patient])),
+            ("전체 조회", dict(columns=["혈압(수축기)", "혈압(이완기)", "혈당", "체온"])),
+        ]
+
+        print(f"\n{'조회':<14}{'행 수':>12}{'CSV(초)':>10}{'저장소(초)':>12}{'배속':>8}")
+        for name, query in queries:
+            csv_time, csv_rows = timed(lambda: read_csv_query(csv_path, **query))
+            store_time, store_rows = timed(lambda: store.read(**query))
+            assert len(csv_rows) == len(store_rows), "CSV 와 저장소 결과 행 수가 다릅니다"
+            print(
+                f"{name:<14}{len(store_rows):>12,}{csv_time:>10.2f}{store_time:>12.2f}"
+                f"{csv_time / store_time:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+common.launcher 로 띄운 작업 프로세스 수에 따른 동시 세션 처리량 비교
+작업 프로세스 수를 바꿔가며 런처(게이트웨이 포함)를 실행하고,
+여러 가상 세션이 게이트웨이의 WebSocket(/_stcore/stream)으로 앱을 반복 재실행(rerun)시켜
+초당 재실행 수와 재실행 지연 시간 백분위를 출력합니다.
+
+실행 예)
+    python benchmarks/worker_scaling.py --app 4.medical_demo.py --workers 1 2 4 --sessions 16
+"""
+
+import argparse
+import http.client
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from websockets.sync.client import connect
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.server_loadtest import free_port, percentile  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait_until_ready(port, timeout=60):
+    """
+    게이트웨이 /readyz 가 200 (정상 작업 프로세스가 하나 이상) 이 될 때까지 기다리는 함수
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/readyz")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"게이트웨이(포트 {port})가 준비되지 않았습니다.")
+
+
+def rerun_message():
+    message = BackMsg()
+    message.rerun_script.query_string = ""
+    message.rerun_script.page_script_hash = ""
+    return message.SerializeToString()
+
+
+def run_sessions(port, sessions, duration):
+    """
+    sessions 개의 가상 세션이 duration 초 동안 재실행을 반복하는 함수
+    :return: (초당 재실행 수, 재실행 지연 시간 리스트(초), 오류 수)
+    """
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    origin = f"http://127.0.0.1:{port}"
+    payload = rerun_message()
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(sessions + 1)
+    deadline = [0.0]
+
+    def session():
+        local = []
+        try:
+            with connect(url, subprotocols=["streamlit"], origin=origin, open_timeout=30) as ws:
+                start_barrier.wait()
+                while time.perf_counter() < deadline[0]:
+                    started = time.perf_counter()
+                    ws.send(payload)
+                    while True:
+                        message = ForwardMsg()
+                        message.ParseFromString(ws.recv(timeout=60))
+                        if message.WhichOneof("type") == "script_finished":
+                            break
+                    local.append(time.perf_counter() - started)
+        except Exception:
+            with lock:
+                errors[0] += 1
+            if not start_barrier.broken:
+                start_barrier.abort()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    for thread in threads:
+        thread.start()
+    # 모든 세션의 WebSocket 연결이 끝난 뒤 동시에 측정 시작
+    try:
+        start_barrier.wait()
+    except threading.BrokenBarrierError:
+        pass
+    started = time.perf_counter()
+    deadline[0] = started + duration
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return len(latencies) / elapsed, latencies, errors[0]
+
+
+def measure(app, workers, sessions, duration):
+    port = free_port()
+    launcher = subprocess.Popen(
+        [
+            sys.executable, "-m", "common.launcher", app,
+            "--workers", str(workers),
+            "--port", str(port),
+            "--base-port", str(free_port()),
+        ],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_ready(port)
+        time.sleep(2)  # 나머지 작업 프로세스가 헬스 체크를 통과할 시간
+        run_sessions(port, sessions, 2)  # 워밍업 (모듈 import, 캐시 생성)
+        return run_sessions(port, sessions, duration)
+    finally:
+        launcher.send_signal(signal.SIGTERM)
+        launcher.wait(30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="작업 프로세스 수에 따른 동시 세션 처리량 비교")
+    parser.add_argument("--app", default="4.medical_demo.py")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--sessions", type=int, default=16, help="동시 가상 세션 수")
+    parser.add_argument("--duration", type=float, default=10.0, help="측정 시간 (초)")
+    args = parser.parse_args()
+
+    # 가짜 Bedrock 클라이언트 사용 (AWS 호출 없이 Streamlit 처리량만 측정)
+    os.environ.setdefault("BEDROCK_FAKE", "1")
+
+    print(f"앱: {args.app} · 동시 세션 {args.sessions}개 · CPU 코어 {os.cpu_count()}개")
+    print(f"{'작업 프로세스':>10} {'재실행/초':>10} {'p50(ms)':>9} {'p95(ms)':>9} {'오류':>6}")
+    for workers in args.workers:
+        throughput, latencies, errors = measure(args.app, workers, args.sessions, args.duration)
+        print(
+            f"{workers:>10} {throughput:>12,.1f} "
+            f"{percentile(latencies, 0.5) * 1000:>9.1f} "
+            f"{percentile(latencies, 0.95) * 1000:>9.1f} {errors:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Streamlit 예제 앱들이 함께 사용하는 공통 모듈 모음
+"""
@@ -0,0 +1,384 @@
+"""
+Bedrock 토큰 사용량 집계와 요청 전 토큰 추정 모듈
+모든 Bedrock 앱(3.app-v2.py, 4.medical_demo.py, 챗봇)이 같은 SQLite 파일에 사용량을 기록하므로
+새로고침이나 서버 재시작 후에도, 여러 프로세스를 띄워도 사용자별·앱별 누적 사용량과 비용을 함께 볼 수 있습니다.
+
+- 사용량 기록: (시간, 앱, 사용자, 모델) 단위로 요청 수와 토큰 수를 더함 (1시간 단위 버킷)
+  최근 24시간 / 7일 등의 구간 합계는 버킷을 더해서 구함
+- 비용: 모델별 가격표(MODEL_PRICES)로 조회할 때 계산 (가격표를 고치면 지난 기록에도 반영)
+- 요청 전 점검(preflight): 보내기 전에 입력 토큰을 어림잡아
+  모델 컨텍스트나 요청당 입력 예산을 넘으면 오래된 메시지부터 잘라내고,
+  최근 24시간 예산이 남은 만큼으로 max_tokens 를 줄이거나 요청을 막음
+
+환경 변수
+- TOKEN_USAGE_DB: SQLite 파일 경로 (기본값 data/token_usage.sqlite)
+- TOKEN_BUDGET_USER_24H: 사용자별 최근 24시간 토큰 예산 (0 또는 미설정 시 제한 없음)
+- TOKEN_BUDGET_APP_24H: 앱별 최근 24시간 토큰 예산 (0 또는 미설정 시 제한 없음)
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from common.history import message_tokens
+from common.identity import USER_HEADERS, is_trusted_proxy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = "data/token_usage.sqlite"
+
+# 모델별 1백만 토큰당 가격 (USD, 입력/출력) - 온디맨드 공개 가격 기준 예시, 실제 청구 금액과 다를 수 있음
+MODEL_PRICES = {
+    "anthropic.claude-3-haiku-20240307-v1:0": (0.25, 1.25),
+    "anthropic.claude-3-5-haiku-20241022-v1:0": (0.8, 4.0),
+    "anthropic.claude-3-5-sonnet-20240620-v1:0": (3.0, 15.0),
+    "anthropic.claude-3-5-sonnet-20241022-v2:0": (3.0, 15.0),
+}
+
+# 프롬프트 캐시 읽기/쓰기 토큰의 가격 (일반 입력 가격 대비 배수)
+CACHE_READ_PRICE_RATIO = 0.1
+CACHE_WRITE_PRICE_RATIO = 1.25
+
+# 모델 컨텍스트 길이 (입력 + 출력 토큰), Claude 3 계열은 200k
+DEFAULT_CONTEXT_TOKENS = 200_000
+MODEL_CONTEXT_TOKENS = {}
+
+# 스크립트 밖(작업 스레드, 벤치마크)에서 호출되어 앱·사용자를 알 수 없을 때 기록하는 이름
+UNKNOWN_APP = "(알 수 없음)"
+ANONYMOUS = "anonymous"
+
+# 조회 구간 이름 -> 시간
+WINDOWS = {"최근 24시간": 24, "최근 7일": 24 * 7, "최근 30일": 24 * 30}
+
+USAGE_FIELDS = ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_write_input_tokens")
+
+
+class TokenBudgetExceeded(Exception):
+    """
+    최근 24시간 토큰 예산이 남지 않아 요청을 보내지 않을 때 발생하는 예외
+    """
+
+
+def _env_int(name, default=0):
+    return int(os.environ.get(name) or default)
+
+
+def _hour(timestamp=None):
+    # 1시간 단위 버킷 번호 (유닉스 시간 / 3600)
+    return int((time.time() if timestamp is None else timestamp) // 3600)
+
+
+def estimate_cost(usage, model_id):
+    """
+    토큰 사용량의 예상 비용을 계산하는 함수
+    :param usage: input_tokens, output_tokens (선택: cache_read_input_tokens, cache_write_input_tokens)
+    :param model_id: 모델 ID
+    :return: 예상 비용 (USD), 가격표에 없는 모델이면 None
+    """
+    if model_id not in MODEL_PRICES:
+        return None
+    input_price, output_price = MODEL_PRICES[model_id]
+    input_cost = (
+        usage["input_tokens"]
+        + usage.get("cache_read_input_tokens", 0) * CACHE_READ_PRICE_RATIO
+        + usage.get("cache_write_input_tokens", 0) * CACHE_WRITE_PRICE_RATIO
+    ) * input_price
+    return (input_cost + usage["output_tokens"] * output_price) / 1_000_000
+
+
+def current_caller():
+    """
+    지금 실행 중인 앱 이름과 사용자를 돌려주는 함수
+    앱 이름은 실행한 스크립트 파일 이름, 사용자는 st.user 로그인 또는 로그인 프록시 헤더에서 가져옵니다.
+    프록시 헤더는 믿을 수 있는 프록시(TRUSTED_PROXIES)를 거쳐 온 연결일 때만 사용합니다. (common.identity)
+    작업 스레드에서 기록하려면 스크립트 스레드에서 미리 구해 두었다가 넘겨야 합니다.
+    :return: (앱 이름, 사용자)
+    """
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return UNKNOWN_APP, ANONYMOUS
+    app = os.path.splitext(os.path.basename(ctx.main_script_path))[0]
+
+    if st.user.get("is_logged_in"):
+        return app, st.user.get("email") or st.user.get("name") or ANONYMOUS
+    if not is_trusted_proxy(st.context.ip_address):
+        return app, ANONYMOUS
+    headers = st.context.headers
+    for name in USER_HEADERS:
+        if headers.get(name):
+            return app, headers[name]
+    return app, ANONYMOUS
+
+
+class UsageLedger:
+    """
+    SQLite 토큰 사용량 장부 (1시간 단위 버킷)
+    :param db_path: SQLite 파일 경로
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")  # 여러 프로세스가 동시에 기록할 수 있도록
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS token_usage (
+                    hour INTEGER NOT NULL,
+                    app TEXT NOT NULL,
+                    user TEXT NOT NULL,
+                    model_id TEXT NOT NULL,
+                    requests INTEGER NOT NULL,
+                    input_tokens INTEGER NOT NULL,
+                    output_tokens INTEGER NOT NULL,
+                    cache_read_input_tokens INTEGER NOT NULL,
+                    cache_write_input_tokens INTEGER NOT NULL,
+                    PRIMARY KEY (hour, app, user, model_id)
+                )
+                """
+            )
+
+    def record(self, app, user, model_id, usage, timestamp=None):
+        """
+        요청 한 번의 토큰 사용량을 해당 시간 버킷에 더하는 함수
+        :param usage: input_tokens, output_tokens (선택: 캐시 읽기/쓰기 토큰)
+        """
+        values = [usage.get(field, 0) for field in USAGE_FIELDS]
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO token_usage VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?)
+                ON CONFLICT (hour, app, user, model_id) DO UPDATE SET
+                    requests = requests + 1,
+                    input_tokens = input_tokens + excluded.input_tokens,
+                    output_tokens = output_tokens + excluded.output_tokens,
+                    cache_read_input_tokens = cache_read_input_tokens + excluded.cache_read_input_tokens,
+                    cache_write_input_tokens = cache_write_input_tokens + excluded.cache_write_input_tokens
+                """,
+                (_hour(timestamp), app, user, model_id or "", *values),
+            )
+
+    def totals(self, hours=24, group_by=(), app=None, user=None):
+        """
+        최근 hours 시간의 사용량 합계를 group_by 컬럼별로 돌려주는 함수
+        :param group_by: "hour", "app", "user", "model_id" 중 묶을 컬럼 (비우면 전체 합계 한 줄)
+        :param app: 이 앱만 집계 (None 이면 전체)
+        :param user: 이 사용자만 집계 (None 이면 전체)
+        :return: 딕셔너리 리스트 (묶은 컬럼, requests, 토큰 수, total_tokens, cost)
+            cost 는 가격표에 있는 모델만 더한 값, priced 는 가격표에 없는 모델이 섞였는지 여부
+        """
+        conditions, params = ["hour > ?"], [_hour() - hours]
+        for column, value in (("app", app), ("user", user)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        # 비용은 모델마다 가격이 다르므로 항상 모델별로 읽어서 합침
+        columns = [column for column in group_by if column != "model_id"]
+        keys = columns + ["model_id"]
+        sums = ", ".join(f"SUM({field})" for field in ("requests",) + USAGE_FIELDS)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(keys)}, {sums} FROM token_usage "
+                f"WHERE {' AND '.join(conditions)} GROUP BY {', '.join(keys)}",
+                params,
+            ).fetchall()
+
+        merged = {}
+        for row in rows:
+            group = dict(zip(keys, row[: len(keys)]))
+            usage = dict(zip(("requests",) + USAGE_FIELDS, row[len(keys) :]))
+            key = tuple(group[column] for column in group_by)
+            total = merged.setdefault(
+                key,
+                dict(
+                    {column: group[column] for column in group_by},
+                    requests=0,
+                    cost=0.0,
+                    priced=True,
+                    **{field: 0 for field in USAGE_FIELDS},
+                ),
+            )
+            for field, value in usage.items():
+                total[field] += value
+            cost = estimate_cost(usage, group["model_id"])
+            if cost is None:
+                total["priced"] = False
+            else:
+                total["cost"] += cost
+
+        results = list(merged.values())
+        for total in results:
+            total["total_tokens"] = total["input_tokens"] + total["output_tokens"]
+        if not group_by and not results:
+            results = [
+                dict(requests=0, cost=0.0, priced=True, total_tokens=0, **{f: 0 for f in USAGE_FIELDS})
+            ]
+        return results
+
+    def used_tokens(self, hours=24, app=None, user=None):
+        """
+        최근 hours 시간 동안 사용한 입출력 토큰 수 (예산 확인용)
+        """
+        conditions, params = ["hour > ?"], [_hour() - hours]
+        for column, value in (("app", app), ("user", user)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COALESCE(SUM(input_tokens + cache_read_input_tokens + cache_write_input_tokens"
+                f" + output_tokens), 0) FROM token_usage WHERE {' AND '.join(conditions)}",
+                params,
+            ).fetchone()
+        return row[0]
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_usage_ledger():
+    """
+    프로세스 전체에서 공유하는 사용량 장부를 돌려주는 함수
+    (일괄 생성 작업 스레드에서도 기록하므로 st.cache_resource 대신 모듈 변수로 보관)
+    :return: UsageLedger
+    """
+    global _ledger
+    with _ledger_lock:
+        path = os.environ.get("TOKEN_USAGE_DB") or DEFAULT_PATH
+        if _ledger is None or _ledger.db_path != path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            _ledger = UsageLedger(path)
+        return _ledger
+
+
+def record_usage(model_id, usage, caller=None):
+    """
+    Bedrock 호출 한 번의 토큰 사용량을 장부에 기록하는 함수
+    기록에 실패해도(디스크 오류 등) 응답 처리는 계속되도록 예외를 밖으로 전달하지 않습니다.
+    :param model_id: 호출한 모델 ID (모르면 None)
+    :param usage: input_tokens, output_tokens (선택: 캐시 읽기/쓰기 토큰)
+    :param caller: (앱 이름, 사용자), None 이면 current_caller()
+    """
+    app, user = caller or current_caller()
+    try:
+        get_usage_ledger().record(app, user, model_id, usage)
+    except sqlite3.Error as e:
+        logger.warning("토큰 사용량 기록 실패: %s", e)
+
+
+def remaining_budget(caller=None):
+    """
+    최근 24시간 예산 중 남은 토큰 수를 돌려주는 함수 (사용자 예산과 앱 예산 중 작은 값)
+    :return: 남은 토큰 수, 예산이 설정되지 않았으면 None
+    """
+    app, user = caller or current_caller()
+    ledger = get_usage_ledger()
+    remaining = []
+    user_budget = _env_int("TOKEN_BUDGET_USER_24H")
+    if user_budget:
+        remaining.append(user_budget - ledger.used_tokens(user=user))
+    app_budget = _env_int("TOKEN_BUDGET_APP_24H")
+    if app_budget:
+        remaining.append(app_budget - ledger.used_tokens(app=app))
+    return max(0, min(remaining)) if remaining else None
+
+
+def estimate_request_tokens(messages, system=None):
+    """
+    요청의 입력 토큰 수를 어림잡는 함수 (common.history.estimate_tokens 와 같은 방식)
+    :param messages: role, content 형태의 메시지 리스트
+    :param system: system 프롬프트 (문자열 또는 content 블록 리스트)
+    :return: 추정 입력 토큰 수
+    """
+    tokens = sum(message_tokens(message) for message in messages)
+    if system:
+        tokens += message_tokens({"content": system})
+    return tokens
+
+
+def preflight(messages, max_tokens, model_id, system=None, input_budget=None, caller=None):
+    """
+    요청을 보내기 전에 입력 토큰을 추정하고, 한도를 넘지 않도록 메시지와 max_tokens 를 조정하는 함수
+    - 입력 + max_tokens 가 모델 컨텍스트를 넘거나 입력이 input_budget 을 넘으면 오래된 메시지부터 뺌
+      (마지막 메시지는 항상 남기고, 첫 메시지가 user 가 되도록 맞춤)
+    - 최근 24시간 예산이 설정되어 있으면 남은 예산 안으로 max_tokens 를 줄임
+    :param messages: 보낼 메시지 리스트
+    :param max_tokens: 요청할 최대 출력 토큰 수
+    :param model_id: 호출할 모델 ID (컨텍스트 길이 확인용)
+    :param system: system 프롬프트 (있으면 추정에 포함)
+    :param input_budget: 요청당 입력 토큰 상한 (None 이면 모델 컨텍스트만 확인)
+    :return: (보낼 메시지, 보고서 딕셔너리)
+        보고서: estimated_input_tokens, max_tokens, trimmed_messages(뺀 메시지 수), remaining_budget
+    :raises TokenBudgetExceeded: 남은 예산으로는 입력조차 보낼 수 없을 때
+    """
+    context = MODEL_CONTEXT_TOKENS.get(model_id, DEFAULT_CONTEXT_TOKENS)
+    limit = context - max_tokens
+    if input_budget is not None:
+        limit = min(limit, input_budget)
+
+    fixed = estimate_request_tokens([], system)
+    costs = [message_tokens(message) for message in messages]
+    used = fixed + sum(costs)
+    start = 0
+    while start < len(messages) - 1 and (used > limit or messages[start]["role"] != "user"):
+        used -= costs[start]
+        start += 1
+
+    remaining = remaining_budget(caller)
+    if remaining is not None:
+        if remaining <= used:
+            raise TokenBudgetExceeded(
+                f"최근 24시간 토큰 예산을 모두 사용했습니다. (남은 예산 {remaining:,} 토큰, 요청 약 {used:,} 토큰)"
+            )
+        max_tokens = min(max_tokens, remaining - used)
+
+    return messages[start:], {
+        "estimated_input_tokens": used,
+        "max_tokens": max_tokens,
+        "trimmed_messages": start,
+        "remaining_budget": remaining,
+    }
+
+
+def check_budget(estimated_tokens, caller=None):
+    """
+    예상 토큰 수가 최근 24시간 남은 예산 안에 드는지 확인하는 함수
+    :raises TokenBudgetExceeded: 남은 예산보다 많이 필요할 때
+    """
+    remaining = remaining_budget(caller)
+    if remaining is not None and remaining < estimated_tokens:
+        raise TokenBudgetExceeded(
+            f"최근 24시간 토큰 예산이 부족합니다. (남은 예산 {remaining:,} 토큰, 요청 약 {estimated_tokens:,} 토큰)"
+        )
+
+
+def format_cost(total):
+    """
+    totals() 한 줄의 비용을 문자열로 만드는 함수 (가격표에 없는 모델이 섞이면 표시)
+    """
+    return f"${total['cost']:,.4f}" + ("" if total["priced"] else " (가격 미등록 모델 제외)")
+
+
+def render_usage_panel():
+    """
+    사이드바에 최근 24시간 토큰 사용량과 예상 비용(이 앱 / 전체 앱)을 표시하는 함수
+    """
+    app, _ = current_caller()
+    ledger = get_usage_ledger()
+    this_app = ledger.totals(app=app)[0]
+    everything = ledger.totals()[0]
+    st.sidebar.caption(
+        f"💰 최근 24시간 · 이 앱 {this_app['total_tokens']:,} 토큰 {format_cost(this_app)} · "
+        f"전체 앱 {everything['total_tokens']:,} 토큰 {format_cost(everything)}"
+    )
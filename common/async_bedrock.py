@@ -0,0 +1,396 @@
+"""
+Bedrock 호출을 프로세스 공용 이벤트 루프에서 처리하는 비동기 클라이언트 계층
+여러 세션이 동시에 같은 요청(예: 같은 진단·증상·치료 계획의 안내 메시지)을 보내면
+세션마다 invoke_model 을 호출하는 대신 먼저 시작된 호출 하나의 결과를 함께 받습니다. (single-flight)
+
+- 전용 스레드에서 asyncio 이벤트 루프 하나를 돌리고, 각 세션(스크립트 스레드)은 요청을 루프에 넘긴 뒤 결과를 기다림
+- 같은 모델·같은 요청 본문의 호출이 진행 중이면 새로 호출하지 않고 그 결과를 기다림 (합류)
+- 프로세스 전체의 동시 호출 수를 세마포어로 제한 (넘는 요청은 순서대로 대기, 스트리밍 호출도 같은 자리를 나눠 씀)
+- boto3 는 동기 라이브러리이므로 실제 호출은 동시 호출 수만큼의 스레드 풀에서 실행
+
+invoke_model 은 boto3 클라이언트와 같은 형식({"body": 읽을 수 있는 객체, ...})을 돌려주므로
+기존 코드(response.get("body").read())를 그대로 사용할 수 있습니다.
+합류한 요청은 실제로 호출하지 않았으므로 응답 본문의 usage 를 0 으로 바꿔 토큰 사용량이 중복 집계되지 않게 합니다.
+스트리밍 호출(invoke_model_with_response_stream)은 세션마다 응답을 나눠 받아야 하므로 합류하지 않고 원래 클라이언트로 보냅니다.
+이때도 동시 호출 자리를 하나 차지하며, 스트림을 끝까지 읽거나 닫을 때 자리를 돌려줍니다.
+
+모든 호출(스트리밍 포함)은 common.resilience 의 보호 장치를 거칩니다.
+- 프로세스 전체가 함께 쓰는 토큰 버킷으로 초당 호출 수를 제한하고, 스로틀링이 나면 속도를 줄임
+- 스로틀링·서버 오류는 지수 백오프 + 지터로 기다렸다가 다시 호출
+  (boto3 의 자체 재시도는 끄고 이 계층에서만 재시도하여 모든 스로틀링을 속도 조절에 반영)
+- 서비스 오류가 연속으로 나면 차단기가 열려 잠시 호출하지 않고 바로 실패(CircuitOpenError)
+  그동안 같은 요청의 최근 성공 응답이 있으면 그 응답을 대신 돌려줌 (usage 는 0)
+
+환경 변수
+- BEDROCK_MAX_CONCURRENCY: 프로세스 전체의 최대 동시 호출 수 (기본값 16)
+- BEDROCK_RATE_LIMIT: 처음 허용하는 초당 호출 수 (기본값 20, 스로틀링 여부에 따라 0.5 ~ 4배 사이에서 조절)
+- BEDROCK_RETRIES: 스로틀링·서버 오류 재시도 횟수 (기본값 3)
+- BEDROCK_BREAKER_THRESHOLD: 차단기를 여는 연속 실패 횟수 (기본값 5)
+- BEDROCK_BREAKER_RESET: 차단기가 열린 뒤 다시 시도하기까지의 시간 (초, 기본값 30)
+"""
+
+import asyncio
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from common.bedrock import client_settings, get_bedrock_client
+from common.resilience import (
+    THROTTLING_ERROR_CODES,
+    AdaptiveRateLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    error_code,
+    is_service_error,
+    retry_delay,
+)
+
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_RATE_LIMIT = 20.0
+DEFAULT_RETRIES = 3
+
+# 차단기가 열렸을 때 대신 돌려줄 최근 성공 응답 수
+RECENT_RESPONSES = 256
+
+# 차단기 상태 -> 표시 문구
+차단기_상태 = {
+    CircuitBreaker.CLOSED: "🟢 정상",
+    CircuitBreaker.OPEN: "🔴 차단 중",
+    CircuitBreaker.HALF_OPEN: "🟡 복구 확인 중",
+}
+
+
+def _without_usage(data):
+    # 합류한 요청에 돌려줄 응답 본문 (usage 의 토큰 수를 0 으로)
+    try:
+        response_body = json.loads(data)
+    except ValueError:
+        return data
+    usage = response_body.get("usage") if isinstance(response_body, dict) else None
+    if not isinstance(usage, dict):
+        return data
+    response_body["usage"] = {key: 0 for key in usage}
+    return json.dumps(response_body, ensure_ascii=False).encode()
+
+
+class _SlotStream:
+    """
+    스트리밍 응답 본문을 감싸서, 끝까지 읽거나 닫으면(버려지면) 동시 호출 자리를 돌려주는 클래스
+    :param stream: 원래 응답 본문 (이벤트 스트림)
+    :param release: 자리를 돌려주는 함수 (한 번만 호출됨)
+    """
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self):
+        try:
+            yield from self._stream
+        finally:
+            self.close()
+
+    def close(self):
+        release, self._release = self._release, None
+        if release is None:
+            return
+        try:
+            close = getattr(self._stream, "close", None)
+            if close is not None:
+                close()
+        finally:
+            release()
+
+    def __del__(self):
+        # 읽다가 멈춘 스트림(스크립트 재실행 등)도 자리를 돌려줌
+        self.close()
+
+
+class AsyncBedrockClient:
+    """
+    전용 이벤트 루프 스레드에서 Bedrock 호출을 합류·동시 실행 제한하는 클라이언트
+    :param client: 실제 호출에 사용할 bedrock-runtime 클라이언트 (자체 재시도를 끈 클라이언트)
+    :param max_concurrency: 프로세스 전체의 최대 동시 호출 수
+    :param rate_limit: 처음 허용하는 초당 호출 수
+    :param max_retries: 스로틀링·서버 오류 재시도 횟수
+    :param breaker_threshold: 차단기를 여는 연속 실패 횟수
+    :param breaker_reset: 차단기가 열린 뒤 다시 시도하기까지의 시간 (초)
+    """
+
+    def __init__(
+        self,
+        client,
+        max_concurrency=DEFAULT_MAX_CONCURRENCY,
+        rate_limit=DEFAULT_RATE_LIMIT,
+        max_retries=DEFAULT_RETRIES,
+        breaker_threshold=5,
+        breaker_reset=30.0,
+    ):
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.limiter = AdaptiveRateLimiter(rate_limit, burst=max_concurrency)
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+        self._loop = asyncio.new_event_loop()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="bedrock-call"
+        )
+        # 루프 경로(작업 스레드)와 스트리밍 경로(호출한 스레드)가 함께 쓰는 동시 호출 자리
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._pending = {}  # (모델, 본문) -> 진행 중인 호출의 Future (루프 스레드에서만 사용)
+        self._recent = OrderedDict()  # (모델, 본문) -> 최근 성공 응답 (루프 스레드에서만 사용)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,  # 받은 요청 수
+            "upstream": 0,  # 실제로 Bedrock 을 호출한 수 (재시도 포함)
+            "coalesced": 0,  # 진행 중인 호출에 합류한 수
+            "errors": 0,  # 실패한 호출 수 (재시도 전 실패 포함)
+            "retries": 0,  # 재시도한 수
+            "fallback": 0,  # 실패 대신 최근 성공 응답을 돌려준 수
+            "in_flight": 0,  # 지금 Bedrock 을 호출 중인 수
+            "waiting": 0,  # 동시 호출 자리를 기다리는 수
+            "max_in_flight": 0,  # 동시에 호출한 최대 수
+        }
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="bedrock-event-loop", daemon=True
+        )
+        self._thread.start()
+
+    def _update(self, **changes):
+        with self._stats_lock:
+            for key, value in changes.items():
+                self._stats[key] += value
+            self._stats["max_in_flight"] = max(
+                self._stats["max_in_flight"], self._stats["in_flight"]
+            )
+
+    def stats(self):
+        """
+        요청·합류·동시 호출 현황과 보호 장치 상태를 돌려주는 함수
+        :return: submitted, upstream, coalesced, errors, retries, fallback, in_flight, waiting,
+            max_in_flight, max_concurrency, limiter(AdaptiveRateLimiter.stats()), breaker(CircuitBreaker.stats())
+        """
+        with self._stats_lock:
+            stats = dict(self._stats, max_concurrency=self.max_concurrency)
+        return dict(stats, limiter=self.limiter.stats(), breaker=self.breaker.stats())
+
+    def _on_success(self):
+        self.limiter.on_success()
+        self.breaker.record_success()
+
+    def _on_error(self, error, attempt):
+        """
+        실패한 호출을 보호 장치에 반영하고 다시 시도할지 정하는 함수
+        :return: 재시도 전 대기 시간 (초), 재시도하지 않으면 None
+        """
+        self._update(errors=1)
+        if error_code(error) in THROTTLING_ERROR_CODES:
+            self.limiter.on_throttle()
+        if not is_service_error(error):
+            # 입력 오류 등은 엔드포인트가 정상 응답한 것이므로 차단기에는 성공으로 반영하고 재시도하지 않음
+            self.breaker.record_success()
+            return None
+        self.breaker.record_failure()
+        if attempt == self.max_retries:
+            return None
+        self._update(retries=1)
+        return retry_delay(attempt)
+
+    def _acquire_slot(self):
+        # 동시 호출 자리를 얻을 때까지 기다림 (호출하는 쪽에서 미리 waiting 을 1 늘려 둠)
+        try:
+            self._slots.acquire()
+        finally:
+            self._update(waiting=-1)
+        self._update(in_flight=1, upstream=1)
+
+    def _release_slot(self):
+        self._update(in_flight=-1)
+        self._slots.release()
+
+    def _call(self, model_id, body, kwargs):
+        # 스레드 풀에서 실행: 자리를 얻어 호출하고 응답 본문을 모두 읽어서 돌려줌 (합류한 요청과 나눠 쓰기 위해)
+        self._acquire_slot()
+        try:
+            response = self.client.invoke_model(modelId=model_id, body=body, **kwargs)
+            metadata = {key: value for key, value in response.items() if key != "body"}
+            return metadata, response["body"].read()
+        finally:
+            self._release_slot()
+
+    async def _upstream(self, model_id, body, kwargs):
+        for attempt in range(self.max_retries + 1):
+            self.breaker.check()  # 차단 중이면 대기열에 들어가지 않고 바로 실패
+            await asyncio.sleep(self.limiter.reserve())  # 토큰이 생길 때까지 루프를 막지 않고 대기
+            self.breaker.before_call()  # 기다리는 동안 차단되었으면 실패, 반열림이면 시험 호출 한 건만 허용
+            self._update(waiting=1)  # 스레드 풀 대기열과 자리 대기를 함께 셈 (_call 에서 줄임)
+            try:
+                result = await self._loop.run_in_executor(
+                    self._executor, self._call, model_id, body, kwargs
+                )
+            except Exception as e:
+                delay = self._on_error(e, attempt)
+                if delay is None:
+                    raise
+            else:
+                self._on_success()
+                return result
+            await asyncio.sleep(delay)  # 자리를 돌려준 뒤에 기다림
+
+    def _remember(self, key, result):
+        # 최근 성공 응답을 보관 (오래된 것부터 삭제)
+        self._recent[key] = result
+        self._recent.move_to_end(key)
+        while len(self._recent) > RECENT_RESPONSES:
+            self._recent.popitem(last=False)
+
+    def _fallback(self, key, error):
+        # 차단기가 열렸거나 서비스 오류로 실패했을 때 같은 요청의 최근 성공 응답 (없으면 None)
+        if not (isinstance(error, CircuitOpenError) or is_service_error(error)):
+            return None
+        result = self._recent.get(key)
+        if result is not None:
+            self._update(fallback=1)
+        return result
+
+    async def invoke_model_async(self, modelId, body, **kwargs):
+        """
+        이벤트 루프에서 실행되는 invoke_model (같은 요청이 진행 중이면 그 결과를 기다림)
+        :return: (응답 메타데이터, 응답 본문 bytes, 다른 호출의 응답을 재사용했는지 여부)
+        """
+        key = (modelId, body, tuple(sorted(kwargs.items())))
+        leader = self._pending.get(key)
+        if leader is not None:
+            self._update(coalesced=1)
+            metadata, data = await asyncio.shield(leader)
+            return metadata, data, True
+
+        leader = self._loop.create_future()
+        self._pending[key] = leader
+        reused = False
+        try:
+            try:
+                result = await self._upstream(modelId, body, kwargs)
+            except Exception as e:
+                result = self._fallback(key, e)
+                if result is None:
+                    raise
+                reused = True
+            else:
+                self._remember(key, result)
+        except Exception as e:
+            leader.set_exception(e)
+            leader.exception()  # 합류한 요청이 없어도 "처리되지 않은 예외" 경고가 나지 않도록
+            raise
+        else:
+            leader.set_result(result)
+        finally:
+            del self._pending[key]
+        return result[0], result[1], reused
+
+    def invoke_model(self, modelId, body, **kwargs):
+        """
+        boto3 의 invoke_model 과 같은 형식으로 호출하는 함수 (스크립트 스레드·작업 스레드에서 사용)
+        오류는 boto3 를 직접 호출할 때와 같은 예외로 전달됩니다.
+        :return: {"body": 응답 본문(read() 가능), 그 밖의 응답 메타데이터}
+        """
+        self._update(submitted=1)
+        future = asyncio.run_coroutine_threadsafe(
+            self.invoke_model_async(modelId, body, **kwargs), self._loop
+        )
+        metadata, data, reused = future.result()
+        if reused:
+            data = _without_usage(data)
+        return dict(metadata, body=io.BytesIO(data))
+
+    def invoke_model_with_response_stream(self, modelId, body, **kwargs):
+        """
+        스트리밍 호출은 합류하지 않고 원래 클라이언트로 바로 보냄 (속도 제한·재시도·차단기·동시 호출 수 제한은 똑같이 적용)
+        응답 헤더를 받을 때까지의 오류만 재시도하며, 스트림을 읽는 중의 오류는 호출한 쪽으로 전달됩니다.
+        동기 호출이므로 대기는 호출한 스레드(스크립트 스레드)에서 하며, 이벤트 루프는 막지 않습니다.
+        속도 제한·재시도 대기 중에는 자리를 차지하지 않고, 자리는 응답 스트림이 끝나거나 닫힐 때 돌려줍니다.
+        """
+        self._update(submitted=1)
+        for attempt in range(self.max_retries + 1):
+            self.breaker.check()
+            time.sleep(self.limiter.reserve())
+            self.breaker.before_call()
+            self._update(waiting=1)
+            self._acquire_slot()
+            try:
+                response = self.client.invoke_model_with_response_stream(
+                    modelId=modelId, body=body, **kwargs
+                )
+            except Exception as e:
+                self._release_slot()
+                delay = self._on_error(e, attempt)
+                if delay is None:
+                    raise
+            else:
+                self._on_success()
+                return dict(response, body=_SlotStream(response["body"], self._release_slot))
+            time.sleep(delay)
+
+
+@st.cache_resource(show_spinner=False)
+def _create_async_client(_client, max_concurrency, protection, **settings):
+    # Bedrock 클라이언트 설정, 동시 호출 수, 보호 장치 설정이 바뀌면 새로 만듦 (_client 는 캐시 키에서 제외)
+    return AsyncBedrockClient(_client, max_concurrency, **dict(protection))
+
+
+def get_async_bedrock_client():
+    """
+    프로세스 전체에서 공유하는 비동기 Bedrock 클라이언트 계층을 돌려주는 함수
+    :return: AsyncBedrockClient
+    """
+    # 공유 boto3 클라이언트 (재사용 현황도 함께 집계), 재시도는 이 계층에서 하므로 1회만 시도
+    client = get_bedrock_client(max_attempts=1)
+    max_concurrency = int(os.environ.get("BEDROCK_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY))
+    protection = (
+        ("rate_limit", float(os.environ.get("BEDROCK_RATE_LIMIT", DEFAULT_RATE_LIMIT))),
+        ("max_retries", int(os.environ.get("BEDROCK_RETRIES", DEFAULT_RETRIES))),
+        ("breaker_threshold", int(os.environ.get("BEDROCK_BREAKER_THRESHOLD", 5))),
+        ("breaker_reset", float(os.environ.get("BEDROCK_BREAKER_RESET", 30))),
+    )
+    return _create_async_client(
+        client, max_concurrency, protection, **dict(client_settings(), max_attempts=1)
+    )
+
+
+def render_async_stats(client):
+    """
+    사이드바에 요청 합류·동시 호출 현황과 보호 장치(차단기, 요청 속도 제한) 상태를 표시하는 함수
+    :param client: AsyncBedrockClient
+    """
+    stats = client.stats()
+    limiter = stats["limiter"]
+    breaker = stats["breaker"]
+    st.sidebar.caption(
+        f"🔀 Bedrock 호출: 요청 {stats['submitted']}건 · 실제 호출 {stats['upstream']}건 · "
+        f"합류 {stats['coalesced']}건 · 진행 중 {stats['in_flight']}/{stats['max_concurrency']} · "
+        f"대기 {stats['waiting']}"
+    )
+    if breaker["state"] == CircuitBreaker.OPEN:
+        st.sidebar.warning(
+            f"🛡️ Bedrock 호출 차단 중: 오류가 잇따라 호출을 멈췄습니다. {breaker['retry_in']:.0f}초 후 다시 시도합니다."
+        )
+
+    with st.sidebar.expander(f"🛡️ Bedrock 보호 장치: {차단기_상태[breaker['state']]}"):
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("허용 속도 (회/초)", f"{limiter['rate']:.1f}")
+            st.metric("연속 실패", f"{breaker['failures']}/{client.breaker.failure_threshold}")
+        with col2:
+            st.metric("버킷 토큰", f"{limiter['tokens']:.0f}/{limiter['capacity']}")
+            st.metric("토큰 대기", limiter["queued"])
+        st.caption(
+            f"스로틀링 최근 1분 {limiter['throttled_recent']}회 (누적 {limiter['throttled']}회) · "
+            f"재시도 {stats['retries']}회 · 차단 {breaker['opened']}회 · "
+            f"차단으로 거절 {breaker['rejected']}건 · 최근 응답으로 대체 {stats['fallback']}건"
+        )
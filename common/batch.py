@@ -0,0 +1,26 @@
+"""
+여러 건의 Bedrock 요청을 스레드 풀로 동시에 처리하는 일괄 실행 모듈
+동시 실행 수만 제한하며, 요청 속도 제한과 스로틀링 재시도는 공유 Bedrock 클라이언트
+(common.async_bedrock, common.resilience)가 프로세스 전체 기준으로 처리합니다.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+def run_batch(func, items, max_workers=4):
+    """
+    items 의 각 항목에 func 를 동시에 적용하고, 끝나는 순서대로 결과를 돌려주는 제너레이터
+    진행 상황 표시(st.progress 등)는 이 제너레이터를 순회하는 쪽(메인 스레드)에서 합니다.
+    :param func: 항목 하나를 받아 결과를 돌려주는 함수
+    :param items: 처리할 항목 리스트
+    :param max_workers: 동시에 실행할 최대 요청 수
+    :return: (항목 인덱스, 결과 딕셔너리) - 결과에는 result, error 키가 있음
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(func, item): i for i, item in enumerate(items)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                yield index, {"result": future.result(), "error": None}
+            except Exception as e:
+                yield index, {"result": None, "error": str(e)}
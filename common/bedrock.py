@@ -0,0 +1,118 @@
+"""
+Bedrock 런타임 클라이언트를 만드는 공통 팩토리
+st.cache_resource 로 프로세스당 하나의 클라이언트를 만들어 모든 세션과 재실행(rerun)이 함께 사용합니다.
+
+환경 변수로 설정을 조정할 수 있습니다.
+- BEDROCK_REGION: 리전 (기본값 us-east-1)
+- BEDROCK_MAX_POOL_CONNECTIONS: 커넥션 풀 크기 (기본값 20)
+- BEDROCK_CONNECT_TIMEOUT / BEDROCK_READ_TIMEOUT: 연결/응답 대기 시간 (초)
+- BEDROCK_MAX_ATTEMPTS: 재시도를 포함한 최대 시도 횟수 (adaptive 재시도 모드)
+  비동기 클라이언트 계층(common.async_bedrock)은 재시도와 속도 조절을 직접 하므로 1회 시도 클라이언트를 따로 사용
+- BEDROCK_FAKE=1: AWS 대신 가짜 클라이언트(common.fake_bedrock) 사용
+- BEDROCK_ENDPOINT_URL: AWS 대신 연결할 주소 (예: 로컬 mock 서버 common.mock_bedrock)
+
+boto3 는 불러오는 데 시간이 걸리므로 클라이언트를 처음 만들 때 import 합니다.
+(사이드바 통계만 표시하는 페이지는 boto3 를 불러오지 않음)
+"""
+
+import os
+import threading
+
+import streamlit as st
+
+_stats = {"created": 0, "requested": 0}
+_stats_lock = threading.Lock()
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def client_settings():
+    """
+    환경 변수에서 클라이언트 설정값을 읽어오는 함수
+    :return: 설정값 딕셔너리 (캐시 키로도 사용됨)
+    """
+    return {
+        "region_name": os.environ.get("BEDROCK_REGION", "us-east-1"),
+        "max_pool_connections": _env_int("BEDROCK_MAX_POOL_CONNECTIONS", 20),
+        "connect_timeout": _env_int("BEDROCK_CONNECT_TIMEOUT", 5),
+        "read_timeout": _env_int("BEDROCK_READ_TIMEOUT", 120),
+        "max_attempts": _env_int("BEDROCK_MAX_ATTEMPTS", 5),
+        "fake": os.environ.get("BEDROCK_FAKE") == "1",
+        "endpoint_url": os.environ.get("BEDROCK_ENDPOINT_URL") or None,
+    }
+
+
+def build_config(settings):
+    """
+    커넥션 풀, keep-alive, 재시도, 타임아웃이 설정된 botocore Config 를 만드는 함수
+    :param settings: client_settings() 의 반환값
+    :return: botocore.config.Config
+    """
+    from botocore.config import Config
+
+    return Config(
+        region_name=settings["region_name"],
+        max_pool_connections=settings["max_pool_connections"],  # 동시 요청용 커넥션 풀
+        tcp_keepalive=True,  # 유휴 커넥션을 유지하여 TLS 재연결 비용 절감
+        connect_timeout=settings["connect_timeout"],
+        read_timeout=settings["read_timeout"],
+        retries={
+            "max_attempts": settings["max_attempts"],
+            "mode": "adaptive",  # 스로틀링 발생 시 요청 속도를 스스로 조절
+        },
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def _create_client(**settings):
+    # 설정값이 같으면 캐시된 클라이언트를 돌려주므로 이 함수 본문은 한 번만 실행됨
+    with _stats_lock:
+        _stats["created"] += 1
+
+    if settings["fake"]:
+        from common.fake_bedrock import FakeBedrockClient
+
+        return FakeBedrockClient()
+
+    import boto3
+
+    return boto3.client(
+        service_name="bedrock-runtime",
+        endpoint_url=settings["endpoint_url"],
+        config=build_config(settings),
+    )
+
+
+def get_bedrock_client(**overrides):
+    """
+    공유 Bedrock 런타임 클라이언트를 돌려주는 함수
+    boto3 클라이언트는 스레드 안전하므로 여러 세션이 동시에 사용해도 됩니다.
+    :param overrides: 환경 변수 대신 사용할 설정값 (예: max_attempts=1), 설정이 다르면 별도 클라이언트
+    :return: bedrock-runtime 클라이언트
+    """
+    with _stats_lock:
+        _stats["requested"] += 1
+    return _create_client(**dict(client_settings(), **overrides))
+
+
+def client_stats():
+    """
+    클라이언트 생성/재사용 횟수를 돌려주는 함수
+    :return: created(생성), requested(요청), reused(재사용) 횟수 딕셔너리
+    """
+    with _stats_lock:
+        created = _stats["created"]
+        requested = _stats["requested"]
+    return {"created": created, "requested": requested, "reused": requested - created}
+
+
+def render_client_stats():
+    """
+    사이드바에 클라이언트 생성/재사용 횟수를 표시하는 함수
+    """
+    stats = client_stats()
+    st.sidebar.caption(
+        f"🔌 Bedrock 클라이언트: 생성 {stats['created']}회 · 재사용 {stats['reused']}회"
+    )
@@ -0,0 +1,374 @@
+"""
+챗봇 대화 기록 저장소 (SQLite)
+st.session_state 의 리스트 대신 SQLite 파일에 메시지를 한 줄씩 추가하므로
+서버를 다시 시작해도 대화가 남고, 대화 ID 로 언제든 이어서 대화할 수 있습니다.
+
+- 메시지 테이블은 (대화 ID, 턴 번호) 를 기본 키(인덱스)로 사용하여
+  최근 N개 / 특정 턴 이전 N개를 대화 길이와 관계없이 인덱스 범위 검색으로 읽습니다.
+- 메시지 추가는 새 행 INSERT 한 번과 대화 행의 턴 수 갱신뿐이며 이전 기록을 다시 쓰지 않습니다.
+- 화면에는 최근 메시지 한 페이지만 그리고, 오래된 메시지는 "이전 메시지 더 보기" 를 누를 때만 읽습니다.
+  (대화가 길어져도 재실행 비용이 일정)
+- WAL 모드라서 런처로 여러 프로세스를 띄워도 읽기와 쓰기가 서로 막지 않습니다.
+- 대화마다 만든 사용자(소유자)를 저장하여, 최근 대화 목록과 대화 이어하기(주소, ID 입력)는
+  자기 대화만 보이고 열 수 있습니다. 로그인(st.user, 믿을 수 있는 프록시 헤더)하지 않은 사용자는
+  주소(?owner=...)에 넣어 둔 무작위 토큰으로 구분하므로, 그 주소를 아는 사람만 대화를 이어갈 수 있습니다.
+
+환경 변수
+- CHAT_STORE_DB: SQLite 파일 경로 (기본값 data/chat_history.sqlite)
+"""
+
+import json
+import os
+import re
+import secrets
+import sqlite3
+import time
+import uuid
+
+import streamlit as st
+
+from common.accounting import ANONYMOUS, current_caller
+
+DEFAULT_PATH = "data/chat_history.sqlite"
+
+# 한 번에 화면에 그리는 메시지 수
+PAGE_SIZE = 20
+
+# 대화 목록에 표시할 제목 길이 (첫 질문 앞부분)
+TITLE_LENGTH = 40
+
+# 주소(?conversation=...&owner=...)와 세션 상태에서 사용하는 키
+QUERY_PARAM = "conversation"
+OWNER_PARAM = "owner"
+_OWNER_KEY = "chat_owner_token"
+_CONVERSATION_KEY = "chat_conversation_id"
+_PAGES_KEY = "chat_history_pages"
+
+# 다른 사용자의 대화에 메시지를 추가하려 할 때 보여 줄 문구
+NOT_OWNER_MESSAGE = "이 대화는 다른 사용자의 대화라서 이어갈 수 없습니다. 새 대화를 시작했으니 질문을 다시 입력해주세요."
+
+
+def new_conversation_id():
+    """
+    새 대화 ID 를 만드는 함수 (첫 메시지를 저장할 때 대화가 만들어짐)
+    """
+    return uuid.uuid4().hex[:12]
+
+
+class ChatStore:
+    """
+    SQLite 대화 기록 저장소
+    :param db_path: SQLite 파일 경로
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")  # 여러 프로세스가 동시에 읽고 쓸 수 있도록
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS chat_conversations (
+                    id TEXT PRIMARY KEY,
+                    app TEXT NOT NULL,
+                    owner TEXT NOT NULL DEFAULT 'anonymous',
+                    title TEXT NOT NULL,
+                    turns INTEGER NOT NULL,
+                    state TEXT NOT NULL DEFAULT '{}',
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            # 사용자 컬럼이 없던 기존 파일은 컬럼을 추가
+            # (이전 대화는 ANONYMOUS 소유가 되며, 로그인하지 않은 사용자는 토큰으로 구분하므로 아무도 열 수 없음)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(chat_conversations)")]
+            if "owner" not in columns:
+                conn.execute(
+                    "ALTER TABLE chat_conversations ADD COLUMN owner TEXT NOT NULL DEFAULT 'anonymous'"
+                )
+            conn.execute("DROP INDEX IF EXISTS idx_chat_conversations_app")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_chat_conversations_owner "
+                "ON chat_conversations (app, owner, updated_at)"
+            )
+            # (대화 ID, 턴) 이 기본 키이자 페이지 조회용 인덱스 (WITHOUT ROWID: 키 순서대로 저장)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS chat_messages (
+                    conversation_id TEXT NOT NULL,
+                    turn INTEGER NOT NULL,
+                    role TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (conversation_id, turn)
+                ) WITHOUT ROWID
+                """
+            )
+
+    def append(self, conversation_id, app, role, content, owner=ANONYMOUS):
+        """
+        대화에 메시지 하나를 추가하는 함수 (대화가 없으면 새로 만듦)
+        :param conversation_id: 대화 ID
+        :param app: 앱 이름 (대화 목록 구분용)
+        :param role: "user" / "assistant"
+        :param content: 메시지 텍스트
+        :param owner: 사용자 (다른 사용자의 대화에는 추가하지 않음)
+        :return: 추가된 메시지의 턴 번호 (1부터 시작)
+        :raises PermissionError: 다른 사용자가 만든 대화일 때
+        """
+        now = time.time()
+        with self._connect() as conn:
+            # 턴 수 증가와 메시지 추가를 한 트랜잭션으로 처리 (동시에 추가해도 턴 번호가 겹치지 않음)
+            row = conn.execute(
+                """
+                INSERT INTO chat_conversations (id, app, owner, title, turns, created_at, updated_at)
+                VALUES (?, ?, ?, ?, 1, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET turns = turns + 1, updated_at = excluded.updated_at
+                WHERE owner = excluded.owner
+                RETURNING turns
+                """,
+                (conversation_id, app, owner, content[:TITLE_LENGTH], now, now),
+            ).fetchone()
+            if row is None:
+                raise PermissionError(f"다른 사용자의 대화({conversation_id})에는 메시지를 추가할 수 없습니다.")
+            turn = row[0]
+            conn.execute(
+                "INSERT INTO chat_messages VALUES (?, ?, ?, ?, ?)",
+                (conversation_id, turn, role, content, now),
+            )
+        return turn
+
+    def count(self, conversation_id):
+        """
+        대화의 메시지 수를 돌려주는 함수 (없는 대화면 0)
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT turns FROM chat_conversations WHERE id = ?", (conversation_id,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def exists(self, conversation_id, owner=None):
+        """
+        저장된 대화인지 확인하는 함수
+        :param owner: 사용자 (주면 그 사용자가 만든 대화일 때만 True)
+        """
+        if owner is None:
+            return self.count(conversation_id) > 0
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM chat_conversations WHERE id = ? AND owner = ?",
+                (conversation_id, owner),
+            ).fetchone()
+        return row is not None
+
+    def page(self, conversation_id, limit=PAGE_SIZE, before_turn=None):
+        """
+        before_turn 이전의 최근 메시지 limit 개를 오래된 순서로 돌려주는 함수
+        :param before_turn: 이 턴 이전의 메시지만 (None 이면 가장 최근부터)
+        :return: turn, role, content 딕셔너리 리스트
+        """
+        if before_turn is None:
+            before_turn = 2**62
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT turn, role, content FROM chat_messages
+                WHERE conversation_id = ? AND turn < ?
+                ORDER BY turn DESC LIMIT ?
+                """,
+                (conversation_id, before_turn, limit),
+            ).fetchall()
+        return [{"turn": turn, "role": role, "content": content} for turn, role, content in reversed(rows)]
+
+    def messages(self, conversation_id):
+        """
+        대화 전체를 모델에 보낼 형식(role, content)으로 돌려주는 함수 (히스토리 압축용)
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT role, content FROM chat_messages WHERE conversation_id = ? ORDER BY turn",
+                (conversation_id,),
+            ).fetchall()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def conversations(self, app, owner, limit=20):
+        """
+        사용자가 앱에서 나눈 최근 대화 목록을 돌려주는 함수
+        :param app: 앱 이름
+        :param owner: 사용자
+        :return: id, title, turns, updated_at 딕셔너리 리스트 (최근 순)
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT id, title, turns, updated_at FROM chat_conversations
+                WHERE app = ? AND owner = ? ORDER BY updated_at DESC LIMIT ?
+                """,
+                (app, owner, limit),
+            ).fetchall()
+        return [
+            {"id": id_, "title": title, "turns": turns, "updated_at": updated_at}
+            for id_, title, turns, updated_at in rows
+        ]
+
+    def load_state(self, conversation_id):
+        """
+        대화별로 함께 저장해 둔 상태(예: 히스토리 요약)를 돌려주는 함수
+        :return: 딕셔너리 (없으면 빈 딕셔너리)
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT state FROM chat_conversations WHERE id = ?", (conversation_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def save_state(self, conversation_id, state):
+        """
+        대화별 상태를 저장하는 함수 (대화가 아직 없으면 저장하지 않음)
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE chat_conversations SET state = ? WHERE id = ?",
+                (json.dumps(state, ensure_ascii=False), conversation_id),
+            )
+
+
+@st.cache_resource(show_spinner=False)
+def get_chat_store():
+    """
+    프로세스 전체에서 공유하는 대화 기록 저장소를 돌려주는 함수
+    :return: ChatStore
+    """
+    path = os.environ.get("CHAT_STORE_DB") or DEFAULT_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    return ChatStore(path)
+
+
+def guest_owner(token):
+    """
+    로그인하지 않은 사용자의 소유자 값 (주소에 넣어 둔 토큰으로 구분)
+    """
+    return f"guest:{token}"
+
+
+def current_owner():
+    """
+    지금 세션의 대화 소유자
+    로그인한 사용자면 그 사용자, 아니면 주소의 owner 토큰(없으면 새로 만들어 주소에 넣음)으로 구분합니다.
+    (로그인하지 않은 사용자끼리 "anonymous" 하나를 함께 쓰면 서로의 대화가 보이므로)
+    """
+    user = current_caller()[1]
+    if user != ANONYMOUS:
+        return user
+    if _OWNER_KEY not in st.session_state:
+        token = st.query_params.get(OWNER_PARAM, "")
+        if not re.fullmatch(r"[0-9a-f]{32}", token):
+            token = secrets.token_hex(16)
+        st.session_state[_OWNER_KEY] = token
+    token = st.session_state[_OWNER_KEY]
+    if st.query_params.get(OWNER_PARAM) != token:
+        st.query_params[OWNER_PARAM] = token  # 새로고침·북마크해도 같은 소유자로 이어지도록
+    return guest_owner(token)
+
+
+def _switch_conversation(conversation_id):
+    st.session_state[_CONVERSATION_KEY] = conversation_id
+    st.session_state[_PAGES_KEY] = 1
+    st.query_params[QUERY_PARAM] = conversation_id
+
+
+def leave_foreign_conversation():
+    """
+    다른 사용자의 대화라서 메시지를 추가하지 못했을 때(append 의 PermissionError) 오류를 표시하고 새 대화로 바꾸는 함수
+    """
+    st.error(NOT_OWNER_MESSAGE)
+    _switch_conversation(new_conversation_id())
+
+
+def current_conversation(store):
+    """
+    이번 세션의 대화 ID 를 돌려주는 함수
+    주소에 ?conversation=ID 가 있고 이 사용자가 저장한 대화면 그 대화를 이어가고, 아니면 새 대화 ID 를 만듭니다.
+    (대화 ID 를 주소에 넣어 두므로 새로고침하거나 서버를 다시 시작해도 같은 대화가 열림)
+    """
+    if _CONVERSATION_KEY not in st.session_state:
+        requested = st.query_params.get(QUERY_PARAM)
+        if requested and store.exists(requested, current_owner()):
+            _switch_conversation(requested)
+        else:
+            _switch_conversation(new_conversation_id())
+    return st.session_state[_CONVERSATION_KEY]
+
+
+def _resume_from_input(store):
+    requested = st.session_state.get("chat_resume_id", "").strip()
+    if store.exists(requested, current_owner()):
+        _switch_conversation(requested)
+    else:
+        st.session_state["chat_resume_error"] = requested
+
+
+def render_conversation_controls(store, app):
+    """
+    사이드바에 현재 대화 ID, 새 대화 버튼, 대화 이어하기(최근 대화 / ID 입력)를 표시하는 함수
+    :param store: ChatStore
+    :param app: 앱 이름 (최근 대화 목록 구분용)
+    :return: 현재 대화 ID
+    """
+    conversation_id = current_conversation(store)
+    st.sidebar.subheader("대화 기록")
+    st.sidebar.caption(f"대화 ID: `{conversation_id}` (주소에 저장되어 새로고침해도 이어짐)")
+    st.sidebar.button(
+        "새 대화 시작", on_click=_switch_conversation, args=(new_conversation_id(),)
+    )
+
+    recent = [
+        item
+        for item in store.conversations(app, current_owner(), limit=10)
+        if item["id"] != conversation_id
+    ]
+    if recent:
+        with st.sidebar.expander("최근 대화"):
+            for item in recent:
+                st.button(
+                    f"{item['title']} ({item['turns']})",
+                    key=f"chat_recent_{item['id']}",
+                    on_click=_switch_conversation,
+                    args=(item["id"],),
+                )
+
+    st.sidebar.text_input(
+        "대화 ID로 이어하기", key="chat_resume_id", on_change=_resume_from_input, args=(store,)
+    )
+    missing = st.session_state.pop("chat_resume_error", None)
+    if missing:
+        st.sidebar.warning(f"대화 ID `{missing}` 를 찾을 수 없습니다.")
+    return st.session_state[_CONVERSATION_KEY]
+
+
+def _load_more():
+    st.session_state[_PAGES_KEY] = st.session_state.get(_PAGES_KEY, 1) + 1
+
+
+def render_history(store, conversation_id, page_size=PAGE_SIZE):
+    """
+    대화의 최근 메시지만 채팅 버블로 그리는 함수
+    오래된 메시지는 "이전 메시지 더 보기" 를 누른 만큼만 읽어서 그립니다.
+    """
+    pages = st.session_state.get(_PAGES_KEY, 1)
+    messages = store.page(conversation_id, limit=page_size * pages)
+    total = store.count(conversation_id)
+    if total > len(messages):
+        st.button(
+            f"⬆️ 이전 메시지 더 보기 ({total - len(messages)}개)", on_click=_load_more
+        )
+    for message in messages:
+        with st.chat_message(message["role"]):  # 메시지 역할에 따른 채팅 버블 생성
+            st.markdown(message["content"])  # 메시지 내용을 마크다운으로 렌더링
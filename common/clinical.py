@@ -0,0 +1,125 @@
+"""
+BMI 및 체중 기반 약물 용량 계산 모듈
+모든 함수는 숫자 하나뿐 아니라 NumPy 배열이나 DataFrame 컬럼도 그대로 받아
+병동 전체 환자를 반복문 없이 한 번에 계산합니다.
+"""
+
+import numpy as np
+import pandas as pd
+
+# BMI 분류 기준 (WHO 아시아-태평양)
+BMI_BINS = (18.5, 23.0, 25.0, 30.0)
+BMI_CATEGORIES = ("저체중", "정상", "과체중", "비만 1단계", "비만 2단계 이상")
+BMI_COLORS = ("blue", "green", "orange", "orange", "red")
+BMI_RANGES = ("< 18.5", "18.5 - 22.9", "23.0 - 24.9", "25.0 - 29.9", "≥ 30.0")
+
+# 목표 체중 계산 기준 BMI
+TARGET_BMI = 22
+
+# 투여 빈도 표시 -> 1일 투여 횟수
+FREQUENCIES = {"1일 1회": 1, "1일 2회": 2, "1일 3회": 3, "1일 4회": 4}
+
+# 일일 총 투여량 경고 기준 (mg)
+DAILY_DOSE_THRESHOLD = 2000
+
+# 일괄 계산 명단의 컬럼
+HEIGHT_COLUMN = "키(cm)"
+WEIGHT_COLUMN = "체중(kg)"
+DRUG_COLUMN = "약물명"
+DOSE_PER_KG_COLUMN = "용량(mg/kg)"
+TIMES_PER_DAY_COLUMN = "1일 투여 횟수"
+
+
+def calculate_bmi(height_cm, weight_kg):
+    """
+    BMI 를 계산하는 함수 (키나 체중이 0 이하이면 NaN)
+    :param height_cm: 키 (cm), 숫자 또는 배열
+    :param weight_kg: 체중 (kg), 숫자 또는 배열
+    :return: BMI
+    """
+    height_m = np.asarray(height_cm, dtype=float) / 100
+    weight_kg = np.asarray(weight_kg, dtype=float)
+    valid = (height_m > 0) & (weight_kg > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(valid, weight_kg / height_m**2, np.nan)
+
+
+def bmi_category_codes(bmi):
+    """
+    BMI 를 분류 번호로 바꾸는 함수 (BMI_CATEGORIES 의 위치, 계산할 수 없는 값은 -1)
+    구간 경계값은 위쪽 분류에 포함됩니다. (예: 23.0 은 과체중)
+    """
+    bmi = np.asarray(bmi, dtype=float)
+    return np.where(np.isnan(bmi), -1, np.digitize(bmi, BMI_BINS))
+
+
+def classify_bmi(bmi):
+    """
+    BMI 를 분류 이름(범주형)으로 바꾸는 함수
+    :return: pandas.Categorical (계산할 수 없는 값은 NaN)
+    """
+    return pd.Categorical.from_codes(
+        np.atleast_1d(bmi_category_codes(bmi)), categories=list(BMI_CATEGORIES)
+    )
+
+
+def target_weight(height_cm, target_bmi=TARGET_BMI):
+    """
+    목표 BMI 기준 체중을 계산하는 함수
+    :return: 목표 체중 (kg)
+    """
+    height_m = np.asarray(height_cm, dtype=float) / 100
+    return target_bmi * height_m**2
+
+
+def dose_schedule(weight_kg, dose_per_kg, times_per_day):
+    """
+    체중 기반 1회 투여량과 1일 총 투여량을 계산하는 함수
+    :param weight_kg: 체중 (kg)
+    :param dose_per_kg: 용량 (mg/kg)
+    :param times_per_day: 1일 투여 횟수
+    :return: (1회 투여량 mg, 1일 총 투여량 mg)
+    """
+    per_dose = np.asarray(weight_kg, dtype=float) * np.asarray(dose_per_kg, dtype=float)
+    return per_dose, per_dose * np.asarray(times_per_day, dtype=float)
+
+
+def dose_warnings(daily_dose, threshold=DAILY_DOSE_THRESHOLD):
+    """
+    1일 총 투여량이 기준을 넘는지 확인하는 함수
+    :return: 초과 여부 (bool)
+    """
+    return np.asarray(daily_dose, dtype=float) > threshold
+
+
+def calculate_census(census, dose_threshold=DAILY_DOSE_THRESHOLD):
+    """
+    병동 명단 전체의 BMI, 목표 체중, 투여량, 경고를 한 번에 계산하는 함수
+    용량 컬럼이 없으면 BMI 관련 결과만 계산합니다.
+    :param census: 키(cm), 체중(kg) 컬럼이 있는 DataFrame
+        (선택) 용량(mg/kg), 1일 투여 횟수 컬럼
+    :param dose_threshold: 1일 총 투여량 경고 기준 (mg), 숫자 또는 행별 배열
+    :return: 결과 컬럼이 추가된 새 DataFrame
+    """
+    height = pd.to_numeric(census[HEIGHT_COLUMN], errors="coerce").to_numpy(float)
+    weight = pd.to_numeric(census[WEIGHT_COLUMN], errors="coerce").to_numpy(float)
+
+    result = census.copy()
+    bmi = calculate_bmi(height, weight)
+    goal = np.where(np.isnan(bmi), np.nan, target_weight(height))
+    result["BMI"] = bmi.round(1)
+    result["분류"] = classify_bmi(bmi)
+    result["목표 체중(kg)"] = goal.round(1)
+    result["체중 차이(kg)"] = (weight - goal).round(1)  # 양수: 감량 필요, 음수: 증량 필요
+
+    if DOSE_PER_KG_COLUMN in census.columns and TIMES_PER_DAY_COLUMN in census.columns:
+        per_dose, daily_dose = dose_schedule(
+            weight,
+            pd.to_numeric(census[DOSE_PER_KG_COLUMN], errors="coerce").to_numpy(float),
+            pd.to_numeric(census[TIMES_PER_DAY_COLUMN], errors="coerce").to_numpy(float),
+        )
+        result["1회 투여량(mg)"] = per_dose.round(1)
+        result["1일 총 투여량(mg)"] = daily_dose.round(1)
+        result["용량 경고"] = dose_warnings(daily_dose, dose_threshold)
+
+    return result
@@ -0,0 +1,110 @@
+"""
+그래프용 시계열 다운샘플링 모듈
+브라우저로 보내는 점의 수를 화면 해상도(픽셀 폭) 수준으로 줄여, 분 단위 모니터링 데이터도
+그래프가 멈추지 않도록 합니다. 원본 데이터는 그대로 두고 표시할 행만 고릅니다.
+
+- LTTB (Largest-Triangle-Three-Buckets): 모양을 가장 잘 보존하는 점을 구간마다 하나씩 선택
+- Min/Max: 구간마다 최솟값과 최댓값을 남겨 급격한 변화(스파이크)를 놓치지 않음
+"""
+
+import numpy as np
+
+METHODS = {"lttb": "LTTB (모양 보존)", "minmax": "Min/Max (극값 보존)"}
+
+
+def lttb_indices(x, y, n_out):
+    """
+    LTTB 알고리즘으로 남길 점의 인덱스를 고르는 함수
+    :param x: x 값 (정렬된 숫자 배열)
+    :param y: y 값 배열
+    :param n_out: 남길 점의 개수 (3 이상)
+    :return: 선택된 인덱스 배열 (오름차순)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # 측정이 빠진 점(NaN)은 빼고 고른 뒤 원래 위치로 되돌림 (NaN 이 섞이면 삼각형 넓이가 모두 NaN 이 됨)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    if not valid.all():
+        positions = np.flatnonzero(valid)
+        return positions[lttb_indices(x[valid], y[valid], n_out)]
+
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # 첫 점과 마지막 점을 제외한 나머지를 n_out - 2 개 구간으로 나눔
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # 다음 구간의 평균점 (마지막 구간은 마지막 점)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        # 이전 선택점 - 현재 구간의 점 - 다음 구간 평균점이 이루는 삼각형 넓이가 가장 큰 점 선택
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.nanargmax(area)) if end > start else start
+        selected[i + 1] = previous
+
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """
+    구간마다 최솟값과 최댓값 위치를 남기는 함수 (구간 수 = n_out / 2, 반복문 없이 계산)
+    :param y: y 값 배열
+    :param n_out: 남길 점의 대략적인 개수
+    :return: 선택된 인덱스 배열 (오름차순)
+    """
+    n = len(y)
+    n_buckets = max(1, n_out // 2)
+    if n <= n_out:
+        return np.arange(n)
+
+    # 구간 크기에 맞게 NaN 으로 채워 (구간 수, 구간 크기) 2차원 배열로 만듦
+    size = -(-n // n_buckets)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(n_buckets, size)
+
+    valid = ~np.all(np.isnan(padded), axis=1)  # 값이 하나도 없는 구간 제외
+    offsets = np.arange(n_buckets)[valid] * size
+    mins = offsets + np.nanargmin(padded[valid], axis=1)
+    maxs = offsets + np.nanargmax(padded[valid], axis=1)
+    return np.unique(np.concatenate([mins, maxs]))
+
+
+def downsample(data, columns, n_out=1000, method="lttb"):
+    """
+    DatetimeIndex 를 가진 DataFrame 에서 그래프에 그릴 행만 골라내는 함수
+    여러 컬럼을 함께 그리는 경우 컬럼별로 고른 인덱스를 합칩니다.
+    :param data: 시간순으로 정렬된 DataFrame
+    :param columns: 그래프로 그릴 컬럼 리스트
+    :param n_out: 컬럼당 남길 점의 개수 (대략 그래프의 픽셀 폭)
+    :param method: "lttb" 또는 "minmax"
+    :return: 선택된 행만 담은 DataFrame
+    """
+    if len(data) <= n_out:
+        return data
+
+    x = data.index.asi8 if hasattr(data.index, "asi8") else np.arange(len(data))
+    selected = [
+        lttb_indices(x, data[column].to_numpy(), n_out)
+        if method == "lttb"
+        else minmax_indices(data[column].to_numpy(dtype=np.float64), n_out)
+        for column in columns
+    ]
+    return data.iloc[np.unique(np.concatenate(selected))]
@@ -0,0 +1,85 @@
+"""
+대용량 데이터 내보내기 모듈
+DataFrame 전체를 한 번에 문자열로 만들지 않고, 일정 행 수씩 나눠서 임시 파일에 씁니다.
+임시 파일(SpooledTemporaryFile)은 작을 때는 메모리에, 커지면 디스크에 저장되므로
+행 수가 늘어도 변환 중 메모리 사용량이 일정하게 유지됩니다.
+"""
+
+import gzip
+import tempfile
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# 형식 키: (표시 이름, MIME 타입, 파일 확장자)
+EXPORT_FORMATS = {
+    "csv": ("CSV", "text/csv", ".csv"),
+    "csv.gz": ("CSV (gzip 압축)", "application/gzip", ".csv.gz"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet", ".parquet"),
+}
+
+CHUNK_ROWS = 100_000  # 한 번에 변환할 행 수
+SPOOL_MAX_MEMORY = 16 * 1024 * 1024  # 이보다 커지면 임시 파일을 디스크로 넘김
+
+
+def iter_csv_chunks(data, chunk_rows=CHUNK_ROWS, encoding="utf-8-sig"):
+    """
+    DataFrame 을 CSV 바이트 조각으로 나눠서 돌려주는 제너레이터
+    엑셀에서 한글이 깨지지 않도록 첫 조각에만 BOM(utf-8-sig)을 붙입니다.
+    :param data: 내보낼 DataFrame
+    :param chunk_rows: 조각당 행 수
+    :return: CSV 바이트 조각
+    """
+    for start in range(0, max(len(data), 1), chunk_rows):
+        chunk = data.iloc[start : start + chunk_rows]
+        first = start == 0
+        yield chunk.to_csv(index=False, header=first).encode(
+            encoding if first else "utf-8"
+        )
+
+
+def write_csv(data, fileobj, chunk_rows=CHUNK_ROWS, compress=False):
+    """
+    CSV(또는 gzip 압축 CSV)를 조각 단위로 파일에 쓰는 함수
+    :param data: 내보낼 DataFrame
+    :param fileobj: 바이너리 쓰기 파일 객체
+    :param compress: True 이면 gzip 으로 압축
+    """
+    target = gzip.GzipFile(fileobj=fileobj, mode="wb") if compress else fileobj
+    try:
+        for chunk in iter_csv_chunks(data, chunk_rows):
+            target.write(chunk)
+    finally:
+        if compress:
+            target.close()  # gzip 꼬리(trailer)를 기록, fileobj 자체는 닫지 않음
+
+
+def write_parquet(data, fileobj, chunk_rows=CHUNK_ROWS):
+    """
+    Parquet 을 행 그룹 단위로 파일에 쓰는 함수
+    :param data: 내보낼 DataFrame
+    :param fileobj: 바이너리 쓰기 파일 객체
+    """
+    schema = pa.Schema.from_pandas(data.iloc[:0], preserve_index=False)
+    with pq.ParquetWriter(fileobj, schema) as writer:
+        for start in range(0, len(data), chunk_rows):
+            chunk = data.iloc[start : start + chunk_rows]
+            writer.write_table(
+                pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            )
+
+
+def export_file(data, fmt="csv", chunk_rows=CHUNK_ROWS):
+    """
+    선택한 형식으로 내보낸 임시 파일을 돌려주는 함수 (처음 위치로 되감아서 반환)
+    :param data: 내보낼 DataFrame
+    :param fmt: EXPORT_FORMATS 의 키
+    :return: 읽기 가능한 SpooledTemporaryFile
+    """
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    if fmt == "parquet":
+        write_parquet(data, spooled, chunk_rows)
+    else:
+        write_csv(data, spooled, chunk_rows, compress=fmt == "csv.gz")
+    spooled.seek(0)
+    return spooled
@@ -0,0 +1,164 @@
+"""
+AWS 없이 동작하는 가짜 Bedrock 클라이언트
+invoke_model / invoke_model_with_response_stream 의 응답 형식을 흉내 내어
+오프라인에서 스트리밍과 첫 토큰 도착 시간(TTFT)을 측정할 때 사용합니다.
+"""
+
+import io
+import json
+import time
+
+DEFAULT_REPLY = (
+    "안녕하세요. 진료 후 주의사항을 안내해 드립니다. "
+    "처방받은 약은 정해진 시간에 복용하시고, 증상이 악화되면 바로 병원에 연락해 주세요. "
+    "충분한 휴식과 수분 섭취를 권장합니다."
+)
+
+
+def split_tokens(text, chars_per_token=4):
+    """
+    텍스트를 일정 길이의 조각(가짜 토큰)으로 나누는 함수
+    :param text: 나눌 텍스트
+    :param chars_per_token: 토큰 하나에 해당하는 글자 수
+    :return: 텍스트 조각 리스트
+    """
+    return [
+        text[i : i + chars_per_token] for i in range(0, len(text), chars_per_token)
+    ]
+
+
+def _count_input_tokens(body):
+    # 요청 본문의 글자 수로 입력 토큰 수를 대략 계산
+    # (cache_control 이 붙은 system 블록은 캐시 읽기/쓰기 토큰으로 따로 집계되므로 제외)
+    request = json.loads(body)
+    chars = len(json.dumps(request.get("messages", []), ensure_ascii=False))
+    system = request.get("system")
+    if isinstance(system, str):
+        chars += len(system)
+    elif isinstance(system, list) and not any("cache_control" in b for b in system):
+        chars += sum(len(block.get("text", "")) for block in system)
+    return max(1, chars // 4)
+
+
+def _reply_tokens(reply, body):
+    # 요청의 max_tokens 보다 길면 잘라내고 stop_reason 을 max_tokens 로 표시
+    tokens = split_tokens(reply)
+    max_tokens = json.loads(body).get("max_tokens")
+    if max_tokens is not None and len(tokens) > max_tokens:
+        return tokens[:max_tokens], "max_tokens"
+    return tokens, "end_turn"
+
+
+def _cached_prefix(body):
+    # cache_control 이 붙은 system 블록이 있으면 (접두어 문자열, 추정 토큰 수)를 돌려줌
+    system = json.loads(body).get("system")
+    if not isinstance(system, list) or not any("cache_control" in b for b in system):
+        return None, 0
+    prefix = "".join(block.get("text", "") for block in system)
+    return prefix, max(1, len(prefix) // 4)
+
+
+def _chunk(payload):
+    # 실제 Bedrock 이벤트 스트림과 같은 {"chunk": {"bytes": ...}} 형식
+    return {"chunk": {"bytes": json.dumps(payload, ensure_ascii=False).encode()}}
+
+
+class FakeBedrockClient:
+    """
+    boto3 bedrock-runtime 클라이언트를 대신하는 가짜 클라이언트
+    :param reply: 항상 돌려줄 응답 텍스트
+    :param first_token_latency: 첫 토큰이 나오기까지 걸리는 시간 (초)
+    :param token_interval: 이후 토큰 사이의 간격 (초)
+    """
+
+    def __init__(self, reply=DEFAULT_REPLY, first_token_latency=0.5, token_interval=0.02):
+        self.reply = reply
+        self.first_token_latency = first_token_latency
+        self.token_interval = token_interval
+        self.calls = 0
+        self._prompt_cache = set()  # 프롬프트 캐싱 흉내: 이미 본 system 접두어
+
+    def invoke_model(self, modelId, body, **kwargs):
+        """
+        전체 응답이 만들어질 때까지 기다렸다가 한 번에 돌려줌 (invoke_model 과 동일한 동작)
+        """
+        self.calls += 1
+        tokens, stop_reason = _reply_tokens(self.reply, body)
+        time.sleep(self.first_token_latency + self.token_interval * len(tokens))
+
+        response_body = {
+            "id": f"msg_fake_{self.calls}",
+            "type": "message",
+            "role": "assistant",
+            "model": modelId,
+            "content": [{"type": "text", "text": "".join(tokens)}],
+            "stop_reason": stop_reason,
+            "usage": {
+                "input_tokens": _count_input_tokens(body),
+                "output_tokens": len(tokens),
+                "cache_read_input_tokens": 0,
+                "cache_creation_input_tokens": 0,
+            },
+        }
+
+        # cache_control 이 붙은 접두어는 처음엔 캐시 쓰기, 이후엔 캐시 읽기로 집계
+        prefix, prefix_tokens = _cached_prefix(body)
+        if prefix is not None:
+            if prefix in self._prompt_cache:
+                response_body["usage"]["cache_read_input_tokens"] = prefix_tokens
+            else:
+                self._prompt_cache.add(prefix)
+                response_body["usage"]["cache_creation_input_tokens"] = prefix_tokens
+        return {"body": io.BytesIO(json.dumps(response_body, ensure_ascii=False).encode())}
+
+    def invoke_model_with_response_stream(self, modelId, body, **kwargs):
+        """
+        토큰을 하나씩 흘려보내는 이벤트 스트림을 돌려줌
+        """
+        self.calls += 1
+        tokens, stop_reason = _reply_tokens(self.reply, body)
+        return {"body": self._events(modelId, _count_input_tokens(body), tokens, stop_reason)}
+
+    def _events(self, model_id, input_tokens, tokens, stop_reason):
+        yield _chunk(
+            {
+                "type": "message_start",
+                "message": {
+                    "id": f"msg_fake_{self.calls}",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": model_id,
+                    "content": [],
+                    "usage": {"input_tokens": input_tokens, "output_tokens": 1},
+                },
+            }
+        )
+        yield _chunk(
+            {
+                "type": "content_block_start",
+                "index": 0,
+                "content_block": {"type": "text", "text": ""},
+            }
+        )
+
+        time.sleep(self.first_token_latency)
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(self.token_interval)
+            yield _chunk(
+                {
+                    "type": "content_block_delta",
+                    "index": 0,
+                    "delta": {"type": "text_delta", "text": token},
+                }
+            )
+
+        yield _chunk({"type": "content_block_stop", "index": 0})
+        yield _chunk(
+            {
+                "type": "message_delta",
+                "delta": {"stop_reason": stop_reason, "stop_sequence": None},
+                "usage": {"output_tokens": len(tokens)},
+            }
+        )
+        yield _chunk({"type": "message_stop"})
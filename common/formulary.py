@@ -0,0 +1,208 @@
+"""
+약물 목록(formulary) 검색 및 용량 기준 조회 모듈
+약물 목록 CSV 를 한 번 읽어서 색인을 만들어 두고, 약물 투여 계산기가 재실행될 때마다 재사용합니다.
+
+- 이름 조회: 정규화한 약물명(한글/영문) -> 행 번호 딕셔너리로 O(1) 조회
+- 자동 완성: 정렬된 이름 목록에서 이진 탐색으로 접두어 검색,
+  접두어 결과가 부족하면 3글자 조각(trigram) 색인으로 이름 중간에 검색어가 들어 있는 약물도 검색
+- 용량 기준: 약물별 mg/kg 범위와 1일 최대 투여량
+
+기본 목록(data/formulary.csv)의 값은 교육용 예시이며 실제 처방 기준이 아닙니다.
+
+환경 변수
+- FORMULARY_PATH: 약물 목록 CSV 경로 (기본값 data/formulary.csv)
+"""
+
+import bisect
+import os
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+NAME_COLUMN = "약물명"
+ENGLISH_NAME_COLUMN = "영문명"
+MIN_DOSE_COLUMN = "최소 용량(mg/kg)"
+MAX_DOSE_COLUMN = "최대 용량(mg/kg)"
+DAILY_MAX_COLUMN = "1일 최대 투여량(mg)"
+
+DEFAULT_PATH = "data/formulary.csv"
+
+
+def normalize_name(name):
+    """
+    검색용으로 약물명을 정규화하는 함수 (소문자, 공백 제거)
+    """
+    return "".join(str(name).lower().split())
+
+
+def trigrams(text):
+    """
+    문자열을 3글자 조각 집합으로 나누는 함수 (3글자보다 짧으면 문자열 자체)
+    """
+    if len(text) < 3:
+        return {text} if text else set()
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class Formulary:
+    """
+    약물 목록과 검색 색인
+    :param table: 약물명, 영문명, 최소/최대 용량(mg/kg), 1일 최대 투여량(mg) 컬럼이 있는 DataFrame
+    """
+
+    def __init__(self, table):
+        self.table = table.reset_index(drop=True)
+        names = self.table[NAME_COLUMN].astype(str).tolist()
+        english = (
+            self.table[ENGLISH_NAME_COLUMN].fillna("").astype(str).tolist()
+            if ENGLISH_NAME_COLUMN in self.table.columns
+            else [""] * len(names)
+        )
+
+        # 조회용 값은 행마다 DataFrame 에 접근하지 않도록 배열로 꺼내 둠
+        self.names = names
+        self.min_dose = self.table[MIN_DOSE_COLUMN].to_numpy(float)
+        self.max_dose = self.table[MAX_DOSE_COLUMN].to_numpy(float)
+        self.daily_max = self.table[DAILY_MAX_COLUMN].to_numpy(float)
+
+        self._by_name = {}
+        self._keys = []  # (정규화 이름, 행 번호) - 접두어 검색용으로 정렬
+        self._postings = defaultdict(set)  # trigram -> 행 번호 집합
+        self._aliases = []  # 행 번호 -> 정규화한 이름들 (부분 검색 확인용)
+        for position, aliases in enumerate(zip(names, english)):
+            keys = [normalize_name(alias) for alias in aliases]
+            self._aliases.append([key for key in keys if key])
+            for key in self._aliases[-1]:
+                self._by_name.setdefault(key, position)
+                self._keys.append((key, position))
+                for gram in trigrams(key):
+                    self._postings[gram].add(position)
+        self._keys.sort()
+        self._sorted_names = [key for key, _ in self._keys]
+
+    def __len__(self):
+        return len(self.names)
+
+    def find(self, name):
+        """
+        약물명(한글 또는 영문)으로 행 번호를 찾는 함수
+        :return: 행 번호 (없으면 None)
+        """
+        return self._by_name.get(normalize_name(name))
+
+    def lookup(self, name):
+        """
+        약물명으로 용량 기준을 조회하는 함수
+        :return: 약물명, 최소/최대 용량(mg/kg), 1일 최대 투여량(mg) 딕셔너리 (없으면 None)
+        """
+        position = self.find(name)
+        if position is None:
+            return None
+        return {
+            "name": self.names[position],
+            "min_dose_per_kg": self.min_dose[position],
+            "max_dose_per_kg": self.max_dose[position],
+            "daily_max": self.daily_max[position],
+        }
+
+    def search(self, query, limit=10):
+        """
+        자동 완성용 약물명 검색 함수
+        접두어가 일치하는 약물을 먼저, 부족하면 이름 중간에 검색어가 들어 있는 약물을 짧은 이름 순으로 채웁니다.
+        :param query: 입력 중인 검색어
+        :param limit: 최대 결과 수
+        :return: 약물명 리스트
+        """
+        key = normalize_name(query)
+        if not key:
+            return []
+
+        results = []
+        seen = set()
+        start = bisect.bisect_left(self._sorted_names, key)
+        for name, position in self._keys[start:]:
+            if not name.startswith(key) or len(results) >= limit:
+                break
+            if position not in seen:
+                seen.add(position)
+                results.append(self.names[position])
+
+        # 접두어 결과가 부족하면 이름 중간에 검색어가 들어 있는 약물로 채움
+        # (검색어의 모든 3글자 조각을 가진 후보만 골라낸 뒤 실제 포함 여부 확인)
+        if len(results) < limit and len(key) >= 3:
+            postings = sorted(
+                (self._postings.get(gram, set()) for gram in trigrams(key)), key=len
+            )
+            candidates = set.intersection(*postings) - seen
+            matches = [
+                position
+                for position in candidates
+                if any(key in alias for alias in self._aliases[position])
+            ]
+            matches.sort(key=lambda position: (len(self.names[position]), self.names[position]))
+            results += [self.names[position] for position in matches[: limit - len(results)]]
+
+        return results
+
+    def daily_maxima(self, names, default=np.nan):
+        """
+        여러 약물명의 1일 최대 투여량을 한 번에 조회하는 함수 (병동 일괄 계산용)
+        :param names: 약물명 배열 또는 Series
+        :param default: 목록에 없는 약물에 사용할 값
+        :return: 1일 최대 투여량 배열 (mg)
+        """
+        positions = pd.Series(names).map(lambda name: self.find(name))
+        found = positions.notna().to_numpy()
+        result = np.full(len(positions), default, dtype=float)
+        result[found] = self.daily_max[positions[found].astype(int).to_numpy()]
+        return result
+
+    def check_dose(self, name, dose_per_kg, daily_dose):
+        """
+        약물 목록의 기준으로 용량을 점검하는 함수
+        :return: 경고 문구 리스트 (목록에 없는 약물이면 None)
+        """
+        drug = self.lookup(name)
+        if drug is None:
+            return None
+
+        warnings = []
+        if dose_per_kg < drug["min_dose_per_kg"]:
+            warnings.append(
+                f"{drug['name']} 권장 용량({drug['min_dose_per_kg']:g}~{drug['max_dose_per_kg']:g} mg/kg)보다 적습니다."
+            )
+        elif dose_per_kg > drug["max_dose_per_kg"]:
+            warnings.append(
+                f"{drug['name']} 권장 용량({drug['min_dose_per_kg']:g}~{drug['max_dose_per_kg']:g} mg/kg)을 초과합니다."
+            )
+        if daily_dose > drug["daily_max"]:
+            warnings.append(
+                f"일일 총 투여량이 {drug['name']} 1일 최대 투여량({drug['daily_max']:,.0f} mg)을 초과합니다."
+            )
+        return warnings
+
+
+def load_formulary(path):
+    """
+    약물 목록 CSV 를 읽어서 Formulary 를 만드는 함수
+    """
+    return Formulary(pd.read_csv(path, encoding="utf-8-sig"))
+
+
+@st.cache_resource(show_spinner="약물 목록을 불러오는 중...")
+def _cached_formulary(path, modified_time):
+    return load_formulary(path)
+
+
+def get_formulary():
+    """
+    프로세스 전체에서 공유하는 약물 목록을 돌려주는 함수
+    파일이 수정되면 (수정 시각이 바뀌면) 다시 읽습니다.
+    :return: Formulary (파일이 없으면 None)
+    """
+    path = os.environ.get("FORMULARY_PATH", DEFAULT_PATH)
+    if not os.path.exists(path):
+        return None
+    return _cached_formulary(path, os.path.getmtime(path))
@@ -0,0 +1,386 @@
+"""
+여러 Streamlit 작업 프로세스 앞에 두는 게이트웨이(리버스 프록시) 구성 요소
+1.server.py 의 gateway 모드에서 사용합니다.
+
+- 스티키 세션: Streamlit 세션 상태는 프로세스마다 따로 있으므로,
+  처음 배정한 작업 프로세스를 쿠키에 기록해 같은 브라우저는 항상 같은 프로세스로 보냄
+- 업스트림 커넥션 풀: 작업 프로세스와의 keep-alive 연결을 재사용
+- 헬스 체크: /_stcore/health 를 주기적으로 확인하여 응답 없는 프로세스는 배정 대상에서 제외
+- WebSocket: Upgrade 요청은 작업 프로세스와 소켓을 직접 이어서 양방향으로 전달
+"""
+
+import http.client
+import queue
+import select
+import socket
+import threading
+import time
+from http.cookies import SimpleCookie
+
+from common.identity import USER_HEADERS, is_trusted_proxy
+
+STICKY_COOKIE = "gateway_backend"
+HEALTH_PATH = "/_stcore/health"
+
+# 프록시가 그대로 전달하면 안 되는 연결 단위(hop-by-hop) 헤더
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+}
+
+# 응답 본문 전달 단위 (바이트)
+CHUNK_SIZE = 64 * 1024
+
+
+class UpstreamUnavailable(Exception):
+    """
+    요청을 보낼 수 있는 정상 작업 프로세스가 없을 때 발생하는 예외
+    """
+
+
+class LengthRequired(Exception):
+    """
+    요청 본문 길이를 알 수 없을 때(chunked 가 아닌 Transfer-Encoding) 발생하는 예외 (411 로 응답)
+    """
+
+
+class Backend:
+    """
+    작업 프로세스 하나와 그 프로세스로 가는 keep-alive 연결 풀
+    :param name: 스티키 쿠키에 기록할 이름
+    :param host: 호스트
+    :param port: 포트
+    :param max_idle: 풀에 보관할 최대 유휴 연결 수
+    :param timeout: 업스트림 소켓 타임아웃 (초)
+    """
+
+    def __init__(self, name, host, port, max_idle=32, timeout=60):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.healthy = True
+        self.active = 0  # 처리 중인 요청 + 열린 WebSocket 수
+        self.failures = 0  # 연속 헬스 체크 실패 횟수
+        self._idle = queue.LifoQueue(maxsize=max_idle)
+        self.reused = 0
+        self.created = 0
+
+    def __repr__(self):
+        return f"Backend({self.name}, {self.host}:{self.port}, healthy={self.healthy})"
+
+    def acquire(self):
+        """
+        풀에서 유휴 연결을 꺼내고, 없으면 새로 만드는 함수
+        :return: (HTTPConnection, 재사용 여부)
+        """
+        try:
+            connection = self._idle.get_nowait()
+            self.reused += 1
+            return connection, True
+        except queue.Empty:
+            self.created += 1
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+
+    def release(self, connection, reusable):
+        """
+        다 쓴 연결을 풀에 돌려놓는 함수 (재사용할 수 없거나 풀이 가득 차면 닫음)
+        """
+        if reusable:
+            try:
+                self._idle.put_nowait(connection)
+                return
+            except queue.Full:
+                pass
+        connection.close()
+
+    def close_idle(self):
+        """
+        풀의 유휴 연결을 모두 닫는 함수 (프로세스가 죽었을 때 오래된 연결 정리)
+        """
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class BackendPool:
+    """
+    작업 프로세스 목록, 스티키 배정, 헬스 체크를 관리하는 클래스
+    :param addresses: "host:port" 문자열 리스트
+    :param health_interval: 헬스 체크 주기 (초)
+    :param fail_threshold: 연속 실패가 이 횟수 이상이면 배정 대상에서 제외
+    """
+
+    def __init__(self, addresses, health_interval=5.0, fail_threshold=2):
+        self.backends = []
+        for index, address in enumerate(addresses):
+            host, _, port = address.rpartition(":")
+            self.backends.append(Backend(f"w{index}", host or "127.0.0.1", int(port)))
+        self.by_name = {backend.name: backend for backend in self.backends}
+        self.health_interval = health_interval
+        self.fail_threshold = fail_threshold
+        self._lock = threading.Lock()
+        self._next = 0
+        self._stop = threading.Event()
+
+    def healthy_backends(self):
+        return [backend for backend in self.backends if backend.healthy]
+
+    def choose(self, cookie_header, exclude=()):
+        """
+        요청을 보낼 작업 프로세스를 고르는 함수
+        쿠키에 기록된 프로세스가 정상이면 그대로 사용하고,
+        아니면 처리 중인 요청이 가장 적은 정상 프로세스를 새로 배정합니다. (동률이면 순서대로 돌아가며)
+        :param cookie_header: 요청의 Cookie 헤더 (없으면 None)
+        :param exclude: 이번 요청에서 이미 실패한 프로세스
+        :return: (Backend, 새로 배정했는지 여부)
+        """
+        sticky = None
+        if cookie_header:
+            cookie = SimpleCookie()
+            try:
+                cookie.load(cookie_header)
+            except Exception:
+                cookie = {}
+            if STICKY_COOKIE in cookie:
+                sticky = self.by_name.get(cookie[STICKY_COOKIE].value)
+
+        if sticky is not None and sticky.healthy and sticky not in exclude:
+            return sticky, False
+
+        with self._lock:
+            candidates = [
+                backend for backend in self.backends if backend.healthy and backend not in exclude
+            ]
+            if not candidates:
+                raise UpstreamUnavailable("사용 가능한 작업 프로세스가 없습니다.")
+            start = self._next % len(candidates)
+            self._next += 1
+            rotated = candidates[start:] + candidates[:start]
+            return min(rotated, key=lambda backend: backend.active), True
+
+    def begin(self, backend):
+        with self._lock:
+            backend.active += 1
+
+    def end(self, backend):
+        with self._lock:
+            backend.active -= 1
+
+    def mark_down(self, backend):
+        """
+        요청 중 연결 실패가 나면 다음 헬스 체크까지 기다리지 않고 바로 제외하는 함수
+        """
+        backend.healthy = False
+        backend.failures = self.fail_threshold
+        backend.close_idle()
+
+    def check(self, backend):
+        """
+        작업 프로세스의 /_stcore/health 를 한 번 확인하는 함수
+        :return: 정상 여부
+        """
+        connection = http.client.HTTPConnection(backend.host, backend.port, timeout=2)
+        try:
+            connection.request("GET", HEALTH_PATH)
+            response = connection.getresponse()
+            response.read()
+            return response.status == 200
+        except OSError:
+            return False
+        finally:
+            connection.close()
+
+    def check_all(self):
+        for backend in self.backends:
+            if self.check(backend):
+                backend.failures = 0
+                backend.healthy = True
+            else:
+                backend.failures += 1
+                if backend.failures >= self.fail_threshold and backend.healthy:
+                    backend.healthy = False
+                    backend.close_idle()
+
+    def start_health_checks(self):
+        """
+        백그라운드 스레드에서 주기적으로 헬스 체크를 실행하는 함수
+        """
+
+        def loop():
+            while not self._stop.is_set():
+                self.check_all()
+                self._stop.wait(self.health_interval)
+
+        threading.Thread(target=loop, name="health-check", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        for backend in self.backends:
+            backend.close_idle()
+
+    def metric_lines(self):
+        """
+        /metrics 에 덧붙일 작업 프로세스별 지표 (Prometheus 텍스트 형식)
+        """
+        lines = [
+            "# HELP gateway_backend_up Whether the upstream worker passes health checks.",
+            "# TYPE gateway_backend_up gauge",
+        ]
+        for backend in self.backends:
+            lines.append(f'gateway_backend_up{{backend="{backend.name}"}} {int(backend.healthy)}')
+        lines += [
+            "# HELP gateway_backend_active Requests and WebSockets currently proxied.",
+            "# TYPE gateway_backend_active gauge",
+        ]
+        for backend in self.backends:
+            lines.append(f'gateway_backend_active{{backend="{backend.name}"}} {backend.active}')
+        lines += [
+            "# HELP gateway_upstream_connections_total Upstream connections by pool outcome.",
+            "# TYPE gateway_upstream_connections_total counter",
+        ]
+        for backend in self.backends:
+            lines.append(
+                f'gateway_upstream_connections_total{{backend="{backend.name}",outcome="created"}} {backend.created}'
+            )
+            lines.append(
+                f'gateway_upstream_connections_total{{backend="{backend.name}",outcome="reused"}} {backend.reused}'
+            )
+        return lines
+
+
+def _read_chunked(rfile):
+    # chunked 요청 본문을 풀어서 읽음 (형식이 잘못되면 ValueError)
+    chunks = []
+    while True:
+        try:
+            size = int(rfile.readline(1024).split(b";", 1)[0].strip(), 16)
+        except ValueError:
+            raise ValueError("잘못된 chunked 요청 본문") from None
+        if size == 0:
+            break
+        data = rfile.read(size)
+        if len(data) != size or rfile.readline(3).strip():
+            raise ValueError("잘못된 chunked 요청 본문")
+        chunks.append(data)
+    # 트레일러 헤더는 버리고 빈 줄까지 읽음
+    while rfile.readline(65537).strip():
+        pass
+    return b"".join(chunks)
+
+
+def read_request_body(headers, rfile):
+    """
+    클라이언트 요청 본문을 읽는 함수
+    작업 프로세스에는 Content-Length 로 다시 보내므로, chunked 본문은 여기서 풀어서 모두 읽습니다.
+    :return: 본문 bytes
+    :raises LengthRequired: chunked 가 아닌 Transfer-Encoding 일 때
+    :raises ValueError: Content-Length 나 chunked 형식이 잘못되었을 때
+    """
+    transfer_encoding = headers.get("Transfer-Encoding")
+    if transfer_encoding:
+        # Transfer-Encoding 이 있으면 Content-Length 는 무시 (RFC 9112)
+        if [coding.strip().lower() for coding in transfer_encoding.split(",")] != ["chunked"]:
+            raise LengthRequired(f"지원하지 않는 Transfer-Encoding: {transfer_encoding}")
+        return _read_chunked(rfile)
+    length = int(headers.get("Content-Length") or 0)
+    if length < 0:
+        raise ValueError("잘못된 Content-Length")
+    return rfile.read(length) if length else b""
+
+
+def forward_headers(headers, client_address):
+    """
+    클라이언트 요청 헤더에서 hop-by-hop 헤더를 빼고 X-Forwarded-* 를 붙이는 함수
+    Host 는 그대로 두어 Streamlit 의 Origin 검사(WebSocket)가 게이트웨이 주소 기준으로 통과되게 합니다.
+    사용자 헤더(X-Forwarded-Email 등)는 믿을 수 있는 프록시(TRUSTED_PROXIES)에서 온 요청일 때만 전달합니다.
+    Content-Length 는 proxy_request 가 실제로 보내는 본문 길이로 다시 붙입니다.
+    :return: (이름, 값) 리스트
+    """
+    dropped = HOP_BY_HOP_HEADERS | {"content-length"} | {
+        token.strip().lower() for token in headers.get("Connection", "").split(",") if token.strip()
+    }
+    if not is_trusted_proxy(client_address[0]):
+        # 브라우저가 직접 보낸 사용자 헤더로 다른 사람 행세를 하지 못하게 함
+        dropped |= {name.lower() for name in USER_HEADERS}
+    forwarded = [(name, value) for name, value in headers.items() if name.lower() not in dropped]
+    forwarded.append(("X-Forwarded-For", client_address[0]))
+    forwarded.append(("X-Forwarded-Proto", "http"))
+    return forwarded
+
+
+def proxy_request(backend, method, path, headers, body):
+    """
+    작업 프로세스로 HTTP 요청을 보내고 응답을 받는 함수
+    풀에서 꺼낸 keep-alive 연결이 그 사이에 끊겼으면 새 연결로 한 번 더 시도합니다.
+    :return: (HTTPConnection, HTTPResponse) - 본문을 다 읽은 뒤 backend.release 로 반환해야 함
+    """
+    while True:
+        connection, reused = backend.acquire()
+        try:
+            connection.putrequest(method, path, skip_host=True, skip_accept_encoding=True)
+            for name, value in headers:
+                connection.putheader(name, value)
+            if body:
+                connection.putheader("Content-Length", str(len(body)))
+            connection.endheaders(body or None)
+            return connection, connection.getresponse()
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            connection.close()
+            if not reused:
+                raise
+        except Exception:
+            connection.close()
+            raise
+
+
+def tunnel(client_socket, upstream_socket, idle_timeout=None):
+    """
+    두 소켓 사이에서 어느 한쪽이 닫힐 때까지 바이트를 그대로 주고받는 함수 (WebSocket 중계)
+    :param idle_timeout: 양쪽 모두 이 시간(초) 동안 조용하면 종료 (None 이면 제한 없음)
+    """
+    sockets = [client_socket, upstream_socket]
+    peer = {client_socket: upstream_socket, upstream_socket: client_socket}
+    last_activity = time.monotonic()
+    while True:
+        readable, _, errored = select.select(sockets, [], sockets, 1.0)
+        if errored:
+            return
+        if not readable:
+            if idle_timeout and time.monotonic() - last_activity > idle_timeout:
+                return
+            continue
+        for source in readable:
+            try:
+                data = source.recv(CHUNK_SIZE)
+            except OSError:
+                return
+            if not data:
+                return
+            peer[source].sendall(data)
+        last_activity = time.monotonic()
+
+
+def open_websocket(backend, request_line, headers, client_address):
+    """
+    작업 프로세스에 WebSocket 업그레이드 요청을 보내고 연결된 소켓을 돌려주는 함수
+    업그레이드 응답(101)을 포함한 이후 데이터는 tunnel() 로 클라이언트에 전달합니다.
+    (Upgrade/Connection 헤더가 필요하므로 그대로 보내되, 사용자 헤더는 forward_headers 와 같은 규칙으로 거름)
+    """
+    untrusted = set() if is_trusted_proxy(client_address[0]) else {name.lower() for name in USER_HEADERS}
+    upstream = socket.create_connection((backend.host, backend.port), timeout=10)
+    upstream.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    upstream.settimeout(None)
+    lines = [request_line]
+    lines += [f"{name}: {value}" for name, value in headers.items() if name.lower() not in untrusted]
+    lines.append(f"X-Forwarded-For: {client_address[0]}")
+    upstream.sendall(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+    return upstream
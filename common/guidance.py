@@ -0,0 +1,277 @@
+"""
+환자 안내 메시지 생성 모듈
+3.app-v2.py 와 4.medical_demo.py 가 같은 프롬프트와 캐시를 사용하도록 공통으로 분리했습니다.
+
+프롬프트는 매번 같은 작성 지침(system 블록)과 환자별로 달라지는 정보(user 메시지)로 나뉩니다.
+모델이 Bedrock 프롬프트 캐싱을 지원하면 system 블록에 cache_control 을 붙여
+반복 호출 시 입력 비용과 지연 시간을 줄입니다.
+
+환경 변수
+- GUIDANCE_MODEL_ID: 안내 메시지 생성에 사용할 모델 ID
+  지정하지 않으면 요청마다 라우팅 표(common.model_router)에서 모델을 고르고, 실패하면 다음 모델로 다시 보냄
+"""
+
+import json
+import os
+import threading
+
+import streamlit as st
+
+from common.accounting import check_budget, estimate_request_tokens, record_usage as record_ledger_usage
+from common.guidance_cache import age_band, make_cache_key
+from common.model_router import DEFAULT_ROUTES, get_model_router
+from common.resilience import CircuitOpenError
+
+# 지정한 모델만 사용할 때의 모델 ID (None 이면 라우팅)
+PINNED_MODEL_ID = os.environ.get("GUIDANCE_MODEL_ID") or None
+
+# 응답 캐시 키에 넣는 모델 ID (라우팅할 때는 라우팅 표의 첫 모델, 대체 모델이 만든 안내문도 같은 키로 재사용)
+MODEL_ID = PINNED_MODEL_ID or DEFAULT_ROUTES[0]["model_id"]
+
+# 안내 메시지의 최대 출력 토큰 수
+MAX_TOKENS = 1000
+
+# 프롬프트 내용을 바꾸면 버전을 올려서 이전 캐시를 사용하지 않도록 함
+PROMPT_VERSION = "v2"
+
+# 캐시된 안내 메시지를 여러 환자가 재사용할 수 있도록 이름 대신 사용하는 자리표시자
+PATIENT_NAME_PLACEHOLDER = "{{환자명}}"
+
+# Bedrock 프롬프트 캐싱(cache_control)을 지원하는 모델 ID 접두어
+# 교차 리전 추론 프로필(us./eu./apac. 등)은 접두어를 떼고 비교함
+PROMPT_CACHING_MODEL_PREFIXES = (
+    "anthropic.claude-3-5-haiku",
+    "anthropic.claude-3-7-sonnet",
+    "anthropic.claude-haiku-4",
+    "anthropic.claude-sonnet-4",
+    "anthropic.claude-opus-4",
+)
+
+# 모든 요청에 똑같이 들어가는 작성 지침 (system 블록, 캐시 대상)
+# 참고: 모델별 최소 캐시 길이(1,024~2,048 토큰)보다 짧으면 캐시 없이 일반 입력으로 처리됨
+GUIDANCE_INSTRUCTIONS = f"""당신은 병원에서 진료를 마친 환자에게 안내 메시지를 작성하는 도우미입니다.
+사용자가 보내는 환자 정보를 바탕으로 환자에게 필요한 안내 메시지를 작성해주세요.
+
+요구사항:
+1. 환자가 이해하기 쉬운 문체로 작성
+2. 다음 항목을 포함하여 작성:
+   - 진료 후 주의사항
+   - 투약 안내 (필요시)
+   - 생활 관리 방법
+   - 증상이 악화될 경우 대응 방법
+   - 추후 방문 안내
+3. 친절하고 명확한 안내 문구로 작성
+4. 항목별로 구분하여 작성
+5. 환자 이름은 반드시 {PATIENT_NAME_PLACEHOLDER} 그대로 표기
+
+환자 안내 메시지만 작성해주세요."""
+
+# Bedrock 호출이 차단된 동안(common.resilience 차단기) 대신 보여 줄 일반 안내문 (캐시에 저장하지 않음)
+DEGRADED_GUIDANCE = f"""{PATIENT_NAME_PLACEHOLDER}님, 오늘 진료를 받으시느라 수고 많으셨습니다.
+
+지금은 맞춤형 안내 메시지를 만들 수 없어 기본 안내를 먼저 드립니다.
+
+- 진료 후 주의사항: 진료 중 의료진이 설명한 주의사항을 지켜주세요.
+- 투약 안내: 처방받은 약은 정해진 용량과 시간에 맞춰 복용하고, 임의로 중단하지 마세요.
+- 생활 관리 방법: 충분히 쉬고, 물을 자주 드시며 규칙적으로 생활해주세요.
+- 증상이 악화될 경우: 증상이 심해지거나 새로운 증상이 생기면 바로 병원에 연락하거나 응급실을 방문하세요.
+- 추후 방문 안내: 안내받은 다음 진료 일정에 맞춰 방문해주세요.
+
+궁금한 점은 언제든지 병원으로 문의해주세요."""
+
+# 프로세스 전체의 안내 메시지 토큰 사용량 (캐시 읽기/쓰기 포함)
+_usage_totals = {
+    "input_tokens": 0,
+    "output_tokens": 0,
+    "cache_read_input_tokens": 0,
+    "cache_write_input_tokens": 0,
+}
+_usage_lock = threading.Lock()
+
+
+def supports_prompt_caching(model_id):
+    """
+    모델이 Bedrock 프롬프트 캐싱을 지원하는지 확인하는 함수
+    :param model_id: 모델 ID, 교차 리전 추론 프로필 ID 또는 ARN
+    :return: 지원 여부 (알 수 없는 ID 는 False)
+    """
+    # ARN 이면 마지막 경로(모델 또는 프로필 ID)만 사용
+    base_id = (model_id or "").rsplit("/", 1)[-1]
+    if not base_id.startswith("anthropic."):
+        # us.anthropic... 같은 교차 리전 프로필은 리전 접두어를 제거
+        base_id = base_id.partition(".")[2]
+    return base_id.startswith(PROMPT_CACHING_MODEL_PREFIXES)
+
+
+def build_prompt(age, diagnosis, symptoms, treatment_plan):
+    """
+    환자별로 달라지는 부분(user 메시지)을 만드는 함수
+    환자 이름은 자리표시자로, 나이는 연령대로 넣어 같은 조건의 환자끼리 결과를 공유할 수 있게 합니다.
+    :return: 프롬프트 문자열
+    """
+    return f"""환자 정보:
+- 이름: {PATIENT_NAME_PLACEHOLDER}
+- 나이: {age_band(age)}
+- 진단명: {diagnosis}
+- 증상: {symptoms}
+- 치료 계획: {treatment_plan}"""
+
+
+def build_request_body(prompt, model_id=MODEL_ID):
+    """
+    고정 지침(system)과 환자 정보(user)로 나뉜 요청 본문을 만드는 함수
+    :param prompt: build_prompt() 의 결과
+    :param model_id: 호출할 모델 ID (프롬프트 캐싱 지원 여부 판단에 사용)
+    :return: JSON 문자열
+    """
+    system_block = {"type": "text", "text": GUIDANCE_INSTRUCTIONS}
+    if supports_prompt_caching(model_id):
+        # 이 블록까지의 접두어를 캐시하여 다음 요청에서 재사용
+        system_block["cache_control"] = {"type": "ephemeral"}
+
+    return json.dumps(
+        {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": MAX_TOKENS,
+            "system": [system_block],
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [{"type": "text", "text": prompt}],
+                }
+            ],
+        }
+    )
+
+
+def parse_usage(response_body):
+    """
+    응답의 usage 블록에서 일반/캐시 토큰 수를 꺼내는 함수
+    :return: input_tokens, output_tokens, cache_read_input_tokens, cache_write_input_tokens
+    """
+    usage = response_body.get("usage", {})
+    return {
+        "input_tokens": usage.get("input_tokens", 0),
+        "output_tokens": usage.get("output_tokens", 0),
+        "cache_read_input_tokens": usage.get("cache_read_input_tokens", 0),
+        "cache_write_input_tokens": usage.get("cache_creation_input_tokens", 0),
+    }
+
+
+def record_usage(usage):
+    """
+    프로세스 전체 토큰 사용량에 이번 호출의 사용량을 더하는 함수
+    """
+    with _usage_lock:
+        for key, value in usage.items():
+            _usage_totals[key] += value
+
+
+def usage_totals():
+    """
+    지금까지의 안내 메시지 토큰 사용량 합계를 돌려주는 함수
+    """
+    with _usage_lock:
+        return dict(_usage_totals)
+
+
+def invoke_guidance_model(bedrock_runtime, prompt, model_id=None, caller=None):
+    """
+    Bedrock 모델을 호출하여 안내 메시지 텍스트를 받는 함수
+    보내기 전에 최근 24시간 토큰 예산이 남았는지 확인하고, 사용량은 공용 장부(common.accounting)에도 기록합니다.
+    :param model_id: 호출할 모델 ID, None 이면 GUIDANCE_MODEL_ID 또는 라우팅 표에서 고른 모델
+    :param caller: 사용량을 기록할 (앱 이름, 사용자), 작업 스레드에서 호출할 때 지정
+    :return: (모델 응답 텍스트, 토큰 사용량 딕셔너리, 호출한 모델 ID)
+    """
+    estimated = estimate_request_tokens(
+        [{"role": "user", "content": prompt}], GUIDANCE_INSTRUCTIONS
+    )
+    check_budget(estimated + MAX_TOKENS, caller)
+
+    model_id = model_id or PINNED_MODEL_ID
+    if model_id is None:
+        # 모델마다 프롬프트 캐싱 지원 여부가 달라 고른 모델에 맞춰 본문을 만듦
+        response, model_id = get_model_router().invoke_model(
+            bedrock_runtime,
+            lambda routed_id: build_request_body(prompt, routed_id),
+            estimated,
+            MAX_TOKENS,
+            caller=caller,
+        )
+    else:
+        response = bedrock_runtime.invoke_model(
+            modelId=model_id, body=build_request_body(prompt, model_id)
+        )
+    response_body = json.loads(response.get("body").read())
+
+    usage = parse_usage(response_body)
+    record_usage(usage)
+    record_ledger_usage(model_id, usage, caller)
+
+    # Claude 응답에서 텍스트 추출
+    return response_body["content"][0]["text"].strip(), usage, model_id
+
+
+def generate_guidance(
+    bedrock_runtime,
+    patient_name,
+    age,
+    diagnosis,
+    symptoms,
+    treatment_plan,
+    cache=None,
+    caller=None,
+    allow_degraded=True,
+):
+    """
+    캐시를 먼저 확인하고, 없으면 Bedrock 으로 안내 메시지를 생성하는 함수
+    캐시에는 이름 자리표시자가 들어간 안내문을 저장하고, 돌려줄 때 실제 환자 이름으로 바꿉니다.
+    Bedrock 호출이 차단된 동안(CircuitOpenError)에는 일반 안내문(DEGRADED_GUIDANCE)을 돌려주고,
+    그 밖의 오류는 호출한 쪽에서 처리하도록 그대로 전달합니다.
+    :param bedrock_runtime: Bedrock 런타임 클라이언트
+    :param cache: GuidanceCache, None 이면 캐시를 사용하지 않음
+    :param caller: 사용량을 기록할 (앱 이름, 사용자), None 이면 지금 실행 중인 앱과 사용자
+    :param allow_degraded: False 이면 차단 중에도 일반 안내문 대신 CircuitOpenError 를 전달
+    :return: (안내 메시지, 정보 딕셔너리)
+        정보 딕셔너리: cached(응답 캐시 적중 여부), usage(토큰 사용량, 캐시 적중·일반 안내문이면 None),
+        degraded(일반 안내문으로 대체했는지 여부), model_id(호출한 모델, 호출하지 않았으면 None)
+    """
+    key = make_cache_key(diagnosis, symptoms, treatment_plan, age, MODEL_ID, PROMPT_VERSION)
+
+    template = cache.get(key) if cache is not None else None
+    info = {"cached": template is not None, "usage": None, "degraded": False, "model_id": None}
+
+    if not info["cached"]:
+        prompt = build_prompt(age, diagnosis, symptoms, treatment_plan)
+        try:
+            template, info["usage"], info["model_id"] = invoke_guidance_model(
+                bedrock_runtime, prompt, caller=caller
+            )
+        except CircuitOpenError:
+            if not allow_degraded:
+                raise
+            template = DEGRADED_GUIDANCE
+            info["degraded"] = True
+        else:
+            if cache is not None:
+                cache.set(key, template)
+
+    return template.replace(PATIENT_NAME_PLACEHOLDER, patient_name), info
+
+
+def format_usage(usage):
+    """
+    토큰 사용량을 한 줄 문자열로 만드는 함수
+    """
+    return (
+        f"입력 {usage['input_tokens']} · 출력 {usage['output_tokens']} · "
+        f"캐시 읽기 {usage['cache_read_input_tokens']} · "
+        f"캐시 쓰기 {usage['cache_write_input_tokens']} 토큰"
+    )
+
+
+def render_usage_stats():
+    """
+    사이드바에 안내 메시지 생성의 누적 토큰 사용량을 표시하는 함수
+    """
+    st.sidebar.caption(f"🧮 안내 메시지 누적 토큰: {format_usage(usage_totals())}")
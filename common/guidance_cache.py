@@ -0,0 +1,219 @@
+"""
+환자 안내 메시지 응답 캐시
+진단명·증상·치료 계획 등을 정규화한 해시를 키로 사용하며,
+메모리 LRU 계층과 선택적인 SQLite 디스크 계층으로 구성됩니다.
+
+환경 변수
+- GUIDANCE_CACHE_DB: 디스크 캐시(SQLite) 파일 경로 (지정하지 않으면 메모리만 사용)
+- GUIDANCE_CACHE_TTL: 캐시 유효 시간 (초, 기본값 7일)
+- GUIDANCE_CACHE_MAX_ENTRIES: 메모리 캐시 최대 개수 (기본값 512)
+- GUIDANCE_CACHE_MAX_DISK_ENTRIES: 디스크 캐시 최대 개수 (기본값 10000)
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import streamlit as st
+
+
+def normalize_text(text):
+    """
+    캐시 키 계산을 위해 입력 문자열을 정규화하는 함수
+    공백을 정리하고 소문자로 바꾼 뒤, 쉼표로 나열된 항목은 정렬합니다.
+    예) " 생활습관 개선,혈압약  복용 " -> "생활습관 개선, 혈압약 복용"
+    :param text: 원본 문자열
+    :return: 정규화된 문자열
+    """
+    items = [re.sub(r"\s+", " ", item).strip().lower() for item in str(text).split(",")]
+    return ", ".join(sorted(item for item in items if item))
+
+
+def age_band(age):
+    """
+    나이를 10세 단위 연령대 문자열로 바꾸는 함수
+    :param age: 나이
+    :return: 예) 45 -> "40대", 7 -> "10세 미만"
+    """
+    age = int(age)
+    if age < 10:
+        return "10세 미만"
+    return f"{age // 10 * 10}대"
+
+
+def make_cache_key(diagnosis, symptoms, treatment_plan, age, model_id, prompt_version):
+    """
+    캐시 키(SHA-256 해시)를 계산하는 함수. 환자 이름은 키에 포함하지 않습니다.
+    :return: 16진수 해시 문자열
+    """
+    payload = json.dumps(
+        [
+            normalize_text(diagnosis),
+            normalize_text(symptoms),
+            normalize_text(treatment_plan),
+            age_band(age),
+            model_id,
+            prompt_version,
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class GuidanceCache:
+    """
+    메모리 LRU + SQLite 2계층 캐시
+    :param max_entries: 메모리 캐시에 보관할 최대 항목 수
+    :param ttl: 항목 유효 시간 (초), None 이면 만료 없음
+    :param db_path: SQLite 파일 경로, None 이면 디스크 계층 사용 안 함
+    :param max_disk_entries: 디스크 캐시에 보관할 최대 항목 수
+    """
+
+    def __init__(self, max_entries=512, ttl=7 * 24 * 3600, db_path=None, max_disk_entries=10000):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()  # key -> (저장 시각, 값)
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        if db_path:
+            self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")  # 여러 프로세스가 동시에 읽을 수 있도록
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS guidance_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_guidance_cache_accessed "
+                "ON guidance_cache (accessed_at)"
+            )
+
+    def _expired(self, created_at, now):
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def get(self, key):
+        """
+        캐시에서 값을 찾는 함수 (메모리 -> 디스크 순서)
+        :param key: make_cache_key() 로 만든 키
+        :return: 저장된 값, 없거나 만료되었으면 None
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)  # 최근 사용으로 표시
+                    self.stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+        if self.db_path:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value, created_at FROM guidance_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and not self._expired(row[1], now):
+                    conn.execute(
+                        "UPDATE guidance_cache SET accessed_at = ? WHERE key = ?", (now, key)
+                    )
+                    with self._lock:
+                        self._put_memory(key, row[1], row[0])
+                        self.stats["disk_hits"] += 1
+                    return row[0]
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def set(self, key, value):
+        """
+        캐시에 값을 저장하는 함수 (메모리와 디스크 모두)
+        :param key: make_cache_key() 로 만든 키
+        :param value: 저장할 문자열
+        """
+        now = time.time()
+        with self._lock:
+            self._put_memory(key, now, value)
+
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO guidance_cache VALUES (?, ?, ?, ?)",
+                    (key, value, now, now),
+                )
+                self._evict_disk(conn, now)
+
+    def _put_memory(self, key, created_at, value):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)  # 가장 오래 사용하지 않은 항목 제거
+            self.stats["evictions"] += 1
+
+    def _evict_disk(self, conn, now):
+        if self.ttl is not None:
+            conn.execute("DELETE FROM guidance_cache WHERE created_at < ?", (now - self.ttl,))
+        conn.execute(
+            """
+            DELETE FROM guidance_cache WHERE key IN (
+                SELECT key FROM guidance_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_disk_entries,),
+        )
+
+    def hit_rate(self):
+        """
+        지금까지의 캐시 적중률을 돌려주는 함수
+        :return: 0.0 ~ 1.0
+        """
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+
+@st.cache_resource(show_spinner=False)
+def get_guidance_cache():
+    """
+    프로세스 전체에서 공유하는 안내 메시지 캐시를 돌려주는 함수
+    :return: GuidanceCache
+    """
+    return GuidanceCache(
+        max_entries=int(os.environ.get("GUIDANCE_CACHE_MAX_ENTRIES", 512)),
+        ttl=int(os.environ.get("GUIDANCE_CACHE_TTL", 7 * 24 * 3600)),
+        db_path=os.environ.get("GUIDANCE_CACHE_DB") or None,
+        max_disk_entries=int(os.environ.get("GUIDANCE_CACHE_MAX_DISK_ENTRIES", 10000)),
+    )
+
+
+def render_cache_stats(cache):
+    """
+    사이드바에 캐시 적중/미스 횟수를 표시하는 함수
+    :param cache: GuidanceCache
+    """
+    stats = cache.stats
+    st.sidebar.caption(
+        f"🗂️ 안내 메시지 캐시: 메모리 적중 {stats['memory_hits']} · "
+        f"디스크 적중 {stats['disk_hits']} · 미스 {stats['misses']} "
+        f"(적중률 {cache.hit_rate():.0%})"
+    )
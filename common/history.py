@@ -0,0 +1,142 @@
+"""
+대화 히스토리 압축 모듈
+매 턴마다 전체 대화를 다시 보내면 입력 토큰이 대화 길이에 비례해 늘어나므로,
+토큰 예산 안에서 보낼 메시지를 골라 줍니다.
+
+정책
+- "none": 전체 히스토리 전송
+- "sliding": 최근 메시지부터 예산에 맞는 만큼만 전송 (슬라이딩 윈도우)
+- "summary": 슬라이딩 윈도우 + 윈도우 밖의 오래된 대화를 누적 요약으로 대체
+첫 번째 사용자 메시지(대화의 주제)는 pin_first 옵션으로 항상 포함할 수 있습니다.
+"""
+
+POLICIES = {
+    "none": "전체 전송",
+    "sliding": "슬라이딩 윈도우",
+    "summary": "오래된 대화 요약",
+}
+
+
+def estimate_tokens(text):
+    """
+    토큰 수를 빠르게 어림잡는 함수
+    영문/숫자는 약 4글자당 1토큰, 한글 등 비 ASCII 문자는 글자당 약 1토큰으로 계산합니다.
+    :param text: 문자열
+    :return: 추정 토큰 수
+    """
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def message_text(message):
+    """
+    메시지의 content(문자열 또는 content 블록 리스트)에서 텍스트만 꺼내는 함수
+    """
+    content = message["content"]
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content)
+
+
+def message_tokens(message):
+    """
+    메시지 하나의 추정 토큰 수 (역할/구분자 몫으로 4토큰을 더함)
+    """
+    return estimate_tokens(message_text(message)) + 4
+
+
+def new_summary_state():
+    """
+    "summary" 정책에서 세션별로 유지하는 요약 상태를 만드는 함수
+    :return: summary(누적 요약 텍스트), summarized_count(요약에 반영된 메시지 수)
+    """
+    return {"summary": "", "summarized_count": 0}
+
+
+def _select_window(messages, budget):
+    # 뒤에서부터 예산에 맞는 만큼 메시지를 고름 (마지막 메시지는 항상 포함)
+    start = len(messages) - 1
+    used = message_tokens(messages[start])
+    while start > 0:
+        cost = message_tokens(messages[start - 1])
+        if used + cost > budget:
+            break
+        used += cost
+        start -= 1
+
+    # Claude 는 user 메시지로 시작해야 하므로 assistant 로 시작하면 하나 더 뺌
+    while start < len(messages) - 1 and messages[start]["role"] != "user":
+        start += 1
+    return start
+
+
+def _with_context(message, context):
+    # 고정 메시지/요약을 윈도우 첫 user 메시지 앞에 텍스트 블록으로 붙임
+    # (user/assistant 가 번갈아 나와야 하는 형식을 유지하기 위해 별도 메시지로 넣지 않음)
+    content = message["content"]
+    if isinstance(content, str):
+        content = [{"type": "text", "text": content}]
+    return {"role": message["role"], "content": [{"type": "text", "text": context}] + content}
+
+
+def compact_history(
+    messages,
+    budget,
+    policy="sliding",
+    pin_first=True,
+    summary_state=None,
+    summarize=None,
+):
+    """
+    토큰 예산에 맞게 대화 히스토리를 압축하는 함수
+    :param messages: 전체 대화 히스토리 (role, content 딕셔너리 리스트)
+    :param budget: 히스토리에 사용할 최대 입력 토큰 수 (추정치 기준)
+    :param policy: "none" / "sliding" / "summary"
+    :param pin_first: 첫 사용자 메시지를 항상 포함할지 여부
+    :param summary_state: "summary" 정책에서 사용하는 상태 (new_summary_state()), 호출 후 갱신됨
+    :param summarize: summarize(이전 요약, 새로 밀려난 메시지 리스트) -> 새 요약 텍스트
+        (실패하면 None - 요약한 위치를 옮기지 않아 그 메시지들은 다음 호출 때 다시 요약함)
+    :return: (모델에 보낼 메시지 리스트, 보고 딕셔너리)
+        보고 딕셔너리: original_tokens, sent_tokens, saved_tokens, dropped_messages
+    """
+    original_tokens = sum(message_tokens(m) for m in messages)
+    report = {
+        "original_tokens": original_tokens,
+        "sent_tokens": original_tokens,
+        "saved_tokens": 0,
+        "dropped_messages": 0,
+    }
+    if policy == "none" or not messages or original_tokens <= budget:
+        return messages, report
+
+    pinned = messages[0] if pin_first and messages[0]["role"] == "user" else None
+    reserved = message_tokens(pinned) if pinned else 0
+    if policy == "summary" and summary_state is not None:
+        reserved += estimate_tokens(summary_state["summary"])
+
+    start = _select_window(messages, max(0, budget - reserved))
+    window = list(messages[start:])
+
+    context_parts = []
+    if pinned is not None and start > 0:
+        context_parts.append(f"[대화를 시작한 첫 질문]\n{message_text(pinned)}")
+
+    if policy == "summary" and summary_state is not None and summarize is not None:
+        # 이번에 윈도우 밖으로 밀려난 메시지만 기존 요약에 더해서 다시 요약 (누적 요약)
+        begin = max(summary_state["summarized_count"], 1 if pinned else 0)
+        if start > begin:
+            summary = summarize(summary_state["summary"], messages[begin:start])
+            if summary is not None:
+                summary_state["summary"] = summary
+                summary_state["summarized_count"] = start
+        if summary_state["summary"]:
+            context_parts.append(f"[이전 대화 요약]\n{summary_state['summary']}")
+
+    if context_parts:
+        window[0] = _with_context(window[0], "\n\n".join(context_parts))
+
+    sent_tokens = sum(message_tokens(m) for m in window)
+    report["sent_tokens"] = sent_tokens
+    report["saved_tokens"] = max(0, original_tokens - sent_tokens)
+    report["dropped_messages"] = start
+    return window, report
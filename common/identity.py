@@ -0,0 +1,40 @@
+"""
+로그인 프록시(SSO 등)가 전달하는 사용자 헤더를 믿을지 정하는 모듈
+게이트웨이(common.gateway)와 앱(common.accounting)이 함께 사용하므로 표준 라이브러리만 사용합니다.
+
+사용자 헤더는 브라우저도 마음대로 보낼 수 있으므로, 설정한 프록시 주소에서 온 요청일 때만 사용합니다.
+- 게이트웨이: 믿을 수 없는 클라이언트가 보낸 사용자 헤더는 작업 프로세스로 전달하지 않음
+- 앱: 직접 연결한 상대(게이트웨이 또는 로그인 프록시)가 믿을 수 있는 주소일 때만 헤더의 사용자를 사용
+
+환경 변수
+- TRUSTED_PROXIES: 사용자 헤더를 믿을 프록시 주소 (쉼표로 구분, 기본값 없음 = 헤더를 사용하지 않음)
+  게이트웨이(1.server.py gateway 모드) 뒤에서 앱을 실행하면 127.0.0.1 을 포함해야 합니다.
+"""
+
+import os
+
+# 로그인 프록시가 사용자 이름을 전달하는 헤더
+USER_HEADERS = ("X-Forwarded-Email", "X-Forwarded-User", "X-Auth-Request-Email")
+
+LOOPBACK = "127.0.0.1"
+
+
+def trusted_proxies():
+    """
+    사용자 헤더를 믿을 프록시 주소 집합 (TRUSTED_PROXIES)
+    """
+    return {
+        address.strip()
+        for address in os.environ.get("TRUSTED_PROXIES", "").split(",")
+        if address.strip()
+    }
+
+
+def is_trusted_proxy(address):
+    """
+    직접 연결한 상대 주소가 사용자 헤더를 믿을 수 있는 프록시인지 확인하는 함수
+    :param address: 상대 IP 주소 (None 이면 같은 컴퓨터에서 연결한 것으로 봄, st.context.ip_address 와 같은 규칙)
+    """
+    if address in (None, "::1"):
+        address = LOOPBACK
+    return address in trusted_proxies()
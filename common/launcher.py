@@ -0,0 +1,220 @@
+"""
+Streamlit 앱을 여러 프로세스로 띄우고 관리하는 런처
+Streamlit 은 한 프로세스 안에서 모든 세션의 재실행(rerun)을 처리하므로 GIL 때문에 CPU 코어 하나만 사용합니다.
+작업 프로세스를 여러 개 띄우고 1.server.py 게이트웨이(스티키 세션)로 묶어 여러 코어를 사용하게 합니다.
+
+- 작업 프로세스마다 포트를 배정하고, 비정상 종료되면 점점 간격을 늘려가며 다시 실행
+- 모든 작업 프로세스가 같은 디스크 캐시를 사용하도록 환경 변수를 맞춤
+  (GUIDANCE_CACHE_DB: 안내 메시지 캐시, st.cache_data(persist="disk"): ~/.streamlit/cache)
+- 같은 cookieSecret 을 사용하여 다른 프로세스로 옮겨가도 XSRF 쿠키가 유효하도록 함
+
+실행 예)
+    python -m common.launcher 4.medical_demo.py --workers 4 --port 8080
+    python -m common.launcher 6.chatbot-v2.py --workers 2 --no-gateway
+"""
+
+import argparse
+import os
+import secrets
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 재시작 간격 (초): 1, 2, 4, ... 최대 30초
+MAX_RESTART_DELAY = 30
+# 이 시간(초) 이상 정상 실행되면 재시작 간격을 처음부터 다시 계산
+STABLE_AFTER = 60
+
+
+def find_free_ports(start, count):
+    """
+    start 부터 차례로 비어 있는 포트를 count 개 찾는 함수
+    :return: 포트 리스트
+    """
+    ports = []
+    port = start
+    while len(ports) < count:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            try:
+                sock.bind(("127.0.0.1", port))
+                ports.append(port)
+            except OSError:
+                pass
+        port += 1
+    return ports
+
+
+def shared_env(cookie_secret):
+    """
+    모든 작업 프로세스에 공통으로 넘길 환경 변수를 만드는 함수
+    안내 메시지 캐시는 지정하지 않으면 data/guidance_cache.sqlite 를 함께 사용합니다.
+    """
+    env = dict(os.environ)
+    env.setdefault("GUIDANCE_CACHE_DB", os.path.join(ROOT, "data", "guidance_cache.sqlite"))
+    os.makedirs(os.path.dirname(os.path.abspath(env["GUIDANCE_CACHE_DB"])), exist_ok=True)
+    env["STREAMLIT_SERVER_COOKIE_SECRET"] = cookie_secret
+    env["STREAMLIT_SERVER_HEADLESS"] = "true"
+    env["STREAMLIT_BROWSER_GATHER_USAGE_STATS"] = "false"
+    return env
+
+
+class ManagedProcess:
+    """
+    비정상 종료 시 다시 실행되는 자식 프로세스 하나
+    :param name: 로그에 표시할 이름
+    :param command: 실행 명령 리스트
+    :param env: 환경 변수
+    """
+
+    def __init__(self, name, command, env):
+        self.name = name
+        self.command = command
+        self.env = env
+        self.process = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.next_start = 0.0  # 다음 재시작 가능 시각 (monotonic)
+
+    def start(self):
+        # 터미널의 Ctrl+C 가 자식에게 바로 가지 않게 하여 런처가 순서대로 종료시키도록 함
+        self.process = subprocess.Popen(
+            self.command, env=self.env, cwd=ROOT, start_new_session=True
+        )
+        self.started_at = time.monotonic()
+
+    def check(self):
+        """
+        프로세스가 종료되었으면 재시작 시각을 정하고, 그 시각이 지났으면 다시 실행하는 함수
+        """
+        if self.process is not None and self.process.poll() is None:
+            return
+
+        now = time.monotonic()
+        if self.process is not None:
+            code = self.process.returncode
+            self.process = None
+            if now - self.started_at >= STABLE_AFTER:
+                self.restarts = 0
+            delay = min(2**self.restarts, MAX_RESTART_DELAY)
+            self.restarts += 1
+            self.next_start = now + delay
+            print(f"[launcher] {self.name} 종료됨 (코드 {code}), {delay}초 후 재시작", flush=True)
+
+        if now >= self.next_start:
+            self.start()
+
+    def stop(self, timeout=10):
+        """
+        SIGTERM 으로 정상 종료를 요청하고, 시간 안에 끝나지 않으면 강제 종료하는 함수
+        """
+        if self.process is None or self.process.poll() is not None:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class Launcher:
+    """
+    Streamlit 작업 프로세스들과 게이트웨이를 실행하고 감시하는 클래스
+    :param app: 실행할 앱 파일 (예: 4.medical_demo.py)
+    :param workers: 작업 프로세스 수
+    :param port: 게이트웨이 포트 (None 이면 게이트웨이 없이 작업 프로세스만 실행)
+    :param base_port: 작업 프로세스 포트 탐색 시작 번호
+    :param streamlit_args: streamlit run 에 그대로 넘길 추가 인자
+    """
+
+    def __init__(self, app, workers, port=8080, base_port=8501, streamlit_args=()):
+        self.ports = find_free_ports(base_port, workers)
+        env = shared_env(secrets.token_hex(16))
+
+        self.workers = [
+            ManagedProcess(
+                f"worker:{worker_port}",
+                [
+                    sys.executable, "-m", "streamlit", "run", app,
+                    "--server.port", str(worker_port),
+                    "--server.address", "127.0.0.1",
+                    *streamlit_args,
+                ],
+                env,
+            )
+            for worker_port in self.ports
+        ]
+
+        self.gateway = None
+        if port is not None:
+            upstreams = []
+            for worker_port in self.ports:
+                upstreams += ["--upstream", f"127.0.0.1:{worker_port}"]
+            self.gateway = ManagedProcess(
+                f"gateway:{port}",
+                [
+                    sys.executable, os.path.join(ROOT, "1.server.py"),
+                    "--mode", "gateway", "--port", str(port), "--no-public-ip",
+                    *upstreams,
+                ],
+                env,
+            )
+
+        self._stopping = threading.Event()
+
+    def processes(self):
+        return self.workers + ([self.gateway] if self.gateway else [])
+
+    def run(self, interval=1.0):
+        """
+        모든 프로세스를 실행하고 stop() 이 호출될 때까지 감시하는 함수
+        """
+        for process in self.processes():
+            process.start()
+        while not self._stopping.wait(interval):
+            for process in self.processes():
+                process.check()
+        # 게이트웨이를 먼저 내려서 새 요청을 받지 않게 한 뒤 작업 프로세스 종료
+        for process in reversed(self.processes()):
+            process.stop()
+
+    def stop(self):
+        self._stopping.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streamlit 앱 다중 프로세스 런처")
+    parser.add_argument("app", help="실행할 Streamlit 앱 파일 (예: 4.medical_demo.py)")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="작업 프로세스 수 (기본값: CPU 코어 수)"
+    )
+    parser.add_argument("--port", type=int, default=8080, help="게이트웨이 포트")
+    parser.add_argument("--base-port", type=int, default=8501, help="작업 프로세스 포트 시작 번호")
+    parser.add_argument("--no-gateway", action="store_true", help="게이트웨이 없이 작업 프로세스만 실행")
+    args, streamlit_args = parser.parse_known_args()
+
+    launcher = Launcher(
+        args.app,
+        args.workers,
+        port=None if args.no_gateway else args.port,
+        base_port=args.base_port,
+        streamlit_args=streamlit_args,
+    )
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: launcher.stop())
+    signal.signal(signal.SIGINT, lambda signum, frame: launcher.stop())
+
+    print(f"[launcher] {args.app} 작업 프로세스 {args.workers}개: 포트 {launcher.ports}", flush=True)
+    if launcher.gateway:
+        print(f"[launcher] 접속 URL: http://localhost:{args.port}", flush=True)
+    launcher.run()
+    print("[launcher] 모든 프로세스를 종료했습니다.", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+로컬 bedrock-runtime 대역(mock) 서버
+AWS 없이 Bedrock 을 호출하는 코드를 부하 테스트할 수 있도록 bedrock-runtime 의 HTTP API 를 흉내 냅니다.
+공유 boto3 클라이언트(common.bedrock)를 BEDROCK_ENDPOINT_URL 로 이 서버에 연결하면
+앱 코드는 그대로 두고 실제와 같은 HTTP 요청/응답, 재시도, 이벤트 스트림 파싱 경로를 거칩니다.
+
+- POST /model/{modelId}/invoke: invoke_model (JSON 응답, usage 와 토큰 수 헤더 포함)
+- POST /model/{modelId}/invoke-with-response-stream: 스트리밍 (application/vnd.amazon.eventstream)
+- 스로틀링: 동시 요청 수 초과 또는 지정한 확률로 429 ThrottlingException
+- GET /healthz: 준비 확인, GET /stats: 요청·스로틀링·토큰 집계 (JSON)
+
+응답 내용과 토큰 계산은 common.fake_bedrock.FakeBedrockClient 를 그대로 사용합니다.
+
+실행 예)
+    python -m common.mock_bedrock --port 8600 --first-token-latency 0.3 --tokens-per-second 80
+    BEDROCK_ENDPOINT_URL=http://127.0.0.1:8600 AWS_ACCESS_KEY_ID=mock AWS_SECRET_ACCESS_KEY=mock \\
+        streamlit run 6.chatbot-v2.py
+"""
+
+import argparse
+import base64
+import json
+import random
+import re
+import struct
+import threading
+import urllib.parse
+import uuid
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from common.fake_bedrock import DEFAULT_REPLY, FakeBedrockClient
+
+EVENT_STREAM_CONTENT_TYPE = "application/vnd.amazon.eventstream"
+
+# POST /model/{modelId}/invoke[-with-response-stream]
+_MODEL_PATH = re.compile(r"^/model/(?P<model>[^/]+)/(?P<action>invoke|invoke-with-response-stream)$")
+
+# 이벤트 스트림 헤더 값 종류 (7: 문자열)
+_STRING_HEADER = 7
+
+
+def encode_event(headers, payload):
+    """
+    AWS 이벤트 스트림 메시지 하나를 바이너리로 만드는 함수
+    [전체 길이 4B][헤더 길이 4B][prelude CRC 4B][헤더][payload][메시지 CRC 4B]
+    :param headers: 헤더 이름 -> 문자열 값 딕셔너리
+    :param payload: 메시지 본문 (bytes)
+    :return: 인코딩된 메시지 (bytes)
+    """
+    header_bytes = b""
+    for name, value in headers.items():
+        name, value = name.encode(), value.encode()
+        header_bytes += (
+            struct.pack(">B", len(name)) + name
+            + struct.pack(">BH", _STRING_HEADER, len(value)) + value
+        )
+    prelude = struct.pack(">II", 12 + len(header_bytes) + len(payload) + 4, len(header_bytes))
+    message = prelude + struct.pack(">I", zlib.crc32(prelude)) + header_bytes + payload
+    return message + struct.pack(">I", zlib.crc32(message))
+
+
+def chunk_event(chunk_bytes):
+    """
+    invoke_model_with_response_stream 의 chunk 이벤트 (본문은 base64 로 감싼 Claude 이벤트 JSON)
+    """
+    payload = json.dumps({"bytes": base64.b64encode(chunk_bytes).decode()}).encode()
+    return encode_event(
+        {
+            ":event-type": "chunk",
+            ":content-type": "application/json",
+            ":message-type": "event",
+        },
+        payload,
+    )
+
+
+class MockSettings:
+    """
+    mock 서버 동작 설정
+    :param first_token_latency: 첫 토큰까지 걸리는 시간 (초)
+    :param tokens_per_second: 이후 출력 토큰 생성 속도 (0 이면 지연 없음)
+    :param reply_tokens: 응답 길이 (토큰, 요청의 max_tokens 를 넘으면 잘림)
+    :param throttle_rate: 요청을 무작위로 스로틀링할 확률 (0~1)
+    :param max_concurrency: 동시에 처리할 최대 요청 수 (넘으면 스로틀링, 0 이면 제한 없음)
+    """
+
+    def __init__(
+        self,
+        first_token_latency=0.3,
+        tokens_per_second=80.0,
+        reply_tokens=120,
+        throttle_rate=0.0,
+        max_concurrency=0,
+    ):
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.reply_tokens = reply_tokens
+        self.throttle_rate = throttle_rate
+        self.max_concurrency = max_concurrency
+
+    def reply(self):
+        # 기본 문장을 반복해서 원하는 토큰 수(4글자 = 1토큰) 길이의 응답을 만듦
+        length = self.reply_tokens * 4
+        return (DEFAULT_REPLY * (length // len(DEFAULT_REPLY) + 1))[:length]
+
+
+class MockBedrockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # boto3(urllib3) 의 keep-alive 연결 재사용
+
+    def log_message(self, format, *args):
+        pass  # 부하 테스트 중 요청마다 로그를 남기지 않음
+
+    def do_GET(self):
+        if self.path == "/healthz":
+            self.send_json(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self.send_json(200, self.server.stats_snapshot())
+        else:
+            self.send_error_json(404, "ResourceNotFoundException", "Not found")
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        match = _MODEL_PATH.match(self.path)
+        if match is None:
+            self.send_error_json(404, "UnknownOperationException", "Unknown operation")
+            return
+
+        model_id = urllib.parse.unquote(match.group("model"))
+        try:
+            json.loads(body)
+        except ValueError:
+            self.send_error_json(400, "ValidationException", "Malformed input request")
+            return
+
+        if not self.server.admit():
+            self.send_error_json(
+                429, "ThrottlingException", "Too many requests, please wait before trying again."
+            )
+            return
+        try:
+            if match.group("action") == "invoke":
+                self.invoke(model_id, body)
+            else:
+                self.invoke_stream(model_id, body)
+        finally:
+            self.server.release()
+
+    def invoke(self, model_id, body):
+        response = self.server.client.invoke_model(modelId=model_id, body=body)
+        data = response["body"].read()
+        usage = json.loads(data)["usage"]
+        self.server.record(usage["input_tokens"], usage["output_tokens"])
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("x-amzn-RequestId", str(uuid.uuid4()))
+        self.send_header("X-Amzn-Bedrock-Input-Token-Count", str(usage["input_tokens"]))
+        self.send_header("X-Amzn-Bedrock-Output-Token-Count", str(usage["output_tokens"]))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def invoke_stream(self, model_id, body):
+        response = self.server.client.invoke_model_with_response_stream(modelId=model_id, body=body)
+
+        self.send_response(200)
+        self.send_header("Content-Type", EVENT_STREAM_CONTENT_TYPE)
+        self.send_header("X-Amzn-Bedrock-Content-Type", "application/json")
+        self.send_header("x-amzn-RequestId", str(uuid.uuid4()))
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        input_tokens = output_tokens = 0
+        for event in response["body"]:
+            chunk_bytes = event["chunk"]["bytes"]
+            claude_event = json.loads(chunk_bytes)
+            if claude_event["type"] == "message_start":
+                input_tokens = claude_event["message"]["usage"]["input_tokens"]
+            elif claude_event["type"] == "message_delta":
+                output_tokens = claude_event["usage"]["output_tokens"]
+            # 토큰이 만들어지는 대로 바로 보냄 (청크 하나 = 이벤트 하나)
+            message = chunk_event(chunk_bytes)
+            self.wfile.write(f"{len(message):X}\r\n".encode() + message + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+        self.server.record(input_tokens, output_tokens)
+
+    def send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_error_json(self, status, error_type, message):
+        # botocore 는 x-amzn-ErrorType 헤더로 오류 코드를 판별함 (예: ThrottlingException)
+        self.send_json(status, {"message": message}, {"x-amzn-ErrorType": f"{error_type}:"})
+
+
+class MockBedrockServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, settings=None):
+        super().__init__(address, MockBedrockHandler)
+        self.settings = settings or MockSettings()
+        self.client = FakeBedrockClient(
+            reply=self.settings.reply(),
+            first_token_latency=self.settings.first_token_latency,
+            token_interval=(
+                1 / self.settings.tokens_per_second if self.settings.tokens_per_second else 0.0
+            ),
+        )
+        self._lock = threading.Lock()
+        self._active = 0
+        self._stats = {
+            "requests": 0,
+            "throttled": 0,
+            "completed": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "max_active": 0,
+        }
+
+    def admit(self):
+        """
+        요청을 처리할지 스로틀링할지 정하는 함수
+        :return: 처리하면 True (끝나면 release() 호출), 스로틀링이면 False
+        """
+        with self._lock:
+            self._stats["requests"] += 1
+            limit = self.settings.max_concurrency
+            if (limit and self._active >= limit) or random.random() < self.settings.throttle_rate:
+                self._stats["throttled"] += 1
+                return False
+            self._active += 1
+            self._stats["max_active"] = max(self._stats["max_active"], self._active)
+            return True
+
+    def release(self):
+        with self._lock:
+            self._active -= 1
+
+    def record(self, input_tokens, output_tokens):
+        with self._lock:
+            self._stats["completed"] += 1
+            self._stats["input_tokens"] += input_tokens
+            self._stats["output_tokens"] += output_tokens
+
+    def stats_snapshot(self):
+        with self._lock:
+            return dict(self._stats, active=self._active)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 bedrock-runtime 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--first-token-latency", type=float, default=0.3, help="첫 토큰까지 시간 (초)")
+    parser.add_argument("--tokens-per-second", type=float, default=80.0, help="출력 토큰 생성 속도")
+    parser.add_argument("--reply-tokens", type=int, default=120, help="응답 길이 (토큰)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="무작위 스로틀링 확률 (0~1)")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="최대 동시 요청 수 (0: 제한 없음)")
+    args = parser.parse_args()
+
+    settings = MockSettings(
+        first_token_latency=args.first_token_latency,
+        tokens_per_second=args.tokens_per_second,
+        reply_tokens=args.reply_tokens,
+        throttle_rate=args.throttle_rate,
+        max_concurrency=args.max_concurrency,
+    )
+    server = MockBedrockServer((args.host, args.port), settings)
+    print(f"mock bedrock-runtime: http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,457 @@
+"""
+요청마다 호출할 Bedrock 모델을 고르는 라우팅 모듈
+앱 코드에 모델 ID 를 적어 두는 대신, 라우팅 표(선호 순서대로 적은 모델 목록)에서 요청마다 모델을 고릅니다.
+
+- 고르는 순서
+  1. 입력 추정 토큰 + max_tokens 가 모델의 입력 한도(max_input_tokens, 없으면 컨텍스트 길이)를 넘는 모델 제외
+  2. 최근 오류로 쉬는 중인 모델 제외 (모두 쉬는 중이면 제외하지 않음)
+  3. 표 순서대로, 최근 지연 시간 p95 가 SLO 안인 첫 모델 (기록이 적은 모델은 SLO 안으로 간주)
+  4. SLO 를 지키는 모델이 없으면 p95 가 가장 짧은 모델
+- 호출이 서비스 오류(재시도 후에도 스로틀링, 5xx 등)나 모델 오류로 실패하면 다음 후보로 다시 보내고
+  실패한 모델은 잠시 쉬게 함 (CircuitOpenError 는 엔드포인트 전체 문제이므로 다른 모델로 넘기지 않음)
+- p95 는 이 프로세스의 최근 호출(모델·호출 종류별 최근 100건, 10분 이내)로 계산
+  호출 종류: invoke(응답 전체를 받을 때까지), stream(스트리밍 응답이 시작될 때까지)
+- 호출마다 모델별 지연 시간 히스토그램(1시간 버킷)과 라우팅 결정(고른 이유, 당시 p95, 결과)을 SQLite 에 기록
+  → 4.medical_demo.py 의 "모델 라우팅 기록" 페이지에서 확인
+  보관 기간이 지난 기록과 최대 건수를 넘는 오래된 라우팅 결정은 기록할 때 (프로세스마다 1시간에 한 번) 지움
+
+환경 변수
+- MODEL_ROUTES_FILE: 라우팅 표 JSON 파일 (예: [{"model_id": "...", "max_input_tokens": 8000}, {"model_id": "..."}])
+- MODEL_SLO_INVOKE_MS / MODEL_SLO_STREAM_MS: 호출 종류별 지연 시간 SLO (기본값 10000 / 2000)
+- MODEL_ROUTING_DB: SQLite 파일 경로 (기본값 data/model_routing.sqlite)
+- MODEL_ROUTING_RETENTION_DAYS: 기록 보관 기간 (일, 기본값 30 - 라우팅 페이지의 가장 긴 조회 구간)
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from common.accounting import DEFAULT_CONTEXT_TOKENS, MODEL_CONTEXT_TOKENS, current_caller
+from common.resilience import error_code, is_service_error
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = "data/model_routing.sqlite"
+
+# 기록 보관 기간 (일)과 보관할 최대 라우팅 결정 수
+DEFAULT_RETENTION_DAYS = 30
+MAX_DECISIONS = 100_000
+
+# 기본 라우팅 표 (선호 순서): 가장 저렴하고 빠른 모델을 먼저, 실패하거나 느려지면 다음 모델
+DEFAULT_ROUTES = [
+    {"model_id": "anthropic.claude-3-haiku-20240307-v1:0"},  # Claude 3 Haiku
+    {"model_id": "anthropic.claude-3-5-haiku-20241022-v1:0"},  # Claude 3.5 Haiku
+]
+
+DEFAULT_SLO_MS = {"invoke": 10_000, "stream": 2_000}
+
+# 다른 모델로 넘길 모델 쪽 오류 코드 (서비스 오류는 is_service_error 로 확인)
+MODEL_ERROR_CODES = {
+    "AccessDeniedException",  # 모델 사용 권한 없음
+    "ResourceNotFoundException",  # 리전에 없는 모델
+    "ModelErrorException",
+    "ModelTimeoutException",
+}
+
+# 실패한 모델을 후보에서 빼 두는 시간 (초)
+COOLDOWN_SECONDS = 30
+
+# p95 계산에 사용하는 최근 기록 (모델·호출 종류별)
+ROLLING_SAMPLES = 100
+ROLLING_WINDOW = 600
+MIN_SAMPLES = 5
+
+# 지연 시간 히스토그램 구간 상한 (ms), 마지막 구간을 넘으면 -1 로 기록
+LATENCY_BUCKETS_MS = (250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 60000)
+
+
+def latency_bucket(latency_ms):
+    """
+    지연 시간이 들어갈 히스토그램 구간의 상한 (ms), 마지막 구간보다 길면 -1
+    """
+    for upper in LATENCY_BUCKETS_MS:
+        if latency_ms <= upper:
+            return upper
+    return -1
+
+
+def bucket_label(upper):
+    """
+    히스토그램 구간 표시 이름 (예: "≤500ms", ">60000ms")
+    """
+    return f"≤{upper}ms" if upper > 0 else f">{LATENCY_BUCKETS_MS[-1]}ms"
+
+
+def load_routes():
+    """
+    라우팅 표를 읽어오는 함수 (MODEL_ROUTES_FILE 이 없으면 기본 표)
+    :return: model_id, max_input_tokens 를 가진 딕셔너리 리스트 (선호 순서)
+    """
+    path = os.environ.get("MODEL_ROUTES_FILE")
+    routes = DEFAULT_ROUTES
+    if path:
+        with open(path, encoding="utf-8") as f:
+            routes = json.load(f)
+    return [
+        {
+            "model_id": route["model_id"],
+            "max_input_tokens": route.get("max_input_tokens")
+            or MODEL_CONTEXT_TOKENS.get(route["model_id"], DEFAULT_CONTEXT_TOKENS),
+        }
+        for route in routes
+    ]
+
+
+class RoutingLog:
+    """
+    모델별 지연 시간 히스토그램과 라우팅 결정을 기록하는 SQLite 저장소
+    :param db_path: SQLite 파일 경로
+    :param retention_days: 히스토그램과 라우팅 결정을 보관하는 기간 (일)
+    :param max_decisions: 보관할 최대 라우팅 결정 수 (호출이 많아도 표가 계속 커지지 않도록)
+    """
+
+    def __init__(self, db_path, retention_days=DEFAULT_RETENTION_DAYS, max_decisions=MAX_DECISIONS):
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self.max_decisions = max_decisions
+        self._pruned_hour = None  # 마지막으로 오래된 기록을 지운 시간 버킷
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")  # 여러 프로세스가 동시에 기록할 수 있도록
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS model_latency (
+                    hour INTEGER NOT NULL,
+                    model_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    le_ms INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (hour, model_id, kind, le_ms)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS route_decisions (
+                    id INTEGER PRIMARY KEY,
+                    created_at REAL NOT NULL,
+                    app TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    model_id TEXT NOT NULL,
+                    reason TEXT NOT NULL,
+                    estimated_tokens INTEGER NOT NULL,
+                    slo_ms INTEGER NOT NULL,
+                    p95_ms INTEGER,
+                    latency_ms INTEGER NOT NULL,
+                    outcome TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_route_decisions_created ON route_decisions (created_at)"
+            )
+
+    def record(self, app, kind, decision, estimated_tokens, slo_ms, latency_ms, outcome):
+        """
+        호출 한 번의 라우팅 결정과 지연 시간을 기록하는 함수
+        히스토그램에는 성공한 호출만 더하고, 라우팅 결정은 실패한 시도도 모두 남깁니다.
+        :param decision: ModelRouter.candidates() 의 항목 (model_id, reason, p95_ms)
+        :param outcome: "ok" 또는 오류 코드
+        """
+        now = time.time()
+        with self._connect() as conn:
+            if outcome == "ok":
+                conn.execute(
+                    """
+                    INSERT INTO model_latency VALUES (?, ?, ?, ?, 1)
+                    ON CONFLICT (hour, model_id, kind, le_ms) DO UPDATE SET count = count + 1
+                    """,
+                    (int(now // 3600), decision["model_id"], kind, latency_bucket(latency_ms)),
+                )
+            conn.execute(
+                "INSERT INTO route_decisions (created_at, app, kind, model_id, reason, estimated_tokens,"
+                " slo_ms, p95_ms, latency_ms, outcome) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    now,
+                    app,
+                    kind,
+                    decision["model_id"],
+                    decision["reason"],
+                    estimated_tokens,
+                    slo_ms,
+                    decision["p95_ms"],
+                    latency_ms,
+                    outcome,
+                ),
+            )
+            self._prune(conn, now)
+
+    def _prune(self, conn, now):
+        # 보관 기간이 지난 기록과 최대 건수를 넘는 오래된 라우팅 결정 삭제 (1시간에 한 번)
+        hour = int(now // 3600)
+        if self._pruned_hour == hour:
+            return
+        self._pruned_hour = hour
+        conn.execute("DELETE FROM model_latency WHERE hour <= ?", (hour - self.retention_days * 24,))
+        conn.execute(
+            "DELETE FROM route_decisions WHERE created_at < ?", (now - self.retention_days * 86400,)
+        )
+        conn.execute(
+            """
+            DELETE FROM route_decisions WHERE id <= (
+                SELECT id FROM route_decisions ORDER BY id DESC LIMIT 1 OFFSET ?
+            )
+            """,
+            (self.max_decisions,),
+        )
+
+    def histogram(self, hours=24):
+        """
+        최근 hours 시간의 모델·호출 종류별 지연 시간 히스토그램
+        :return: 딕셔너리 리스트 (model_id, kind, le_ms, count)
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT model_id, kind, le_ms, SUM(count) FROM model_latency WHERE hour > ?"
+                " GROUP BY model_id, kind, le_ms",
+                (int(time.time() // 3600) - hours,),
+            ).fetchall()
+        return [dict(zip(("model_id", "kind", "le_ms", "count"), row)) for row in rows]
+
+    def decisions(self, limit=200):
+        """
+        최근 라우팅 결정 (최신순)
+        :return: 딕셔너리 리스트
+        """
+        columns = (
+            "created_at", "app", "kind", "model_id", "reason", "estimated_tokens",
+            "slo_ms", "p95_ms", "latency_ms", "outcome",
+        )
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(columns)} FROM route_decisions ORDER BY created_at DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+
+class ModelRouter:
+    """
+    라우팅 표와 최근 지연 시간으로 요청마다 모델을 고르고, 실패하면 다음 모델로 다시 보내는 라우터
+    :param routes: load_routes() 형식의 라우팅 표 (선호 순서)
+    :param log: RoutingLog, None 이면 기록하지 않음
+    :param routes_file: 라우팅 표를 읽은 파일 경로 (기본 표면 None)
+    """
+
+    def __init__(self, routes, log=None, routes_file=None):
+        self.routes = routes
+        self.log = log
+        self.routes_file = routes_file
+        self._lock = threading.Lock()
+        self._samples = {}  # (모델, 호출 종류) -> 최근 (시각, 지연 시간 ms)
+        self._cooldown = {}  # 모델 -> 다시 후보에 넣을 시각
+
+    def widest_model_id(self):
+        """
+        입력 한도가 가장 큰 모델 (요청 전 점검에서 메시지를 자를 기준)
+        """
+        return max(self.routes, key=lambda route: route["max_input_tokens"])["model_id"]
+
+    def slo_ms(self, kind):
+        """
+        호출 종류별 지연 시간 SLO (ms)
+        """
+        return int(os.environ.get(f"MODEL_SLO_{kind.upper()}_MS") or DEFAULT_SLO_MS[kind])
+
+    def p95_ms(self, model_id, kind):
+        """
+        최근 지연 시간 p95 (ms), 기록이 MIN_SAMPLES 건보다 적으면 None
+        """
+        with self._lock:
+            samples = self._samples.get((model_id, kind))
+            if not samples:
+                return None
+            while samples and time.monotonic() - samples[0][0] > ROLLING_WINDOW:
+                samples.popleft()
+            latencies = sorted(latency for _, latency in samples)
+        if len(latencies) < MIN_SAMPLES:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+    def observe(self, model_id, kind, latency_ms, failed=False):
+        """
+        호출 결과를 반영하는 함수 (지연 시간 기록, 실패하면 잠시 후보에서 제외)
+        """
+        with self._lock:
+            if failed:
+                self._cooldown[model_id] = time.monotonic() + COOLDOWN_SECONDS
+                return
+            self._cooldown.pop(model_id, None)
+            self._samples.setdefault((model_id, kind), deque(maxlen=ROLLING_SAMPLES)).append(
+                (time.monotonic(), latency_ms)
+            )
+
+    def candidates(self, estimated_tokens, max_tokens, kind="invoke", slo_ms=None):
+        """
+        이번 요청에 시도할 모델 순서를 정하는 함수 (첫 항목이 고른 모델, 나머지는 실패 시 대체 모델)
+        :param estimated_tokens: 입력 추정 토큰 수
+        :param max_tokens: 요청할 최대 출력 토큰 수
+        :param kind: "invoke" 또는 "stream"
+        :param slo_ms: 지연 시간 SLO, None 이면 호출 종류별 기본값
+        :return: 딕셔너리 리스트 (model_id, reason, p95_ms)
+        """
+        slo_ms = slo_ms or self.slo_ms(kind)
+        fits = [
+            route["model_id"]
+            for route in self.routes
+            if estimated_tokens + max_tokens <= route["max_input_tokens"]
+        ]
+        if not fits:
+            # 어느 모델에도 들어가지 않으면 가장 큰 모델로 보내 모델이 오류를 돌려주게 함
+            fits = [self.widest_model_id()]
+        now = time.monotonic()
+        with self._lock:
+            ready = [model_id for model_id in fits if self._cooldown.get(model_id, 0) <= now]
+        ready = ready or fits
+
+        p95 = {model_id: self.p95_ms(model_id, kind) for model_id in ready}
+        within = [model_id for model_id in ready if p95[model_id] is None or p95[model_id] <= slo_ms]
+        if within:
+            first = within[0]
+            reason = "기록 부족" if p95[first] is None else "SLO 충족"
+        else:
+            first = min(ready, key=lambda model_id: p95[model_id])
+            reason = "SLO 초과, 가장 빠른 모델"
+        if len(fits) < len(self.routes):
+            reason += " (입력 크기로 후보 제한)"
+
+        order = [first] + [model_id for model_id in fits if model_id != first]
+        return [
+            {
+                "model_id": model_id,
+                "reason": reason if model_id == first else "앞 모델 실패 후 대체",
+                "p95_ms": p95.get(model_id),
+            }
+            for model_id in order
+        ]
+
+    def _call(self, call, body, estimated_tokens, max_tokens, kind, slo_ms, caller):
+        slo_ms = slo_ms or self.slo_ms(kind)
+        app = (caller or current_caller())[0]
+        plan = self.candidates(estimated_tokens, max_tokens, kind, slo_ms)
+        for index, decision in enumerate(plan):
+            model_id = decision["model_id"]
+            request_body = body(model_id) if callable(body) else body
+            started = time.perf_counter()
+            try:
+                response = call(modelId=model_id, body=request_body)
+            except Exception as e:
+                latency_ms = int((time.perf_counter() - started) * 1000)
+                fallback = is_service_error(e) or error_code(e) in MODEL_ERROR_CODES
+                if fallback:
+                    self.observe(model_id, kind, latency_ms, failed=True)
+                self._record(app, kind, decision, estimated_tokens, slo_ms, latency_ms,
+                             error_code(e) or type(e).__name__)
+                if not fallback or index == len(plan) - 1:
+                    raise
+                continue
+            latency_ms = int((time.perf_counter() - started) * 1000)
+            self.observe(model_id, kind, latency_ms)
+            self._record(app, kind, decision, estimated_tokens, slo_ms, latency_ms, "ok")
+            return response, model_id
+
+    def _record(self, app, kind, decision, estimated_tokens, slo_ms, latency_ms, outcome):
+        # 기록에 실패해도(디스크 오류 등) 응답 처리는 계속되도록 함
+        if self.log is None:
+            return
+        try:
+            self.log.record(app, kind, decision, estimated_tokens, slo_ms, latency_ms, outcome)
+        except sqlite3.Error as e:
+            logger.warning("라우팅 기록 실패: %s", e)
+
+    def invoke_model(self, client, body, estimated_tokens, max_tokens, slo_ms=None, caller=None):
+        """
+        모델을 골라 invoke_model 을 호출하는 함수 (실패하면 다음 후보 모델로 다시 호출)
+        :param client: bedrock-runtime 클라이언트 (또는 AsyncBedrockClient)
+        :param body: 요청 본문 문자열, 또는 모델 ID 를 받아 본문을 만드는 함수 (모델별로 본문이 다를 때)
+        :param estimated_tokens: 입력 추정 토큰 수
+        :param max_tokens: 요청의 최대 출력 토큰 수
+        :param slo_ms: 지연 시간 SLO, None 이면 MODEL_SLO_INVOKE_MS
+        :param caller: 기록할 (앱 이름, 사용자), 작업 스레드에서 호출할 때 지정
+        :return: (응답, 호출한 모델 ID)
+        """
+        return self._call(
+            client.invoke_model, body, estimated_tokens, max_tokens, "invoke", slo_ms, caller
+        )
+
+    def invoke_model_with_response_stream(
+        self, client, body, estimated_tokens, max_tokens, slo_ms=None, caller=None
+    ):
+        """
+        모델을 골라 스트리밍 호출을 시작하는 함수 (응답이 시작되기 전 실패만 다음 모델로 넘김)
+        :return: (응답, 호출한 모델 ID)
+        """
+        return self._call(
+            client.invoke_model_with_response_stream,
+            body,
+            estimated_tokens,
+            max_tokens,
+            "stream",
+            slo_ms,
+            caller,
+        )
+
+    def stats(self):
+        """
+        라우팅 표의 모델별 현재 상태 (이 프로세스 기준)
+        :return: 딕셔너리 리스트 (model_id, max_input_tokens, invoke_p95_ms, stream_p95_ms, samples, cooling_down)
+        """
+        now = time.monotonic()
+        rows = []
+        for route in self.routes:
+            model_id = route["model_id"]
+            with self._lock:
+                samples = sum(
+                    len(self._samples.get((model_id, kind), ())) for kind in DEFAULT_SLO_MS
+                )
+                cooling_down = self._cooldown.get(model_id, 0) > now
+            rows.append(
+                dict(
+                    route,
+                    invoke_p95_ms=self.p95_ms(model_id, "invoke"),
+                    stream_p95_ms=self.p95_ms(model_id, "stream"),
+                    samples=samples,
+                    cooling_down=cooling_down,
+                )
+            )
+        return rows
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_model_router():
+    """
+    프로세스 전체에서 공유하는 모델 라우터를 돌려주는 함수
+    (작업 스레드에서도 사용하므로 st.cache_resource 대신 모듈 변수로 보관, 설정이 바뀌면 새로 만듦)
+    :return: ModelRouter
+    """
+    global _router
+    with _router_lock:
+        path = os.environ.get("MODEL_ROUTING_DB") or DEFAULT_PATH
+        routes_file = os.environ.get("MODEL_ROUTES_FILE")
+        if _router is None or _router.log.db_path != path or _router.routes_file != routes_file:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            retention_days = int(os.environ.get("MODEL_ROUTING_RETENTION_DAYS") or DEFAULT_RETENTION_DAYS)
+            _router = ModelRouter(load_routes(), RoutingLog(path, retention_days), routes_file)
+        return _router
@@ -0,0 +1,248 @@
+"""
+Streamlit 재실행(rerun) 비용 측정 모듈
+위젯을 바꿀 때마다 스크립트 전체가 다시 실행되므로, 재실행 한 번의 시간을 이름 붙인 구간별로 나눠 기록합니다.
+기록은 메뉴 페이지별로 모아 사이드바 패널에 p50/p95 로 보여주고, JSONL 파일로도 남겨 나중에 분석할 수 있습니다.
+
+사용 예)
+    profiler.begin_rerun("4.medical_demo")
+    with profiler.section("Bedrock 클라이언트"):
+        client = get_bedrock_client()
+    profiler.set_page(menu)
+    ...
+    profiler.end_rerun()
+    profiler.render_panel("4.medical_demo")
+
+st.fragment 함수는 본문을 profiler.fragment(앱, 페이지, 조각 이름) 으로 감싸면
+조각만 다시 실행될 때도 "(조각 재실행) 조각 이름" 으로 따로 집계됩니다.
+
+환경 변수 (켜지 않으면 모든 함수가 아무 일도 하지 않음)
+- PROFILE_RERUNS=1: 재실행 측정 사용
+- PROFILE_TRACE_PATH: 재실행 기록 JSONL 파일 경로 (기본값 data/rerun_traces.jsonl, 빈 값이면 파일에 쓰지 않음)
+
+기록 파일 요약: python -m common.profiler data/rerun_traces.jsonl
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+
+import streamlit as st
+
+ENABLED = os.environ.get("PROFILE_RERUNS") == "1"
+TRACE_PATH = os.environ.get("PROFILE_TRACE_PATH", "data/rerun_traces.jsonl")
+
+# 재실행 전체 시간을 기록할 때 사용하는 구간 이름
+TOTAL_SECTION = "(재실행 전체)"
+# st.fragment 만 다시 실행될 때 전체 시간을 기록하는 구간 이름 앞에 붙는 표시
+FRAGMENT_PREFIX = "(조각 재실행) "
+
+# (앱, 페이지, 구간) 별로 최근 측정값만 보관
+MAX_SAMPLES = 1000
+
+_samples = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+_samples_lock = threading.Lock()
+_trace_lock = threading.Lock()
+
+_TRACE_KEY = "_profiler_trace"
+_SESSION_KEY = "_profiler_session"
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def begin_rerun(app):
+    """
+    재실행 측정을 시작하는 함수 (스크립트 맨 위에서 호출)
+    이전 재실행이 st.stop() 등으로 끝나지 않았으면 그 기록은 버립니다.
+    :param app: 앱 이름 (예: 4.medical_demo)
+    """
+    if not ENABLED:
+        return
+    if _SESSION_KEY not in st.session_state:
+        st.session_state[_SESSION_KEY] = uuid.uuid4().hex[:8]
+    st.session_state[_TRACE_KEY] = {
+        "app": app,
+        "page": "-",
+        "started": time.perf_counter(),
+        "sections": [],
+    }
+
+
+def set_page(page):
+    """
+    이번 재실행을 어느 메뉴 페이지의 비용으로 기록할지 정하는 함수
+    """
+    trace = _current_trace()
+    if trace is not None:
+        trace["page"] = page
+
+
+def _current_trace():
+    if not ENABLED:
+        return None
+    return st.session_state.get(_TRACE_KEY)
+
+
+@contextlib.contextmanager
+def _measure(name):
+    trace = _current_trace()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if trace is not None:
+            trace["sections"].append((name, (time.perf_counter() - started) * 1000))
+
+
+def section(name):
+    """
+    with 블록의 실행 시간을 이름 붙여 기록하는 컨텍스트 관리자
+    측정을 켜지 않았으면 아무 일도 하지 않습니다.
+    """
+    if not ENABLED:
+        return contextlib.nullcontext()
+    return _measure(name)
+
+
+@contextlib.contextmanager
+def _fragment(app, page, name):
+    if _current_trace() is not None:
+        # 전체 재실행 중에 함께 실행되는 경우에는 일반 구간으로 기록
+        with _measure(name):
+            yield
+        return
+    begin_rerun(app)
+    set_page(page)
+    try:
+        yield
+    finally:
+        end_rerun(total_section=FRAGMENT_PREFIX + name)
+
+
+def fragment(app, page, name):
+    """
+    st.fragment 함수 본문을 감싸는 컨텍스트 관리자
+    조각만 다시 실행될 때는 begin_rerun/end_rerun 이 호출되지 않으므로 조각 실행 자체를 하나의 재실행으로 기록합니다.
+    :param app: 앱 이름
+    :param page: 메뉴 페이지
+    :param name: 조각 이름
+    """
+    if not ENABLED:
+        return contextlib.nullcontext()
+    return _fragment(app, page, name)
+
+
+def end_rerun(total_section=TOTAL_SECTION):
+    """
+    재실행 측정을 마치고 통계와 JSONL 파일에 기록하는 함수 (스크립트 맨 아래에서 호출)
+    :param total_section: 전체 시간을 기록할 구간 이름
+    """
+    trace = _current_trace()
+    if trace is None:
+        return
+    del st.session_state[_TRACE_KEY]
+
+    total_ms = (time.perf_counter() - trace["started"]) * 1000
+    app, page = trace["app"], trace["page"]
+    with _samples_lock:
+        _samples[(app, page, total_section)].append(total_ms)
+        for name, elapsed_ms in trace["sections"]:
+            _samples[(app, page, name)].append(elapsed_ms)
+
+    if TRACE_PATH:
+        record = {
+            "ts": time.time(),
+            "app": app,
+            "page": page,
+            "session": st.session_state[_SESSION_KEY],
+            "scope": total_section,
+            "total_ms": round(total_ms, 3),
+            "sections": [
+                {"name": name, "ms": round(elapsed_ms, 3)}
+                for name, elapsed_ms in trace["sections"]
+            ],
+        }
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with _trace_lock:
+            os.makedirs(os.path.dirname(TRACE_PATH) or ".", exist_ok=True)
+            with open(TRACE_PATH, "a", encoding="utf-8") as trace_file:
+                trace_file.write(line)
+
+
+def stats(app):
+    """
+    앱의 페이지·구간별 측정 통계를 돌려주는 함수
+    :return: 페이지, 구간, 횟수, p50(ms), p95(ms) 딕셔너리 리스트
+    """
+    with _samples_lock:
+        items = [(key, list(values)) for key, values in _samples.items() if key[0] == app]
+    rows = []
+    for (_, page, name), values in sorted(items, key=lambda item: (item[0][1], item[0][2])):
+        rows.append(
+            {
+                "페이지": page,
+                "구간": name,
+                "횟수": len(values),
+                "p50(ms)": round(percentile(values, 0.5), 1),
+                "p95(ms)": round(percentile(values, 0.95), 1),
+            }
+        )
+    return rows
+
+
+def render_panel(app):
+    """
+    사이드바에 접을 수 있는 재실행 비용 패널을 표시하는 함수
+    """
+    if not ENABLED:
+        return
+    rows = stats(app)
+    with st.sidebar.expander("⏱️ 재실행 비용 (프로파일러)"):
+        if not rows:
+            st.caption("아직 측정된 재실행이 없습니다.")
+            return
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+        if TRACE_PATH:
+            st.caption(f"재실행 기록: {TRACE_PATH}")
+
+
+def summarize_traces(path):
+    """
+    JSONL 재실행 기록 파일을 앱·페이지·구간별 p50/p95 로 요약하는 함수
+    :return: 앱, 페이지, 구간, 횟수, p50(ms), p95(ms) 튜플 리스트
+    """
+    samples = defaultdict(list)
+    with open(path, encoding="utf-8") as trace_file:
+        for line in trace_file:
+            record = json.loads(line)
+            key = (record["app"], record["page"])
+            samples[key + (record.get("scope", TOTAL_SECTION),)].append(record["total_ms"])
+            for item in record["sections"]:
+                samples[key + (item["name"],)].append(item["ms"])
+    return [
+        key + (len(values), percentile(values, 0.5), percentile(values, 0.95))
+        for key, values in sorted(samples.items())
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="재실행 기록(JSONL) 요약")
+    parser.add_argument("path", nargs="?", default=TRACE_PATH or "data/rerun_traces.jsonl")
+    args = parser.parse_args()
+
+    print(f"{'앱':<16}{'페이지':<18}{'구간':<22}{'횟수':>6}{'p50(ms)':>10}{'p95(ms)':>10}")
+    for app, page, name, count, p50, p95 in summarize_traces(args.path):
+        print(f"{app:<16}{page:<18}{name:<22}{count:>6}{p50:>10.1f}{p95:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Bedrock 호출 보호 장치: 스로틀링에 맞춰 속도를 조절하는 요청 속도 제한과 차단기(circuit breaker)
+common.async_bedrock 이 모든 invoke_model / 스트리밍 호출 앞에서 사용합니다.
+
+- 요청 속도 제한(AdaptiveRateLimiter): 프로세스 전체가 하나의 토큰 버킷을 함께 사용
+  ThrottlingException 이 나면 허용 속도를 곱으로 줄이고(×0.7), 성공할 때마다 조금씩 늘림(+0.1/초)
+- 재시도: 스로틀링 등 잠시 후 성공할 수 있는 오류는 지수 백오프 + 지터로 기다렸다가 다시 호출
+- 차단기(CircuitBreaker): 서비스 오류(스로틀링, 5xx, 연결 오류)가 연속으로 나면 일정 시간 동안
+  호출하지 않고 바로 실패(CircuitOpenError)하여, 세션들이 엔드포인트를 계속 두드리지 않게 함
+  시간이 지나면 한 요청만 시험 삼아 보내고(반열림), 성공하면 다시 정상으로 돌아감
+"""
+
+import random
+import threading
+import time
+from collections import deque
+
+# 잠시 후 다시 시도하면 성공할 수 있는 Bedrock 오류 코드
+RETRYABLE_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+}
+
+# 요청 속도를 줄여야 하는 오류 코드
+THROTTLING_ERROR_CODES = {"ThrottlingException", "TooManyRequestsException"}
+
+# 차단기 실패로 세는 서비스 쪽 오류 코드 (재시도 가능한 오류 포함)
+SERVICE_ERROR_CODES = RETRYABLE_ERROR_CODES | {"InternalServerException", "ModelTimeoutException"}
+
+# 스로틀링 횟수를 보여 줄 최근 구간 (초)
+THROTTLE_WINDOW = 60
+
+
+class RateLimiter:
+    """
+    초당 요청 수를 제한하는 토큰 버킷
+    :param rate_per_second: 초당 허용 요청 수
+    :param burst: 한 번에 몰아서 보낼 수 있는 최대 요청 수
+    """
+
+    def __init__(self, rate_per_second, burst=1):
+        self.rate = rate_per_second
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        토큰이 생길 때까지 기다렸다가 하나 가져가는 함수
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class CircuitOpenError(Exception):
+    """
+    차단기가 열려 있어 Bedrock 을 호출하지 않고 바로 실패할 때 발생하는 예외
+    """
+
+
+def error_code(error):
+    """
+    botocore ClientError 의 오류 코드를 꺼내는 함수 (다른 예외는 None)
+    """
+    return getattr(error, "response", {}).get("Error", {}).get("Code")
+
+
+def is_service_error(error):
+    """
+    엔드포인트 쪽 문제(스로틀링, 서버 오류, 연결 오류)인지 확인하는 함수
+    입력 오류(ValidationException 등)는 엔드포인트가 정상 응답한 것이므로 제외합니다.
+    """
+    from botocore.exceptions import ConnectionError, HTTPClientError
+
+    return error_code(error) in SERVICE_ERROR_CODES or isinstance(
+        error, (ConnectionError, HTTPClientError)
+    )
+
+
+def retry_delay(attempt, base_delay=0.5, max_delay=20.0):
+    """
+    attempt 번째 재시도 전 대기 시간 (0 ~ base_delay * 2^attempt 사이 무작위, full jitter)
+    """
+    return random.uniform(0, min(max_delay, base_delay * 2**attempt))
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    스로틀링 발생 여부에 따라 허용 속도를 스스로 조절하는 토큰 버킷 (AIMD)
+    :param rate_per_second: 처음 허용 속도 (초당 요청 수)
+    :param burst: 한 번에 몰아서 보낼 수 있는 최대 요청 수
+    :param min_rate: 스로틀링이 계속되어도 유지할 최소 속도
+    :param max_rate: 성공이 계속되어도 넘지 않을 최대 속도
+    :param increase: 성공 한 번마다 늘리는 속도 (초당 요청 수)
+    :param decrease: 스로틀링 한 번마다 곱하는 비율
+    """
+
+    def __init__(
+        self,
+        rate_per_second,
+        burst=1,
+        min_rate=0.5,
+        max_rate=None,
+        increase=0.1,
+        decrease=0.7,
+    ):
+        super().__init__(rate_per_second, burst)
+        self.min_rate = min_rate
+        self.max_rate = max_rate or rate_per_second * 4
+        self.increase = increase
+        self.decrease = decrease
+        self._throttles = deque()  # 최근 스로틀링 시각
+        self._stats = {"throttled": 0, "succeeded": 0}
+
+    def _refill(self):
+        # 호출하는 쪽에서 self._lock 을 잡고 있어야 함
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """
+        토큰 하나를 예약하고 그 토큰이 생길 때까지 기다려야 하는 시간을 돌려주는 함수
+        (기다리는 동안 잠금을 잡지 않으므로 이벤트 루프에서는 asyncio.sleep 으로 기다림)
+        :return: 대기 시간 (초)
+        """
+        with self._lock:
+            self._refill()
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def on_success(self):
+        with self._lock:
+            self._stats["succeeded"] += 1
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self):
+        with self._lock:
+            self._refill()
+            self._stats["throttled"] += 1
+            self._throttles.append(time.monotonic())
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+
+    def stats(self):
+        """
+        현재 허용 속도와 버킷 상태를 돌려주는 함수
+        :return: rate, tokens(남은 토큰), capacity, queued(토큰을 기다리는 요청 수),
+            throttled_recent(최근 1분 스로틀링 횟수), throttled, succeeded
+        """
+        with self._lock:
+            self._refill()
+            now = time.monotonic()
+            while self._throttles and now - self._throttles[0] > THROTTLE_WINDOW:
+                self._throttles.popleft()
+            return dict(
+                self._stats,
+                rate=self.rate,
+                tokens=max(0.0, self.tokens),
+                capacity=self.capacity,
+                queued=max(0, -int(self.tokens // 1)),
+                throttled_recent=len(self._throttles),
+            )
+
+
+class CircuitBreaker:
+    """
+    서비스 오류가 연속으로 나면 잠시 호출을 막는 차단기
+    :param failure_threshold: 차단기를 여는 연속 실패 횟수
+    :param reset_timeout: 열린 뒤 시험 호출을 허용하기까지 기다리는 시간 (초)
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._stats = {"opened": 0, "rejected": 0}
+
+    def _reject(self, remaining):
+        # 호출하는 쪽에서 self._lock 을 잡고 있어야 함
+        self._stats["rejected"] += 1
+        raise CircuitOpenError(
+            f"Bedrock 호출이 잇따라 실패하여 잠시 멈췄습니다. {remaining:.0f}초 후 다시 시도합니다."
+        )
+
+    def check(self):
+        """
+        열려 있으면 바로 실패하는 함수 (요청 속도 제한 대기열에 들어가기 전에 사용, 상태는 바꾸지 않음)
+        :raises CircuitOpenError: 차단 중일 때
+        """
+        with self._lock:
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if self.state == self.OPEN and remaining > 0:
+                self._reject(remaining)
+
+    def before_call(self):
+        """
+        호출해도 되는지 확인하는 함수 (열려 있으면 바로 실패)
+        :raises CircuitOpenError: 차단 중이거나, 반열림 상태에서 이미 시험 호출이 진행 중일 때
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+                if remaining > 0:
+                    self._reject(remaining)
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    self._stats["rejected"] += 1
+                    raise CircuitOpenError("Bedrock 이 복구되었는지 확인하는 중입니다. 잠시 후 다시 시도해주세요.")
+                self._probing = True
+
+    def record_success(self):
+        """
+        엔드포인트가 정상 응답했을 때 호출 (입력 오류처럼 서비스 문제가 아닌 실패 포함)
+        """
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        """
+        서비스 오류로 실패했을 때 호출
+        """
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self._stats["opened"] += 1
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def stats(self):
+        """
+        :return: state, failures(연속 실패 수), retry_in(다시 시도까지 남은 초), opened, rejected
+        """
+        with self._lock:
+            retry_in = 0.0
+            if self.state == self.OPEN:
+                retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+            return dict(self._stats, state=self.state, failures=self._failures, retry_in=retry_in)
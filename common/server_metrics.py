@@ -0,0 +1,153 @@
+"""
+HTTP 서버용 Prometheus 지표 수집 모듈
+요청 수, 지연 시간 히스토그램, 처리 중인 요청 수, 가동 시간을 수집합니다.
+
+스레드마다 자기만의 카운터 묶음(샤드)에 기록하므로 요청 처리 중에는 잠금(lock)이 필요 없고,
+/metrics 를 조회할 때만 모든 샤드를 합칩니다. (샤드를 새로 만들 때만 잠시 잠금 사용)
+"""
+
+import bisect
+import threading
+import time
+from collections import defaultdict
+
+# 지연 시간 히스토그램 구간 경계 (초)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _Shard:
+    # 스레드 하나가 단독으로 쓰는 카운터 묶음
+    def __init__(self):
+        self.requests = defaultdict(int)  # (method, route, status) -> 횟수
+        self.buckets = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))  # route -> 구간별 횟수
+        self.latency_sum = defaultdict(float)  # route -> 지연 시간 합
+        self.in_flight = 0  # 이 스레드에서 처리 중인 요청 수 (시작 +1, 종료 -1)
+
+
+class ServerMetrics:
+    """
+    요청 지표 수집기
+    :param routes: 지표 라벨로 사용할 경로 목록 (그 외 경로는 "other" 로 묶어 라벨 수 폭증 방지)
+    """
+
+    def __init__(self, routes):
+        self.routes = set(routes)
+        self.started_at = time.time()
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+        self._collectors = []
+
+    def add_collector(self, collector):
+        """
+        /metrics 응답 끝에 덧붙일 지표를 만드는 함수를 등록하는 함수
+        :param collector: Prometheus 텍스트 형식의 줄 리스트를 돌려주는 함수
+        """
+        self._collectors.append(collector)
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard()
+            self._local.shard = shard
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def route_label(self, path):
+        """
+        요청 경로를 지표 라벨용 경로로 바꾸는 함수 (쿼리 문자열 제거, 모르는 경로는 other)
+        """
+        path = path.split("?", 1)[0]
+        return path if path in self.routes else "other"
+
+    def request_started(self):
+        self._shard().in_flight += 1
+
+    def request_finished(self, method, route, status, duration):
+        """
+        요청 하나의 처리 결과를 기록하는 함수
+        :param duration: 처리 시간 (초)
+        """
+        shard = self._shard()
+        shard.in_flight -= 1
+        shard.requests[(method, route, status)] += 1
+        shard.buckets[route][bisect.bisect_left(LATENCY_BUCKETS, duration)] += 1
+        shard.latency_sum[route] += duration
+
+    def snapshot(self):
+        """
+        모든 샤드를 합친 현재 지표를 돌려주는 함수
+        """
+        with self._shards_lock:
+            shards = list(self._shards)
+
+        requests = defaultdict(int)
+        buckets = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+        latency_sum = defaultdict(float)
+        in_flight = 0
+        for shard in shards:
+            # 다른 스레드가 쓰는 중에도 안전하게 읽도록 사본으로 순회
+            for key, count in list(shard.requests.items()):
+                requests[key] += count
+            for route, counts in list(shard.buckets.items()):
+                merged = buckets[route]
+                for i, count in enumerate(list(counts)):
+                    merged[i] += count
+            for route, total in list(shard.latency_sum.items()):
+                latency_sum[route] += total
+            in_flight += shard.in_flight
+
+        return {
+            "requests": dict(requests),
+            "buckets": dict(buckets),
+            "latency_sum": dict(latency_sum),
+            "in_flight": in_flight,
+            "uptime": time.time() - self.started_at,
+        }
+
+    def render_prometheus(self):
+        """
+        Prometheus 텍스트 형식(/metrics 응답 본문)으로 지표를 만드는 함수
+        """
+        data = self.snapshot()
+        lines = [
+            "# HELP http_requests_total Total HTTP requests.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(data["requests"].items()):
+            lines.append(
+                f'http_requests_total{{method="{method}",path="{route}",status="{status}"}} {count}'
+            )
+
+        lines += [
+            "# HELP http_request_duration_seconds HTTP request latency.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for route, counts in sorted(data["buckets"].items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(
+                    f'http_request_duration_seconds_bucket{{path="{route}",le="{le}"}} {cumulative}'
+                )
+            lines.append(
+                f'http_request_duration_seconds_sum{{path="{route}"}} {data["latency_sum"][route]:.6f}'
+            )
+            lines.append(f'http_request_duration_seconds_count{{path="{route}"}} {cumulative}')
+
+        lines += [
+            "# HELP http_requests_in_flight Requests currently being served.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {data['in_flight']}",
+            "# HELP process_uptime_seconds Seconds since the server started.",
+            "# TYPE process_uptime_seconds gauge",
+            f"process_uptime_seconds {data['uptime']:.3f}",
+            "# HELP process_start_time_seconds Start time of the server since unix epoch.",
+            "# TYPE process_start_time_seconds gauge",
+            f"process_start_time_seconds {self.started_at:.3f}",
+        ]
+        for collector in self._collectors:
+            lines += collector()
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,55 @@
+"""
+Bedrock 스트리밍 응답(invoke_model_with_response_stream) 처리 모듈
+"""
+
+import json
+
+
+def new_usage():
+    """
+    스트리밍 도중 채워지는 토큰 사용량 딕셔너리를 생성하는 함수
+    :return: input_tokens / output_tokens 키를 가진 딕셔너리
+    """
+    return {"input_tokens": 0, "output_tokens": 0}
+
+
+def iter_stream_events(response):
+    """
+    Bedrock 이벤트 스트림에서 Claude 메시지 이벤트(JSON)를 하나씩 꺼내는 제너레이터
+    :param response: invoke_model_with_response_stream 의 반환값
+    :return: 파싱된 이벤트 딕셔너리 (type 키 포함)
+    """
+    for event in response.get("body"):
+        chunk = event.get("chunk")
+        if chunk is None:
+            continue  # chunk 이외의 이벤트(메타데이터 등)는 건너뜀
+        yield json.loads(chunk["bytes"])
+
+
+def iter_stream_text(response, usage):
+    """
+    스트리밍 응답에서 텍스트 조각만 순서대로 돌려주는 제너레이터
+    st.write_stream 에 그대로 전달할 수 있습니다.
+    :param response: invoke_model_with_response_stream 의 반환값
+    :param usage: 토큰 사용량을 기록할 딕셔너리 (new_usage() 결과), 스트림이 끝나면 채워짐
+    :return: 응답 텍스트 조각
+    """
+    for event in iter_stream_events(response):
+        event_type = event.get("type")
+
+        if event_type == "message_start":
+            # 입력 토큰 수는 첫 이벤트에 들어 있음
+            message_usage = event["message"].get("usage", {})
+            usage["input_tokens"] = message_usage.get("input_tokens", 0)
+            usage["output_tokens"] = message_usage.get("output_tokens", 0)
+
+        elif event_type == "content_block_delta":
+            delta = event.get("delta", {})
+            if delta.get("type") == "text_delta":
+                yield delta["text"]
+
+        elif event_type == "message_delta":
+            # 출력 토큰 수는 마지막 message_delta 에 누적값으로 들어 있음
+            usage["output_tokens"] = event.get("usage", {}).get(
+                "output_tokens", usage["output_tokens"]
+            )
@@ -0,0 +1,148 @@
+"""
+환자 활력징후(vitals) 코호트 데이터 처리 모듈
+수천 명 환자의 수백만 건 측정값을 Parquet 에서 읽어,
+정렬된 DatetimeIndex 위에서 이진 탐색으로 기간을 자르고 벡터화된 groupby 로 집계합니다.
+"""
+
+import numpy as np
+import pandas as pd
+
+TIME_COLUMN = "날짜"
+PATIENT_COLUMN = "환자ID"
+VITAL_COLUMNS = ["혈압(수축기)", "혈압(이완기)", "혈당", "체온"]
+
+
+def generate_cohort(n_patients=1000, start="2024-10-01", end="2024-10-31", freq="h", seed=42):
+    """
+    여러 환자의 측정값을 담은 샘플 코호트 데이터를 만드는 함수 (반복문 없이 NumPy 로 생성)
+    :param n_patients: 환자 수
+    :param start: 시작일
+    :param end: 종료일
+    :param freq: 측정 간격 (pandas 빈도 문자열, 예: "h", "15min")
+    :return: 환자ID, 날짜, 활력징후 컬럼을 가진 DataFrame
+    """
+    rng = np.random.default_rng(seed)
+    times = pd.date_range(
+        start=start, end=pd.Timestamp(end) + pd.Timedelta(days=1), freq=freq, inclusive="left"
+    )
+    n = n_patients * len(times)
+
+    # 환자별 기준값 + 측정마다의 변동
+    base_sys = rng.integers(105, 145, n_patients).repeat(len(times))
+    base_glucose = rng.integers(85, 140, n_patients).repeat(len(times))
+
+    systolic = base_sys + rng.integers(-10, 11, n)
+    return pd.DataFrame(
+        {
+            PATIENT_COLUMN: pd.Categorical(
+                np.char.add("P", np.char.zfill(np.arange(n_patients).astype(str), 5)).repeat(
+                    len(times)
+                )
+            ),
+            TIME_COLUMN: np.tile(times.values, n_patients),
+            "혈압(수축기)": systolic.astype(np.int16),
+            "혈압(이완기)": (systolic * 0.62 + rng.integers(-6, 7, n)).astype(np.int16),
+            "혈당": (base_glucose + rng.integers(-15, 16, n)).astype(np.int16),
+            "체온": np.round(rng.normal(36.7, 0.3, n), 1).astype(np.float32),
+        }
+    )
+
+
+def write_cohort_parquet(data, path):
+    """
+    코호트 데이터를 Parquet 파일로 저장하는 함수 (시간순으로 정렬해서 저장)
+    :param data: generate_cohort() 형식의 DataFrame
+    :param path: 저장할 파일 경로
+    """
+    data.sort_values(TIME_COLUMN, kind="stable").to_parquet(path, index=False)
+
+
+def prepare(data):
+    """
+    DataFrame 을 정렬된 DatetimeIndex(날짜) 형태로 바꾸는 함수
+    이미 정렬된 데이터는 다시 정렬하지 않습니다.
+    :param data: 날짜 컬럼을 가진 DataFrame
+    :return: 날짜가 인덱스이고 시간순으로 정렬된 DataFrame
+    """
+    data = data.set_index(TIME_COLUMN)
+    if not data.index.is_monotonic_increasing:
+        data = data.sort_index(kind="stable")
+    if PATIENT_COLUMN in data.columns and not isinstance(
+        data[PATIENT_COLUMN].dtype, pd.CategoricalDtype
+    ):
+        data[PATIENT_COLUMN] = data[PATIENT_COLUMN].astype("category")
+    return data
+
+
+def load_cohort(path, columns=None):
+    """
+    Parquet 파일에서 코호트 데이터를 읽어 정렬된 DatetimeIndex 형태로 돌려주는 함수
+    :param path: Parquet 파일 경로
+    :param columns: 읽을 활력징후 컬럼 (None 이면 전체)
+    :return: prepare() 를 거친 DataFrame
+    """
+    if columns is not None:
+        columns = [TIME_COLUMN, PATIENT_COLUMN] + list(columns)
+    return prepare(pd.read_parquet(path, columns=columns))
+
+
+def slice_dates(data, start_date, end_date):
+    """
+    정렬된 인덱스에서 이진 탐색(searchsorted)으로 기간을 잘라내는 함수
+    불리언 마스크처럼 전체 행을 비교하지 않고 O(log n) 으로 경계를 찾아 슬라이스(복사 없음)합니다.
+    :param data: prepare() 를 거친 DataFrame
+    :param start_date: 시작일 (포함)
+    :param end_date: 종료일 (그날 전체 포함)
+    :return: 기간에 해당하는 DataFrame
+    """
+    index = data.index
+    left = index.searchsorted(pd.Timestamp(start_date), side="left")
+    right = index.searchsorted(pd.Timestamp(end_date) + pd.Timedelta(days=1), side="left")
+    return data.iloc[left:right]
+
+
+def select_patients(data, patient_ids):
+    """
+    선택한 환자의 행만 남기는 함수 (선택이 없으면 전체)
+    """
+    if not patient_ids:
+        return data
+    return data[data[PATIENT_COLUMN].isin(patient_ids)]
+
+
+def summarize(data, columns=VITAL_COLUMNS):
+    """
+    주요 지표(평균)와 건수·환자 수를 한 번의 집계로 계산하는 함수
+    :return: 각 활력징후 평균, rows(측정 건수), patients(환자 수) 를 담은 딕셔너리
+    """
+    summary = data[list(columns)].mean().to_dict()
+    summary["rows"] = len(data)
+    summary["patients"] = (
+        data[PATIENT_COLUMN].nunique() if PATIENT_COLUMN in data.columns else 1
+    )
+    return summary
+
+
+def trend_series(data, columns=VITAL_COLUMNS):
+    """
+    추세 그래프용 시계열을 만드는 함수
+    환자가 한 명이면 측정값을 그대로, 여러 명이면 측정 시각별 평균을 사용합니다.
+    :return: 날짜 인덱스, 활력징후 컬럼을 가진 DataFrame (원래 해상도 유지)
+    """
+    columns = list(columns)
+    if PATIENT_COLUMN not in data.columns or data[PATIENT_COLUMN].nunique() <= 1:
+        return data[columns]
+    return data.groupby(level=0)[columns].mean()
+
+
+def per_patient(data, columns=VITAL_COLUMNS):
+    """
+    환자별 평균/최솟값/최댓값과 측정 건수를 계산하는 함수
+    :return: 환자ID 인덱스, "혈압(수축기) 평균" 형태의 컬럼을 가진 DataFrame
+    """
+    grouped = data.groupby(PATIENT_COLUMN, observed=True)
+    stats = grouped[list(columns)].agg(["mean", "min", "max"])
+    labels = {"mean": "평균", "min": "최저", "max": "최고"}
+    stats.columns = [f"{column} {labels[stat]}" for column, stat in stats.columns]
+    stats["측정 건수"] = grouped.size()
+    return stats
@@ -0,0 +1,245 @@
+"""
+활력징후 컬럼형 저장소
+환자별·월별로 나뉜(hive 파티션) Parquet 파일에 측정값을 저장하고,
+메모리 맵(mmap)으로 읽으면서 필요한 컬럼만(컬럼 프로젝션), 필요한 기간·환자만(프레디킷 푸시다운) 읽습니다.
+
+디렉터리 구조 예)
+    data/vitals_store/patient=P00001/month=2024-10/part-0.parquet
+
+명령행 사용법
+    python -m common.vitals_store ingest 측정값.csv data/vitals_store
+    python -m common.vitals_store ingest 측정값.csv data/vitals_store --replace
+    python -m common.vitals_store generate data/vitals_store --patients 200 --freq min
+    python -m common.vitals_store info data/vitals_store
+"""
+
+import argparse
+import os
+import time
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+from common.vitals import PATIENT_COLUMN, TIME_COLUMN, VITAL_COLUMNS, prepare
+
+# 파티션 컬럼 이름 (디렉터리 이름에 쓰이므로 영문 사용)
+PATIENT_PARTITION = "patient"
+MONTH_PARTITION = "month"
+
+PARTITIONING = ds.partitioning(
+    pa.schema([(PATIENT_PARTITION, pa.string()), (MONTH_PARTITION, pa.string())]),
+    flavor="hive",
+)
+
+# 읽을 때는 환자ID 를 사전(dictionary) 형식으로 받아 pandas 범주형으로 바로 변환되게 함
+READ_PARTITIONING = ds.HivePartitioning.discover(infer_dictionary=True)
+
+# 적재할 때마다 새로 쓰는 버전 파일 ("_" 로 시작하므로 데이터셋 파일 목록에는 들어가지 않음)
+VERSION_FILE = "_version"
+
+
+def ingest(data, root, replace=False):
+    """
+    측정값 DataFrame 을 환자별·월별 파티션으로 저장하는 함수
+    기본은 기존 파일을 그대로 두고 새 파일을 추가하며, replace=True 일 때만
+    이번 데이터에 들어 있는 (환자, 월) 파티션의 기존 파일을 지우고 다시 씁니다.
+    :param data: 환자ID, 날짜, 활력징후 컬럼을 가진 DataFrame
+    :param root: 저장소 디렉터리
+    :param replace: 겹치는 파티션의 기존 데이터를 지울지 여부
+    :return: 저장한 행 수
+    """
+    # 환자별로 모아서 정렬해야 파티션 파일마다 큰 행 그룹이 만들어짐 (파일 안에서는 시간순)
+    data = data.sort_values([PATIENT_COLUMN, TIME_COLUMN], kind="stable")
+
+    # 파티션 값은 범주형(고유값만 문자열 변환)으로 만든 뒤 Arrow 에서 문자열로 풀어 줌
+    # (수백만 행에 strftime/astype(str) 을 직접 적용하는 것보다 훨씬 빠름)
+    months = pd.Categorical(data[TIME_COLUMN].to_numpy().astype("datetime64[M]"))
+    months = months.rename_categories(lambda month: month.strftime("%Y-%m"))
+    patients = pd.Categorical(data[PATIENT_COLUMN])
+    patients = patients.rename_categories(lambda patient: str(patient))
+
+    table = pa.table(
+        {
+            PATIENT_PARTITION: pa.array(patients).cast(pa.string()),
+            MONTH_PARTITION: pa.array(months).cast(pa.string()),
+            TIME_COLUMN: data[TIME_COLUMN].to_numpy(),
+            **{column: data[column].to_numpy() for column in VITAL_COLUMNS},
+        }
+    )
+    # 추가할 때는 적재마다 다른 파일 이름을 써서 기존 part-0.parquet 등을 덮어쓰지 않게 함
+    ds.write_dataset(
+        table,
+        root,
+        format="parquet",
+        partitioning=PARTITIONING,
+        basename_template="part-{i}.parquet" if replace else f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="delete_matching" if replace else "overwrite_or_ignore",
+        max_partitions=1_000_000,
+        # 행 그룹마다 날짜 최솟값/최댓값 통계가 기록되어 기간 필터에서 건너뛰기에 활용됨
+        min_rows_per_group=16 * 1024,
+        max_rows_per_group=16 * 1024,
+    )
+    with open(os.path.join(root, VERSION_FILE), "w") as file:
+        file.write(str(time.time_ns()))
+    return table.num_rows
+
+
+def store_version(root):
+    """
+    저장소 내용이 바뀌었는지 확인하는 값 (적재할 때마다 달라짐, 캐시 키로 사용)
+    버전 파일이 없으면(직접 복사한 저장소 등) 가장 최근에 바뀐 파일의 수정 시각을 사용합니다.
+    :param root: 저장소 디렉터리
+    :return: 버전 문자열
+    """
+    try:
+        with open(os.path.join(root, VERSION_FILE)) as file:
+            return file.read()
+    except FileNotFoundError:
+        newest = max(
+            (
+                os.path.getmtime(os.path.join(directory, name))
+                for directory, _, names in os.walk(root)
+                for name in names
+            ),
+            default=0.0,
+        )
+        return str(newest)
+
+
+def _month_range(start_date, end_date):
+    # 기간에 걸친 "YYYY-MM" 목록 (월 파티션 가지치기용)
+    months = pd.period_range(pd.Timestamp(start_date), pd.Timestamp(end_date), freq="M")
+    return [str(month) for month in months]
+
+
+class VitalsStore:
+    """
+    파티션된 Parquet 저장소를 읽는 클래스
+    :param root: 저장소 디렉터리
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.dataset = ds.dataset(
+            root,
+            format="parquet",
+            partitioning=READ_PARTITIONING,
+            filesystem=pafs.LocalFileSystem(use_mmap=True),  # 파일을 메모리 맵으로 읽음
+        )
+
+    def _partition_values(self, name):
+        values = set()
+        for fragment in self.dataset.get_fragments():
+            keys = ds.get_partition_keys(fragment.partition_expression)
+            values.add(keys[name])
+        return sorted(values)
+
+    def patients(self):
+        """
+        저장된 환자ID 목록 (파일을 읽지 않고 디렉터리 이름에서 가져옴)
+        """
+        return self._partition_values(PATIENT_PARTITION)
+
+    def date_range(self):
+        """
+        저장된 데이터의 (첫 달 1일, 마지막 달 말일), 저장소가 비어 있으면 None
+        """
+        months = self._partition_values(MONTH_PARTITION)
+        if not months:
+            return None
+        start = pd.Period(months[0], freq="M").start_time
+        end = pd.Period(months[-1], freq="M").end_time.normalize()
+        return start, end
+
+    def read(self, columns=VITAL_COLUMNS, start_date=None, end_date=None, patients=None):
+        """
+        필요한 컬럼·기간·환자만 읽어 정렬된 DatetimeIndex DataFrame 으로 돌려주는 함수
+        월/환자 조건은 파티션 디렉터리 단위로, 날짜 조건은 Parquet 행 그룹 통계로 건너뜁니다.
+        :param columns: 읽을 활력징후 컬럼 (예: ["체온"] 이면 혈압 컬럼은 읽지 않음)
+        :param start_date: 시작일 (포함)
+        :param end_date: 종료일 (그날 전체 포함)
+        :param patients: 환자ID 리스트 (None 또는 빈 리스트면 전체)
+        :return: vitals.prepare() 형식의 DataFrame
+        """
+        condition = None
+
+        def add(expression):
+            nonlocal condition
+            condition = expression if condition is None else condition & expression
+
+        if start_date is not None and end_date is not None:
+            start = pd.Timestamp(start_date)
+            end = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+            add(ds.field(MONTH_PARTITION).isin(_month_range(start, end - pd.Timedelta(days=1))))
+            add(ds.field(TIME_COLUMN) >= pa.scalar(start.to_pydatetime()))
+            add(ds.field(TIME_COLUMN) < pa.scalar(end.to_pydatetime()))
+        if patients:
+            add(ds.field(PATIENT_PARTITION).isin(list(patients)))
+
+        table = self.dataset.to_table(
+            columns=[TIME_COLUMN, PATIENT_PARTITION] + list(columns), filter=condition
+        )
+        data = table.to_pandas().rename(columns={PATIENT_PARTITION: PATIENT_COLUMN})
+        return prepare(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="활력징후 컬럼형 저장소 도구")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = commands.add_parser("ingest", help="CSV/Parquet 파일을 저장소로 적재")
+    ingest_parser.add_argument("source", help="환자ID, 날짜, 활력징후 컬럼을 가진 CSV 또는 Parquet 파일")
+    ingest_parser.add_argument("root", help="저장소 디렉터리")
+    ingest_parser.add_argument(
+        "--replace",
+        action="store_true",
+        help="겹치는 (환자, 월) 파티션의 기존 데이터를 지우고 다시 씀 (기본: 추가)",
+    )
+
+    generate_parser = commands.add_parser("generate", help="샘플 코호트를 생성하여 적재")
+    generate_parser.add_argument("root", help="저장소 디렉터리")
+    generate_parser.add_argument("--patients", type=int, default=200)
+    generate_parser.add_argument("--start", default="2024-10-01")
+    generate_parser.add_argument("--end", default="2024-10-31")
+    generate_parser.add_argument("--freq", default="h", help='측정 간격 (예: "h", "min")')
+
+    info_parser = commands.add_parser("info", help="저장소 요약 정보 출력")
+    info_parser.add_argument("root", help="저장소 디렉터리")
+
+    args = parser.parse_args()
+    started = time.perf_counter()
+
+    if args.command == "ingest":
+        if args.source.endswith(".parquet"):
+            data = pd.read_parquet(args.source)
+        else:
+            data = pd.read_csv(args.source, encoding="utf-8-sig", parse_dates=[TIME_COLUMN])
+        rows = ingest(data, args.root, replace=args.replace)
+        print(f"{rows:,}행 적재 완료 ({time.perf_counter() - started:.1f}초)")
+
+    elif args.command == "generate":
+        from common.vitals import generate_cohort
+
+        data = generate_cohort(args.patients, args.start, args.end, args.freq)
+        rows = ingest(data, args.root)
+        print(f"{rows:,}행 생성·적재 완료 ({time.perf_counter() - started:.1f}초)")
+
+    elif args.command == "info":
+        store = VitalsStore(args.root)
+        date_range = store.date_range()
+        if date_range is None:
+            print("저장소가 비어 있습니다.")
+            return
+        start, end = date_range
+        files = store.dataset.files
+        size = sum(os.path.getsize(path) for path in files)
+        print(f"환자 수: {len(store.patients()):,}명")
+        print(f"기간: {start.date()} ~ {end.date()}")
+        print(f"파일 수: {len(files):,}개, 크기: {size / 1024**2:,.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
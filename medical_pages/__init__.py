@@ -0,0 +1,4 @@
+"""
+4.medical_demo.py 의 메뉴 페이지 모음
+페이지마다 render() 함수가 있으며, 4.medical_demo.py 가 선택된 메뉴의 모듈만 불러와 실행합니다.
+"""
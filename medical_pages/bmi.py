@@ -0,0 +1,67 @@
+"""
+4.medical_demo.py 메뉴 페이지: BMI 계산기
+"""
+
+import pandas as pd
+import streamlit as st
+
+from common import clinical
+
+
+def render():
+    """
+    키·체중을 입력받아 BMI 와 WHO 아시아-태평양 기준 분류, 정상 범위까지의 목표 체중을 보여 주는 함수
+    """
+    st.header("📏 BMI (체질량지수) 계산기")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("환자 정보 입력")
+        height = st.number_input(
+            "키 (cm)", min_value=50.0, max_value=250.0, value=170.0, step=0.1
+        )
+        weight = st.number_input(
+            "체중 (kg)", min_value=10.0, max_value=300.0, value=70.0, step=0.1
+        )
+
+        if st.button("BMI 계산", type="primary"):
+            st.session_state["bmi"] = float(clinical.calculate_bmi(height, weight))
+
+    with col2:
+        if "bmi" in st.session_state:
+            bmi = st.session_state["bmi"]
+            st.subheader("계산 결과")
+            st.metric("BMI", f"{bmi:.1f}")
+
+            # BMI 분류
+            code = int(clinical.bmi_category_codes(bmi))
+            category = clinical.BMI_CATEGORIES[code]
+            color = clinical.BMI_COLORS[code]
+
+            st.markdown(f"### 분류: :{color}[{category}]")
+
+            # 목표 체중 계산 (BMI 22 기준)
+            목표_체중 = float(clinical.target_weight(height))
+            차이 = weight - 목표_체중
+
+            st.markdown("### 💡 목표 체중 정보")
+            st.write(
+                f"**정상 BMI ({clinical.TARGET_BMI}) 기준 목표 체중**: {목표_체중:.1f} kg"
+            )
+            if 차이 > 0:
+                st.write(f"**현재 체중에서 감량 필요**: {차이:.1f} kg")
+            elif 차이 < 0:
+                st.write(f"**현재 체중에서 증량 필요**: {abs(차이):.1f} kg")
+            else:
+                st.write("**현재 정상 체중입니다!**")
+
+            # BMI 차트
+            st.subheader("BMI 기준표 (WHO 아시아-태평양)")
+            reference_data = pd.DataFrame(
+                {
+                    "분류": list(clinical.BMI_CATEGORIES),
+                    "BMI 범위": list(clinical.BMI_RANGES),
+                }
+            )
+            st.table(reference_data)
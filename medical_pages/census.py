@@ -0,0 +1,111 @@
+"""
+4.medical_demo.py 메뉴 페이지: 병동 일괄 계산 (BMI + 약물 용량)
+"""
+
+import time
+
+import pandas as pd
+import streamlit as st
+
+from common import clinical, profiler
+from common.export import EXPORT_FORMATS, export_file
+from common.formulary import get_formulary
+
+
+def render():
+    """
+    병동 명단 CSV 를 받아 환자 전체의 BMI·목표 체중·투여량·용량 경고를 한 번에 계산하고,
+    분류 분포 그래프, 경고 환자 목록, 결과 파일(CSV 등) 다운로드를 제공하는 함수
+    """
+    st.header("🧮 병동 일괄 계산")
+    st.write(
+        "병동 환자 명단 CSV를 업로드하면 전체 환자의 BMI, 목표 체중, 투여량과 경고를 한 번에 계산합니다."
+    )
+
+    필수_컬럼 = [clinical.HEIGHT_COLUMN, clinical.WEIGHT_COLUMN]
+    양식 = pd.DataFrame(
+        [
+            ["홍길동", 170.0, 70.0, "아미카신", 15.0, 1],
+            ["김철수", 160.0, 95.0, "반코마이신", 15.0, 3],
+        ],
+        columns=[
+            "환자명",
+            clinical.HEIGHT_COLUMN,
+            clinical.WEIGHT_COLUMN,
+            clinical.DRUG_COLUMN,
+            clinical.DOSE_PER_KG_COLUMN,
+            clinical.TIMES_PER_DAY_COLUMN,
+        ],
+    )
+    st.download_button(
+        label="📄 명단 양식 다운로드 (CSV)",
+        data=양식.to_csv(index=False).encode("utf-8-sig"),
+        file_name="병동명단_양식.csv",
+        mime="text/csv",
+    )
+    st.caption(
+        f"필수 컬럼: {', '.join(필수_컬럼)} · 투여량 계산 시: "
+        f"{clinical.DOSE_PER_KG_COLUMN}, {clinical.TIMES_PER_DAY_COLUMN} "
+        "(약물명 컬럼이 있으면 약물 목록의 1일 최대 투여량으로 점검)"
+    )
+
+    uploaded = st.file_uploader("병동 명단 CSV 업로드", type="csv", key="census_upload")
+    임계값 = st.number_input(
+        "1일 총 투여량 경고 기준 (mg, 약물 목록에 없는 약물)",
+        min_value=1,
+        value=clinical.DAILY_DOSE_THRESHOLD,
+        step=100,
+    )
+
+    if uploaded is not None:
+        census = pd.read_csv(uploaded, encoding="utf-8-sig")
+        누락_컬럼 = [c for c in 필수_컬럼 if c not in census.columns]
+
+        if 누락_컬럼:
+            st.error(f"❌ 필수 컬럼이 없습니다: {', '.join(누락_컬럼)}")
+        else:
+            started = time.perf_counter()
+            # 약물명이 있으면 행마다 약물 목록의 1일 최대 투여량을 기준으로 사용
+            formulary = get_formulary()
+            if clinical.DRUG_COLUMN in census.columns and formulary is not None:
+                기준 = formulary.daily_maxima(census[clinical.DRUG_COLUMN], default=임계값)
+            else:
+                기준 = 임계값
+            with profiler.section("일괄 계산"):
+                results = clinical.calculate_census(census, dose_threshold=기준)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            계산_불가 = int(results["분류"].isna().sum())
+            col1, col2, col3 = st.columns(3)
+            col1.metric("환자 수", f"{len(results):,}명")
+            col2.metric("BMI 계산 불가", f"{계산_불가:,}명")
+            if "용량 경고" in results.columns:
+                col3.metric("용량 경고", f"{int(results['용량 경고'].sum()):,}명")
+            st.caption(f"⏱️ 계산 시간 {elapsed_ms:.1f} ms")
+
+            st.subheader("BMI 분류 분포")
+            st.bar_chart(results["분류"].value_counts(sort=False))
+
+            if "용량 경고" in results.columns:
+                경고_환자 = results[results["용량 경고"]]
+                if len(경고_환자):
+                    st.error("⚠️ 1일 총 투여량이 기준을 초과하는 환자")
+                    st.dataframe(경고_환자, use_container_width=True)
+
+            with st.expander("전체 결과 보기"):
+                st.dataframe(results, use_container_width=True)
+
+            export_format = st.radio(
+                "다운로드 형식",
+                list(EXPORT_FORMATS),
+                format_func=lambda key: EXPORT_FORMATS[key][0],
+                horizontal=True,
+                key="census_export_format",
+            )
+            export_label, export_mime, export_extension = EXPORT_FORMATS[export_format]
+            st.download_button(
+                label=f"📥 결과 다운로드 ({export_label})",
+                data=lambda: export_file(results, export_format),
+                file_name=f"병동일괄계산{export_extension}",
+                mime=export_mime,
+            )
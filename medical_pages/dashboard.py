@@ -0,0 +1,278 @@
+"""
+4.medical_demo.py 메뉴 페이지: 환자 데이터 대시보드
+"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from common import profiler, vitals
+from common.downsample import METHODS, downsample
+from common.export import EXPORT_FORMATS, export_file
+from common.vitals_store import VitalsStore, ingest, store_version
+
+# 메뉴 이름 (재실행 비용을 이 페이지로 집계)
+MENU = "환자 데이터 대시보드"
+
+
+# 샘플 데이터 생성 (단일 환자)
+# persist="disk": common.launcher 로 여러 프로세스를 띄웠을 때 한 번 만든 결과를 함께 사용
+@st.cache_data(persist="disk")
+def generate_patient_data():
+    dates = pd.date_range(start="2024-10-01", end="2024-10-31", freq="D")
+    np.random.seed(42)
+
+    data = pd.DataFrame(
+        {
+            "날짜": dates,
+            "혈압(수축기)": np.random.randint(110, 140, len(dates)),
+            "혈압(이완기)": np.random.randint(70, 90, len(dates)),
+            "혈당": np.random.randint(90, 130, len(dates)),
+            "체온": np.round(np.random.uniform(36.0, 37.5, len(dates)), 1),
+        }
+    )
+    return data
+
+
+# 코호트 데이터 읽기 (수백만 행이므로 세션마다 복사하지 않도록 cache_resource 사용, 읽기 전용)
+@st.cache_resource(show_spinner="코호트 데이터를 불러오는 중...")
+def load_cohort_data(path, modified_time):
+    return vitals.load_cohort(path)
+
+
+# 파티션 저장소 열기 (파일 목록만 읽으므로 가벼움, 프로세스 전체에서 공유)
+@st.cache_resource(show_spinner=False)
+def open_vitals_store(path, version):
+    return VitalsStore(path)
+
+
+def render():
+    """
+    단일 환자 샘플, 코호트 Parquet, 컬럼형 저장소 중 고른 데이터를 기간·환자로 걸러
+    주요 지표, 추세 그래프, 환자별 통계, 원본 데이터(다운로드 포함)를 보여 주는 함수
+    """
+    st.header("📊 환자 데이터 대시보드")
+
+    data_source = st.radio(
+        "데이터 선택",
+        ["단일 환자 샘플", "코호트 (Parquet)", "코호트 (컬럼형 저장소)"],
+        horizontal=True,
+    )
+
+    patient_data, store = None, None
+    if data_source == "단일 환자 샘플":
+        with profiler.section("데이터 읽기"):
+            patient_data = vitals.prepare(
+                generate_patient_data().assign(**{vitals.PATIENT_COLUMN: "샘플환자"})
+            )
+    elif data_source == "코호트 (Parquet)":
+        cohort_path = os.environ.get("VITALS_COHORT_PATH", "data/cohort_vitals.parquet")
+        if not os.path.exists(cohort_path):
+            st.info(f"코호트 파일({cohort_path})이 없습니다. 샘플 코호트를 만들어 보세요.")
+            n_patients = st.number_input(
+                "환자 수", min_value=10, max_value=20000, value=1000, step=100
+            )
+            if st.button("샘플 코호트 생성 (1시간 간격, 31일)", type="primary"):
+                with st.spinner("샘플 코호트를 생성하는 중..."):
+                    os.makedirs(os.path.dirname(cohort_path) or ".", exist_ok=True)
+                    vitals.write_cohort_parquet(
+                        vitals.generate_cohort(n_patients), cohort_path
+                    )
+                st.rerun()
+            st.stop()
+
+        with profiler.section("데이터 읽기"):
+            patient_data = load_cohort_data(cohort_path, os.path.getmtime(cohort_path))
+    else:
+        store_path = os.environ.get("VITALS_STORE_PATH", "data/vitals_store")
+        if os.path.isdir(store_path):
+            with profiler.section("데이터 읽기"):
+                store = open_vitals_store(store_path, store_version(store_path))
+        if store is None or store.date_range() is None:
+            st.info(
+                f"저장소({store_path})에 데이터가 없습니다. 아래 명령으로 데이터를 적재하거나 샘플을 만들어 보세요.\n\n"
+                f"`python -m common.vitals_store ingest 측정값.csv {store_path}`"
+            )
+            if st.button("샘플 저장소 생성 (환자 50명, 1분 간격, 31일)", type="primary"):
+                with st.spinner("샘플 저장소를 생성하는 중..."):
+                    ingest(vitals.generate_cohort(50, freq="min"), store_path)
+                st.rerun()
+            st.stop()
+
+    # 필터
+    if store is not None:
+        first_date, last_date = store.date_range()
+        patient_ids = store.patients()
+    else:
+        first_date, last_date = patient_data.index[0], patient_data.index[-1]
+        patient_ids = list(patient_data[vitals.PATIENT_COLUMN].cat.categories)
+
+    # 그래프 종류 -> (컬럼, 제목, 축 이름)
+    추세_그래프 = {
+        "혈압": (
+            ["혈압(수축기)", "혈압(이완기)"],
+            "혈압 추세",
+            {"value": "혈압 (mmHg)", "variable": "구분"},
+        ),
+        "혈당": (["혈당"], "혈당 추세", {"혈당": "혈당 (mg/dL)"}),
+        "체온": (["체온"], "체온 추세", {"체온": "체온 (°C)"}),
+    }
+
+    @st.fragment
+    def trend_view(load_filtered):
+        """
+        추세 그래프 조각 - 그래프 종류나 해상도를 바꾸면 이 부분만 다시 실행됨
+        탭은 보이지 않는 그래프까지 모두 만들므로, 선택한 그래프 하나만 그림
+        :param load_filtered: 선택한 기간·환자의 데이터를 읽는 함수
+        """
+        with profiler.fragment("4.medical_demo", MENU, "추세 그래프"):
+            # 그래프 (여러 환자는 측정 시각별 평균으로 표시)
+            st.subheader("📉 추세 그래프")
+            그래프 = st.radio(
+                "그래프 선택",
+                list(추세_그래프),
+                horizontal=True,
+                label_visibility="collapsed",
+            )
+
+            # 브라우저로 보내는 점의 수를 그래프 폭 수준으로 줄임 (원본은 아래 원본 데이터에서 확인)
+            col1, col2 = st.columns(2)
+            with col1:
+                max_points = st.slider(
+                    "그래프 해상도 (선당 최대 점 수)",
+                    min_value=200,
+                    max_value=4000,
+                    value=1000,
+                    step=100,
+                )
+            with col2:
+                downsample_method = st.selectbox(
+                    "다운샘플링 방식", list(METHODS), format_func=lambda key: METHODS[key]
+                )
+
+            # 선택한 기간의 데이터를 다운샘플링하여 그래프를 그리고 렌더링 비용을 표시
+            # 그래프에 필요한 컬럼만 읽습니다. (예: 체온 그래프는 혈압 컬럼을 읽지 않음)
+            columns, title, labels = 추세_그래프[그래프]
+            with profiler.section(f"그래프: {그래프}"):
+                started = time.perf_counter()
+                trend_data = vitals.trend_series(load_filtered(columns), columns)
+                plot_data = downsample(
+                    trend_data, columns, n_out=max_points, method=downsample_method
+                ).reset_index()
+                fig = px.line(
+                    plot_data,
+                    x="날짜",
+                    y=columns if len(columns) > 1 else columns[0],
+                    title=title,
+                    labels=labels,
+                )
+                payload_kb = len(fig.to_json()) / 1024
+                st.plotly_chart(fig, use_container_width=True)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+            st.caption(
+                f"원본 {len(trend_data):,}점 → 표시 {len(plot_data):,}점 · "
+                f"전송 크기 {payload_kb:,.0f} KB · 생성 시간 {elapsed_ms:,.0f} ms"
+            )
+
+    @st.fragment
+    def dashboard_view(patient_data, store, first_date, last_date, patient_ids):
+        """
+        기간·환자 필터 조각 - 필터를 바꾸면 데이터 선택과 사이드바는 그대로 두고 이 부분만 다시 실행됨
+        """
+        with profiler.fragment("4.medical_demo", MENU, "대시보드 필터"):
+            st.subheader("기간 선택")
+            col1, col2 = st.columns(2)
+            with col1:
+                start_date = st.date_input("시작일", value=first_date)
+            with col2:
+                end_date = st.date_input("종료일", value=last_date)
+
+            selected_patients = []
+            if len(patient_ids) > 1:
+                selected_patients = st.multiselect(
+                    "환자 선택 (비워두면 전체 환자)", patient_ids
+                )
+
+            def load_filtered(columns):
+                """
+                선택한 기간·환자의 데이터를 필요한 컬럼만 가져오는 함수
+                저장소는 파일에서 해당 컬럼·기간만 읽고, 메모리 데이터는 정렬된 날짜 인덱스를 이진 탐색으로 잘라냄
+                """
+                if store is not None:
+                    return store.read(columns, start_date, end_date, selected_patients)
+                sliced = vitals.slice_dates(patient_data, start_date, end_date)
+                return vitals.select_patients(sliced, selected_patients)[
+                    [vitals.PATIENT_COLUMN] + list(columns)
+                ]
+
+            # 주요 지표는 네 가지 활력징후가 모두 필요함
+            with profiler.section("기간·환자 필터"):
+                filtered_data = load_filtered(vitals.VITAL_COLUMNS)
+
+            # 주요 지표 표시 (모든 지표를 한 번의 집계로 계산)
+            st.subheader("📈 주요 지표")
+            with profiler.section("주요 지표 집계"):
+                summary = vitals.summarize(filtered_data)
+            col1, col2, col3, col4 = st.columns(4)
+
+            with col1:
+                st.metric("평균 수축기 혈압", f"{summary['혈압(수축기)']:.0f} mmHg")
+
+            with col2:
+                st.metric("평균 이완기 혈압", f"{summary['혈압(이완기)']:.0f} mmHg")
+
+            with col3:
+                st.metric("평균 혈당", f"{summary['혈당']:.0f} mg/dL")
+
+            with col4:
+                st.metric("평균 체온", f"{summary['체온']:.1f}°C")
+
+            st.caption(f"측정 {summary['rows']:,}건 · 환자 {summary['patients']:,}명")
+
+            trend_view(load_filtered)
+
+            # 환자별 통계와 원본 데이터는 펼친 경우에만 계산
+            # (접힌 expander 안의 내용도 매번 실행되므로 토글로 대신함)
+            if summary["patients"] > 1 and st.toggle("👥 환자별 통계 보기"):
+                with profiler.section("환자별 통계"):
+                    st.dataframe(
+                        vitals.per_patient(filtered_data).round(1),
+                        use_container_width=True,
+                    )
+
+            # 원본 데이터 표시
+            if st.toggle("📋 원본 데이터 보기"):
+                # 화면에는 앞부분만 표시 (전체 데이터는 다운로드로 제공)
+                미리보기_행수 = 10000
+                if len(filtered_data) > 미리보기_행수:
+                    st.caption(
+                        f"전체 {len(filtered_data):,}행 중 앞 {미리보기_행수:,}행만 표시합니다."
+                    )
+                with profiler.section("원본 데이터 미리보기"):
+                    st.dataframe(
+                        filtered_data.head(미리보기_행수).reset_index(),
+                        use_container_width=True,
+                    )
+
+                # 데이터 다운로드 - 버튼을 누를 때만 파일을 조각 단위로 만들어 전달
+                # (매 재실행마다 전체 CSV 를 메모리에 만들지 않음)
+                export_format = st.radio(
+                    "다운로드 형식",
+                    list(EXPORT_FORMATS),
+                    format_func=lambda key: EXPORT_FORMATS[key][0],
+                    horizontal=True,
+                )
+                export_label, export_mime, export_extension = EXPORT_FORMATS[export_format]
+                st.download_button(
+                    label=f"📥 데이터 다운로드 ({export_label})",
+                    data=lambda: export_file(filtered_data.reset_index(), export_format),
+                    file_name=f"환자데이터_{start_date}_{end_date}{export_extension}",
+                    mime=export_mime,
+                )
+
+    # 데이터 선택이 바뀌면 전체 재실행, 필터·그래프 조작은 해당 조각만 재실행
+    dashboard_view(patient_data, store, first_date, last_date, patient_ids)
@@ -0,0 +1,95 @@
+"""
+4.medical_demo.py 메뉴 페이지: 약물 투여 계산기
+"""
+
+import streamlit as st
+
+from common import clinical
+from common.formulary import get_formulary
+
+
+def render():
+    """
+    체중, 약물(약물 목록에서 검색), 체중당 용량, 투여 빈도로 1회·1일 투여량을 계산하고,
+    약물별 기준(목록에 없는 약물은 공통 1일 최대 투여량)을 넘으면 경고를 보여 주는 함수
+    """
+    st.header("💊 약물 투여 계산기")
+
+    st.write("체중 기반 약물 용량을 계산합니다.")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("환자 정보")
+        patient_weight = st.number_input(
+            "환자 체중 (kg)", min_value=1.0, max_value=200.0, value=70.0, step=0.1
+        )
+
+        st.subheader("약물 정보")
+        # 약물 목록은 프로세스당 한 번만 읽고 색인을 만들어 재실행 때마다 재사용
+        formulary = get_formulary()
+        drug_query = st.text_input(
+            "약물명 검색", value="아미카신", help="한글 또는 영문 약물명 일부를 입력하세요."
+        )
+        candidates = formulary.search(drug_query) if formulary else []
+        if candidates:
+            drug_name = st.selectbox("약물 선택", candidates)
+        else:
+            drug_name = drug_query
+            if formulary:
+                st.caption(
+                    f"약물 목록에 없는 약물입니다. 일일 총 투여량 {clinical.DAILY_DOSE_THRESHOLD}mg 기준으로 점검합니다."
+                )
+
+        drug = formulary.lookup(drug_name) if formulary else None
+        if drug:
+            st.caption(
+                f"📘 권장 용량 {drug['min_dose_per_kg']:g}~{drug['max_dose_per_kg']:g} mg/kg · "
+                f"1일 최대 {drug['daily_max']:,.0f} mg (교육용 예시 값)"
+            )
+        dose_per_kg = st.number_input(
+            "용량 (mg/kg)", min_value=0.1, max_value=100.0, value=15.0, step=0.1
+        )
+        frequency = st.selectbox("투여 빈도", list(clinical.FREQUENCIES))
+
+    with col2:
+        st.subheader("계산 결과")
+        total_dose, daily_dose = clinical.dose_schedule(
+            patient_weight, dose_per_kg, clinical.FREQUENCIES[frequency]
+        )
+
+        st.metric("1회 투여량", f"{total_dose:.1f} mg")
+        st.metric("1일 총 투여량", f"{daily_dose:.1f} mg")
+
+        # 경고 기능: 약물 목록에 있으면 약물별 기준, 없으면 공통 기준 사용
+        if drug:
+            경고 = formulary.check_dose(drug_name, dose_per_kg, daily_dose)
+        else:
+            임계값 = clinical.DAILY_DOSE_THRESHOLD  # mg
+            경고 = (
+                [f"일일 총 투여량이 {임계값}mg을 초과합니다!"]
+                if clinical.dose_warnings(daily_dose, 임계값)
+                else []
+            )
+
+        if 경고:
+            for 문구 in 경고:
+                st.error(f"⚠️ 경고: {문구}")
+            st.write(f"현재 계산된 일일 총량: {daily_dose:.1f} mg")
+            st.write("약물 가이드라인을 반드시 확인하세요.")
+        else:
+            st.success("✅ 투여량이 안전 범위 내에 있습니다.")
+
+        st.info(
+            f"""
+        **처방 요약**
+        - 약물: {drug_name}
+        - 1회 용량: {total_dose:.1f} mg
+        - 투여 빈도: {frequency}
+        - 1일 총량: {daily_dose:.1f} mg
+        """
+        )
+
+        st.warning(
+            "⚠️ 이 계산기는 교육 목적의 데모입니다. 실제 임상에서는 반드시 약물 가이드라인을 확인하세요."
+        )
@@ -0,0 +1,115 @@
+"""
+4.medical_demo.py 메뉴 페이지: 환자 안내 메시지 생성
+"""
+
+import streamlit as st
+
+from common import profiler
+from common.async_bedrock import get_async_bedrock_client, render_async_stats
+from common.guidance import format_usage, generate_guidance
+from common.guidance_cache import get_guidance_cache
+
+
+def render():
+    """
+    환자 정보를 입력받아 Bedrock 으로 맞춤형 안내 메시지를 만들고(같은 내용은 캐시 재사용)
+    환자 정보 요약과 함께 보여 주는 함수
+    """
+    # AWS Bedrock 클라이언트 (프로세스 전체에서 공유, 이 페이지를 처음 열 때 boto3 를 불러와 생성)
+    # 같은 안내 메시지를 동시에 요청하면 한 번만 호출하고, 프로세스 전체의 동시 호출 수를 제한
+    with profiler.section("Bedrock 클라이언트"):
+        bedrock_runtime = get_async_bedrock_client()
+    render_async_stats(bedrock_runtime)
+    guidance_cache = get_guidance_cache()
+
+    st.header("🤖 환자 안내 메시지 생성")
+    st.write("환자 정보를 입력하면 AI가 맞춤형 안내 메시지를 자동으로 생성합니다.")
+
+    def generate_patient_guidance(
+        patient_name, age, diagnosis, symptoms, treatment_plan
+    ):
+        """
+        Bedrock을 사용하여 환자에게 필요한 안내 메시지를 자동으로 생성하는 함수
+        같은 진단/증상/치료 계획/연령대의 안내문은 캐시에서 재사용합니다.
+        """
+        try:
+            with profiler.section("안내 메시지 생성"):
+                guidance, info = generate_guidance(
+                    bedrock_runtime,
+                    patient_name,
+                    age,
+                    diagnosis,
+                    symptoms,
+                    treatment_plan,
+                    cache=guidance_cache,
+                )
+            if info["degraded"]:
+                st.warning("⚠️ AI 서비스가 일시적으로 불안정하여 기본 안내문을 보여드립니다. 잠시 후 다시 생성해주세요.")
+            elif info["cached"]:
+                st.toast("🗂️ 캐시된 안내 메시지를 재사용했습니다.")
+            else:
+                st.caption(f"🧮 {format_usage(info['usage'])} · 🧭 {info['model_id']}")
+            return guidance
+        except Exception as e:
+            st.error(f"AI 안내 메시지 생성 중 오류가 발생했습니다: {str(e)}")
+            return None
+
+    # 입력 폼과 결과를 두 개의 컬럼으로 구성
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("환자 정보 입력")
+        patient_name = st.text_input("👤 환자 이름", "홍길동")
+        age = st.number_input("🎂 나이", min_value=0, max_value=150, value=45)
+        diagnosis = st.text_input("🏥 진단명", "고혈압")
+        symptoms = st.text_area(
+            "🩺 증상", "두통, 어지러움", help="환자가 호소하는 증상을 입력해주세요."
+        )
+        treatment_plan = st.text_area(
+            "💊 치료 계획",
+            "혈압약 복용, 생활습관 개선",
+            help="처방된 약물이나 치료 방법을 입력해주세요.",
+        )
+
+    with col2:
+        st.subheader("안내 메시지 생성")
+        if st.button("✨ 안내 메시지 생성하기", type="primary"):
+            # 입력 결과를 화면에 출력
+            if patient_name and age and diagnosis and symptoms and treatment_plan:
+                with st.spinner("🤖 AI가 환자 맞춤형 안내 메시지를 생성 중입니다..."):
+                    # AI를 사용하여 환자 안내 메시지 생성
+                    guidance = generate_patient_guidance(
+                        patient_name, age, diagnosis, symptoms, treatment_plan
+                    )
+
+                st.success("✅ 환자 안내 메시지가 생성되었습니다!")
+                st.write("---")
+                st.write("### 📋 환자 정보 요약")
+                st.write(f"- **👤 환자 이름**: {patient_name}")
+                st.write(f"- **🎂 나이**: {age}세")
+                st.write(f"- **🏥 진단명**: {diagnosis}")
+                st.write(f"- **🩺 증상**: {symptoms}")
+                st.write(f"- **💊 치료 계획**: {treatment_plan}")
+
+                # AI 생성 안내 메시지 표시
+                st.write("---")
+                if guidance:
+                    st.write("### 📝 환자 안내 메시지")
+                    st.success(guidance)
+                    st.write(
+                        "💡 *위 안내 메시지는 AI가 환자 정보를 바탕으로 자동으로 생성했습니다.*"
+                    )
+                else:
+                    st.warning("⚠️ 안내 메시지 생성에 실패했습니다. 다시 시도해주세요.")
+
+                st.balloons()  # 풍선 애니메이션 출력
+            else:
+                st.error("❌ 모든 필드를 입력해 주세요!")
+
+        st.info(
+            """
+            💡 **AI 기능 안내**
+            - AWS Bedrock의 Claude 모델을 사용하여 환자 맞춤형 안내 메시지를 생성합니다.
+            - 진료 후 주의사항, 투약 안내, 생활 관리 방법 등이 포함됩니다.
+            """
+        )
@@ -0,0 +1,116 @@
+"""
+4.medical_demo.py 메뉴 페이지: 안내 메시지 일괄 생성 (CSV 명단)
+"""
+
+import pandas as pd
+import streamlit as st
+
+from common import profiler
+from common.accounting import current_caller
+from common.batch import run_batch
+from common.async_bedrock import get_async_bedrock_client, render_async_stats
+from common.guidance import generate_guidance
+from common.guidance_cache import get_guidance_cache
+
+
+def render():
+    """
+    환자 명단 CSV 의 환자별 안내 메시지를 동시에 생성하면서 진행률을 보여 주고,
+    실패 건을 포함한 결과 표와 CSV 다운로드를 제공하는 함수
+    """
+    # AWS Bedrock 클라이언트 (프로세스 전체에서 공유, 이 페이지를 처음 열 때 boto3 를 불러와 생성)
+    # 같은 안내 메시지를 동시에 요청하면 한 번만 호출하고, 프로세스 전체의 동시 호출 수를 제한
+    with profiler.section("Bedrock 클라이언트"):
+        bedrock_runtime = get_async_bedrock_client()
+    render_async_stats(bedrock_runtime)
+    guidance_cache = get_guidance_cache()
+
+    st.header("📑 안내 메시지 일괄 생성")
+    st.write(
+        "환자 명단 CSV를 업로드하면 환자별 안내 메시지를 동시에 생성하여 CSV로 내려받을 수 있습니다."
+    )
+
+    # 명단 CSV 에 필요한 컬럼
+    필수_컬럼 = ["환자명", "나이", "진단명", "증상", "치료계획"]
+
+    # 양식 파일 제공
+    양식 = pd.DataFrame(
+        [["홍길동", 45, "고혈압", "두통, 어지러움", "혈압약 복용, 생활습관 개선"]],
+        columns=필수_컬럼,
+    )
+    st.download_button(
+        label="📄 명단 양식 다운로드 (CSV)",
+        data=양식.to_csv(index=False).encode("utf-8-sig"),
+        file_name="환자명단_양식.csv",
+        mime="text/csv",
+    )
+
+    uploaded = st.file_uploader("환자 명단 CSV 업로드", type="csv")
+
+    max_workers = st.slider("동시 요청 수", min_value=1, max_value=16, value=4)
+    st.caption(
+        "초당 요청 수 제한과 스로틀링 재시도는 공유 Bedrock 클라이언트가 프로세스 전체 기준으로 처리합니다."
+    )
+
+    if uploaded is not None:
+        roster = pd.read_csv(uploaded, encoding="utf-8-sig")
+        누락_컬럼 = [c for c in 필수_컬럼 if c not in roster.columns]
+
+        if 누락_컬럼:
+            st.error(f"❌ 필수 컬럼이 없습니다: {', '.join(누락_컬럼)}")
+        else:
+            st.write(f"총 **{len(roster)}명**의 환자가 업로드되었습니다.")
+            st.dataframe(roster.head(), use_container_width=True)
+
+            if st.button("✨ 일괄 생성 시작", type="primary"):
+                # 작업 스레드에서는 앱·사용자를 알 수 없으므로 미리 구해서 사용량 기록에 사용
+                caller = current_caller()
+
+                def generate_row(row):
+                    # 작업 스레드에서 실행되므로 Streamlit 명령을 사용하지 않음
+                    guidance, _ = generate_guidance(
+                        bedrock_runtime,
+                        str(row["환자명"]),
+                        int(row["나이"]),
+                        str(row["진단명"]),
+                        str(row["증상"]),
+                        str(row["치료계획"]),
+                        cache=guidance_cache,
+                        caller=caller,
+                        allow_degraded=False,  # 차단 중이면 실패로 남겨 다시 생성할 수 있게 함
+                    )
+                    return guidance
+
+                rows = roster.to_dict("records")
+                안내문 = [None] * len(rows)
+                오류 = [None] * len(rows)
+
+                progress = st.progress(0.0, text="안내 메시지 생성 준비 중...")
+                with profiler.section("일괄 생성"):
+                    for done, (i, outcome) in enumerate(
+                        # 속도 제한·재시도는 공유 클라이언트가 하므로 동시 실행만 맡김
+                        run_batch(generate_row, rows, max_workers=max_workers),
+                        start=1,
+                    ):
+                        안내문[i] = outcome["result"]
+                        오류[i] = outcome["error"]
+                        progress.progress(
+                            done / len(rows), text=f"{done}/{len(rows)}명 처리 완료"
+                        )
+
+                results = roster.copy()
+                results["안내메시지"] = 안내문
+                results["오류"] = 오류
+                st.session_state["batch_results"] = results
+
+    if "batch_results" in st.session_state:
+        results = st.session_state["batch_results"]
+        실패 = results["오류"].notna().sum()
+        st.success(f"✅ {len(results) - 실패}명 생성 완료, {실패}명 실패")
+        st.dataframe(results, use_container_width=True)
+        st.download_button(
+            label="📥 결과 다운로드 (CSV)",
+            data=results.to_csv(index=False).encode("utf-8-sig"),
+            file_name="환자안내메시지_일괄생성.csv",
+            mime="text/csv",
+        )
@@ -0,0 +1,31 @@
+"""
+4.medical_demo.py 메뉴 페이지: 홈 페이지
+"""
+
+import streamlit as st
+
+
+def render():
+    """
+    Streamlit 소개와 의료 현장 활용 예시를 보여 주고, 사이드바 메뉴로 안내하는 함수
+    """
+    st.header("Streamlit이란?")
+    st.write(
+        """
+    **Streamlit**은 Python으로 데이터 애플리케이션을 빠르게 만들 수 있는 오픈소스 프레임워크입니다.
+    
+    ### 왜 의료진에게 유용한가요?
+    - 🚀 **빠른 개발**: 몇 줄의 코드로 웹 앱 제작
+    - 📊 **데이터 시각화**: 환자 데이터를 쉽게 시각화
+    - 🔄 **실시간 업데이트**: 데이터가 바뀌면 즉시 반영
+    - 💻 **코딩 지식 최소화**: Python 기초만 알면 OK
+    
+    ### 의료 현장 활용 예시
+    - 환자 모니터링 대시보드
+    - 임상 계산기 (BMI, 약물 용량 등)
+    - 데이터 분석 및 리포트 생성
+    - 의료 영상 분석 도구
+    """
+    )
+
+    st.info("👈 왼쪽 사이드바에서 다른 예제들을 확인해보세요!")
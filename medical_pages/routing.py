@@ -0,0 +1,87 @@
+"""
+4.medical_demo.py 메뉴 페이지: 모델 라우팅 기록 (모델별 지연 시간 히스토그램과 라우팅 결정)
+"""
+
+import pandas as pd
+import streamlit as st
+
+from common import profiler
+from common.accounting import WINDOWS
+from common.model_router import LATENCY_BUCKETS_MS, bucket_label, get_model_router
+
+# 호출 종류 -> 표시 이름
+호출_종류 = {"invoke": "전체 응답", "stream": "스트리밍 시작"}
+
+# 라우팅 결정 표에 보여 줄 컬럼 -> 표시 이름
+결정_컬럼 = {
+    "created_at": "시각",
+    "app": "앱",
+    "kind": "호출 종류",
+    "model_id": "모델",
+    "reason": "고른 이유",
+    "estimated_tokens": "입력 추정 토큰",
+    "slo_ms": "SLO (ms)",
+    "p95_ms": "당시 p95 (ms)",
+    "latency_ms": "지연 시간 (ms)",
+    "outcome": "결과",
+}
+
+
+def render():
+    """
+    라우팅 표의 모델별 현재 상태(입력 한도, p95, 오류로 제외 여부)와
+    선택한 구간의 모델별 지연 시간 분포, 최근 라우팅 결정을 보여 주는 함수
+    """
+    st.header("🧭 모델 라우팅 기록")
+    st.write(
+        "챗봇과 안내 메시지 생성은 요청마다 라우팅 표에서 모델을 고릅니다. "
+        "입력 크기가 모델 한도를 넘는 모델과 최근 오류가 난 모델을 빼고, "
+        "최근 지연 시간 p95 가 SLO 안인 첫 모델을 사용하며, 실패하면 다음 모델로 다시 보냅니다."
+    )
+
+    router = get_model_router()
+    st.subheader("📋 라우팅 표 (이 서버 프로세스 기준)")
+    st.caption(
+        " · ".join(f"{name} SLO {router.slo_ms(kind):,}ms" for kind, name in 호출_종류.items())
+    )
+    st.dataframe(
+        pd.DataFrame(router.stats()).rename(
+            columns={
+                "model_id": "모델 (선호 순서)",
+                "max_input_tokens": "입력 한도 (토큰)",
+                "invoke_p95_ms": "전체 응답 p95 (ms)",
+                "stream_p95_ms": "스트리밍 시작 p95 (ms)",
+                "samples": "최근 기록 수",
+                "cooling_down": "오류로 제외 중",
+            }
+        ),
+        use_container_width=True,
+    )
+
+    window = st.radio("조회 구간", list(WINDOWS), horizontal=True)
+    with profiler.section("라우팅 기록 조회"):
+        histogram = router.log.histogram(WINDOWS[window])
+        decisions = router.log.decisions()
+
+    if not histogram:
+        st.info("선택한 구간에 기록된 호출이 없습니다.")
+        return
+
+    # 모델·호출 종류별 지연 시간 히스토그램 (구간 순서대로 표시)
+    st.subheader("⏱️ 모델별 지연 시간 분포")
+    table = pd.DataFrame(histogram)
+    table["구간"] = table["le_ms"].map(bucket_label)
+    table["모델"] = table["model_id"] + " · " + table["kind"].map(호출_종류)
+    order = [bucket_label(upper) for upper in LATENCY_BUCKETS_MS + (-1,)]
+    chart = (
+        table.pivot_table(index="구간", columns="모델", values="count", aggfunc="sum", fill_value=0)
+        .reindex(order, fill_value=0)
+    )
+    chart.index = pd.CategoricalIndex(chart.index, categories=order, ordered=True)
+    st.bar_chart(chart)
+
+    st.subheader("🗒️ 최근 라우팅 결정")
+    recent = pd.DataFrame(decisions, columns=list(결정_컬럼))
+    recent["created_at"] = pd.to_datetime(recent["created_at"], unit="s")
+    recent["kind"] = recent["kind"].map(호출_종류)
+    st.dataframe(recent.rename(columns=결정_컬럼), use_container_width=True)
@@ -0,0 +1,102 @@
+"""
+4.medical_demo.py 메뉴 페이지: 토큰 사용량·비용 (모든 Bedrock 앱 합계)
+"""
+
+import os
+
+import pandas as pd
+import streamlit as st
+
+from common import profiler
+from common.accounting import WINDOWS, format_cost, get_usage_ledger
+
+# 표에 보여 줄 컬럼 -> 표시 이름
+컬럼_이름 = {
+    "requests": "요청 수",
+    "input_tokens": "입력 토큰",
+    "output_tokens": "출력 토큰",
+    "cache_read_input_tokens": "캐시 읽기 토큰",
+    "cache_write_input_tokens": "캐시 쓰기 토큰",
+    "total_tokens": "입출력 토큰",
+    "cost": "예상 비용 (USD)",
+}
+
+
+def usage_table(rows, group_column, label):
+    """
+    totals() 결과를 표시용 데이터프레임으로 바꾸는 함수 (비용 순 정렬)
+    """
+    table = pd.DataFrame(rows, columns=[group_column] + list(컬럼_이름))
+    table[group_column] = table[group_column].replace("", "(모델 미지정)")
+    return (
+        table.sort_values("cost", ascending=False)
+        .rename(columns={group_column: label, **컬럼_이름})
+        .reset_index(drop=True)
+    )
+
+
+def render():
+    """
+    선택한 구간의 Bedrock 토큰 사용량과 예상 비용을 합계, 시간대별 그래프,
+    앱·사용자·모델별 표로 보여 주는 함수
+    """
+    st.header("💰 토큰 사용량·비용")
+    st.write(
+        "3.app-v2, 의료진 데모, 챗봇 등 모든 Bedrock 앱이 기록한 토큰 사용량과 예상 비용입니다. "
+        "비용은 모델별 가격표로 계산한 추정치입니다."
+    )
+
+    window = st.radio("조회 구간", list(WINDOWS), horizontal=True)
+    hours = WINDOWS[window]
+    ledger = get_usage_ledger()
+
+    with profiler.section("사용량 집계"):
+        total = ledger.totals(hours)[0]
+        by_app = ledger.totals(hours, group_by=("app",))
+        by_user = ledger.totals(hours, group_by=("user",))
+        by_model = ledger.totals(hours, group_by=("model_id",))
+        by_hour = ledger.totals(hours, group_by=("hour",))
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("요청 수", f"{total['requests']:,}")
+    with col2:
+        st.metric("입력 토큰", f"{total['input_tokens']:,}")
+    with col3:
+        st.metric("출력 토큰", f"{total['output_tokens']:,}")
+    with col4:
+        st.metric("예상 비용", format_cost(total))
+
+    budgets = {
+        "사용자별": os.environ.get("TOKEN_BUDGET_USER_24H"),
+        "앱별": os.environ.get("TOKEN_BUDGET_APP_24H"),
+    }
+    st.caption(
+        "최근 24시간 토큰 예산: "
+        + " · ".join(
+            f"{name} {int(value):,} 토큰" if value and int(value) else f"{name} 제한 없음"
+            for name, value in budgets.items()
+        )
+    )
+
+    if not total["requests"]:
+        st.info("선택한 구간에 기록된 사용량이 없습니다.")
+        return
+
+    # 시간대별 입출력 토큰
+    st.subheader("📈 시간대별 토큰 사용량")
+    hourly = pd.DataFrame(by_hour)
+    hourly["시각"] = pd.to_datetime(hourly["hour"] * 3600, unit="s")
+    st.bar_chart(
+        hourly.set_index("시각")[["input_tokens", "output_tokens"]].rename(
+            columns={"input_tokens": "입력", "output_tokens": "출력"}
+        )
+    )
+
+    tab_app, tab_user, tab_model = st.tabs(["앱별", "사용자별", "모델별"])
+    with tab_app:
+        st.dataframe(usage_table(by_app, "app", "앱"), use_container_width=True)
+    with tab_user:
+        st.dataframe(usage_table(by_user, "user", "사용자"), use_container_width=True)
+    with tab_model:
+        st.dataframe(usage_table(by_model, "model_id", "모델"), use_container_width=True)